@@ -0,0 +1,108 @@
+"""
+Per-worker cache of the authenticated account.
+
+``authenticate_request`` only needs to know who is calling, so instead of
+hydrating the whole ``Account`` node (password hash, bio, email...) on every
+request it attaches a ``LazyAccount``: ``uid``, ``username`` and
+``display_name`` come from a small TTL/LRU cache keyed by uid, and the full
+node is loaded - once per request - the first time any other attribute is
+used. Write paths that need a real node for ``connect()`` use ``.node``.
+
+Entries live for ``ACCOUNT_CACHE_TTL`` seconds; code that changes a cached
+field or deletes an account calls ``invalidate_account``. Other workers may
+serve the old username/display name until their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from neomodel import db
+
+from .models import Account
+
+
+class LazyAccount:
+    """Lightweight stand-in for the authenticated Account"""
+
+    __slots__ = ('uid', 'username', 'display_name', '_node')
+
+    def __init__(self, uid, username, display_name):
+        self.uid = uid
+        self.username = username
+        self.display_name = display_name
+        self._node = None
+
+    @property
+    def node(self):
+        """The full Account node, loaded on first use"""
+        if self._node is None:
+            self._node = Account.nodes.get(uid=self.uid)
+        return self._node
+
+    def __getattr__(self, name):
+        # Only called for attributes outside the cached projection
+        return getattr(self.node, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (LazyAccount, Account)):
+            return self.uid == other.uid
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.uid)
+
+    def __repr__(self):
+        return f'<LazyAccount {self.uid} {self.username}>'
+
+
+class AccountCache:
+    """TTL/LRU cache of ``(uid, username, display_name)`` projections"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # Format: {uid: ((uid, username, display_name), cached_at)}
+        self._lock = threading.Lock()
+
+    def get(self, uid):
+        """Return a LazyAccount for ``uid`` or ``None`` if the account does not exist"""
+        with self._lock:
+            entry = self._cache.get(uid)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self._cache.move_to_end(uid)
+                return LazyAccount(*entry[0])
+
+        results, _ = db.cypher_query(
+            "MATCH (a:Account {uid: $uid}) RETURN a.uid, a.username, a.display_name",
+            {'uid': uid}
+        )
+        if not results:
+            self.invalidate(uid)
+            return None
+
+        projection = tuple(results[0])
+        if self.ttl > 0:
+            with self._lock:
+                self._cache[uid] = (projection, time.monotonic())
+                self._cache.move_to_end(uid)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return LazyAccount(*projection)
+
+    def invalidate(self, uid):
+        with self._lock:
+            self._cache.pop(uid, None)
+
+
+account_cache = AccountCache(settings.ACCOUNT_CACHE_TTL, settings.ACCOUNT_CACHE_SIZE)
+
+
+def get_authenticated_account(uid):
+    """LazyAccount for an authenticated uid, or ``None`` if the account is gone"""
+    return account_cache.get(uid)
+
+
+def invalidate_account(uid):
+    """Drop a cached projection after the account was updated or deleted"""
+    account_cache.invalidate(uid)
@@ -1,6 +1,8 @@
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -9,42 +11,152 @@ import json
 from functools import wraps
 
 from .models import Account
+from .account_cache import get_authenticated_account, invalidate_account
+from .token_store import get_token_store, session_id, token_key
+from .signed_tokens import (
+    REFRESH_TOKEN_PREFIX, create_access_token, is_refresh_token, is_signed_token,
+    read_access_token, refresh_token_id, revocation_list
+)
 
 
 class AuthToken:
-    """Simple in-memory token storage (in production, use Redis or database)"""
-    tokens = {}  # Format: {token: {'user_uid': 'xxx', 'expires': datetime}}
+    """
+    Authentication tokens kept in the configured token store (settings.AUTH_TOKEN_STORE)
+    In 'signed' mode (settings.AUTH_TOKEN_MODE) clients get a short-lived signed
+    access token plus an opaque refresh token; only the refresh token is stored.
+    """
+    lifetime = timedelta(hours=24)  # Opaque tokens expire 24 hours after creation
     
     @classmethod
     def create_token(cls, user_uid):
         """Create a new authentication token"""
         token = secrets.token_urlsafe(32)
-        expires = datetime.now() + timedelta(hours=24)  # Token expires in 24 hours
-        cls.tokens[token] = {
-            'user_uid': user_uid,
-            'expires': expires
-        }
+        expires = time.time() + cls.lifetime.total_seconds()
+        get_token_store().save(token, user_uid, expires)
         return token
     
+    @classmethod
+    def create_token_pair(cls, user_uid):
+        """Create a refresh token (stored) and a signed access token minted from it"""
+        refresh_token = REFRESH_TOKEN_PREFIX + secrets.token_urlsafe(32)
+        expires = time.time() + settings.AUTH_REFRESH_TOKEN_LIFETIME
+        evicted = get_token_store().save(refresh_token, user_uid, expires)
+        # Sessions evicted by the caps may have minted access tokens that are still valid
+        cls._deny_sessions(evicted)
+        return create_access_token(user_uid, refresh_token_id(refresh_token)), refresh_token
+    
+    @classmethod
+    def issue(cls, user_uid):
+        """Issue credentials for a login according to AUTH_TOKEN_MODE, as response fields"""
+        if settings.AUTH_TOKEN_MODE == 'signed':
+            access_token, refresh_token = cls.create_token_pair(user_uid)
+            return {
+                'token': access_token,
+                'refresh_token': refresh_token,
+                'expires_in': settings.AUTH_ACCESS_TOKEN_LIFETIME
+            }
+        return {'token': cls.create_token(user_uid)}
+    
+    @classmethod
+    def refresh_access_token(cls, refresh_token):
+        """Mint a new access token from a valid refresh token, or return None"""
+        if not is_refresh_token(refresh_token) or revocation_list.contains(refresh_token_id(refresh_token)):
+            return None
+        user_uid = cls._validate_stored(refresh_token)
+        if not user_uid:
+            return None
+        return create_access_token(user_uid, refresh_token_id(refresh_token))
+    
     @classmethod
     def validate_token(cls, token):
         """Validate a token and return user_uid if valid"""
-        if token not in cls.tokens:
+        if is_signed_token(token):
+            # Signed access token: signature, expiry and deny-list checks only
+            payload = read_access_token(token)
+            if payload is None or revocation_list.contains(payload['rid']):
+                return None
+            return payload['uid']
+        if is_refresh_token(token):
+            # Refresh tokens are only accepted by the refresh action
+            return None
+        return cls._validate_stored(token)
+    
+    @classmethod
+    def _validate_stored(cls, token):
+        """Look an opaque token up in the token store and return its user_uid if valid"""
+        store = get_token_store()
+        token_data = store.get(token)
+        if token_data is None:
             return None
         
-        token_data = cls.tokens[token]
-        if datetime.now() > token_data['expires']:
+        now = time.time()
+        if now > token_data['expires']:
             # Token expired, remove it
-            del cls.tokens[token]
+            store.delete(token)
             return None
         
+        # Throttled so an active session costs one write per interval, not one per request
+        if now - token_data.get('last_seen', 0) > settings.AUTH_SESSION_TOUCH_INTERVAL:
+            store.touch(token, now)
+        
         return token_data['user_uid']
     
     @classmethod
-    def revoke_token(cls, token):
+    def revoke_token(cls, token, refresh_token=None):
         """Revoke a token (logout)"""
-        if token in cls.tokens:
-            del cls.tokens[token]
+        if refresh_token:
+            # Access tokens minted from it stay verifiable until they expire, so deny them
+            get_token_store().delete(refresh_token)
+            revocation_list.add(
+                refresh_token_id(refresh_token), time.time() + settings.AUTH_ACCESS_TOKEN_LIFETIME
+            )
+        elif is_signed_token(token):
+            # Without the refresh token itself, deny its id for as long as it could be used
+            payload = read_access_token(token)
+            if payload:
+                revocation_list.add(payload['rid'], time.time() + settings.AUTH_REFRESH_TOKEN_LIFETIME)
+        
+        if not is_signed_token(token):
+            get_token_store().delete(token)
+    
+    @classmethod
+    def revoke_all(cls, user_uid):
+        """Revoke every session of a user (log out everywhere) and return how many were revoked"""
+        keys = get_token_store().delete_user(user_uid)
+        cls._deny_sessions(keys)
+        return len(keys)
+    
+    @classmethod
+    def _deny_sessions(cls, keys):
+        """Deny the access tokens minted from deleted sessions (signed mode) until they expire"""
+        if settings.AUTH_TOKEN_MODE != 'signed':
+            return
+        until = time.time() + settings.AUTH_ACCESS_TOKEN_LIFETIME
+        for key in keys:
+            revocation_list.add(session_id(key), until)
+    
+    @classmethod
+    def list_sessions(cls, user_uid, current_token=None):
+        """Active sessions of a user, oldest first, flagging the one ``current_token`` belongs to"""
+        current = cls.session_id_of(current_token) if current_token else None
+        return [
+            {
+                'session_id': session_id(session['key']),
+                'created_at': str(datetime.fromtimestamp(session['created_at'], tz=timezone.utc)),
+                'last_seen': str(datetime.fromtimestamp(session['last_seen'], tz=timezone.utc)),
+                'expires_at': str(datetime.fromtimestamp(session['expires'], tz=timezone.utc)),
+                'current': session_id(session['key']) == current
+            }
+            for session in get_token_store().list_user(user_uid)
+        ]
+    
+    @classmethod
+    def session_id_of(cls, token):
+        """Session id a token belongs to (a signed access token maps to its refresh token's session)"""
+        if is_signed_token(token):
+            payload = read_access_token(token)
+            return payload['rid'] if payload else None
+        return session_id(token_key(token))
 
 
 def hash_password(password):
@@ -67,10 +179,9 @@ def authenticate_request(view_func):
         if not user_uid:
             return JsonResponse({'error': 'Invalid or expired token'}, status=401)
         
-        # Add user info to request
-        try:
-            request.user_account = Account.nodes.get(uid=user_uid)
-        except Account.DoesNotExist:
+        # Add user info to request (cached projection, full node loaded on demand)
+        request.user_account = get_authenticated_account(user_uid)
+        if request.user_account is None:
             return JsonResponse({'error': 'User not found'}, status=401)
         
         return view_func(self, request, *args, **kwargs)
@@ -89,12 +200,14 @@ class AuthView(View):
         """Handle registration and login"""
         try:
             data = json.loads(request.body)
-            action = data.get('action')  # 'register' or 'login'
+            action = data.get('action')  # 'register', 'login' or 'refresh'
             
             if action == 'register':
                 return self.register(data)
             elif action == 'login':
                 return self.login(data)
+            elif action == 'refresh':
+                return self.refresh(data)
             else:
                 return JsonResponse({'error': 'Invalid action'}, status=400)
                 
@@ -127,12 +240,12 @@ class AuthView(View):
                 password_hash=hash_password(data['password'])
             ).save()
             
-            # Create authentication token
-            token = AuthToken.create_token(account.uid)
+            # Create authentication token(s)
+            credentials = AuthToken.issue(account.uid)
             
             return JsonResponse({
                 'message': 'Registration successful',
-                'token': token,
+                **credentials,
                 'user': {
                     'uid': account.uid,
                     'username': account.username,
@@ -167,12 +280,12 @@ class AuthView(View):
             account.last_active = datetime.now()
             account.save()
             
-            # Create authentication token
-            token = AuthToken.create_token(account.uid)
+            # Create authentication token(s)
+            credentials = AuthToken.issue(account.uid)
             
             return JsonResponse({
                 'message': 'Login successful',
-                'token': token,
+                **credentials,
                 'user': {
                     'uid': account.uid,
                     'username': account.username,
@@ -185,13 +298,30 @@ class AuthView(View):
         except Exception as e:
             return JsonResponse({'error': f'Login failed: {str(e)}'}, status=400)
     
+    def refresh(self, data):
+        """Exchange a refresh token for a new access token (signed token mode)"""
+        refresh_token = data.get('refresh_token')
+        if not refresh_token:
+            return JsonResponse({'error': 'refresh_token required'}, status=400)
+        
+        access_token = AuthToken.refresh_access_token(refresh_token)
+        if not access_token:
+            return JsonResponse({'error': 'Invalid or expired refresh token'}, status=401)
+        
+        return JsonResponse({
+            'message': 'Token refreshed',
+            'token': access_token,
+            'expires_in': settings.AUTH_ACCESS_TOKEN_LIFETIME
+        })
+    
     def delete(self, request):
-        """Logout - revoke token"""
+        """Logout - revoke token (and the refresh token, if given in the body)"""
         try:
+            data = json.loads(request.body) if request.body else {}
             auth_header = request.META.get('HTTP_AUTHORIZATION', '')
             if auth_header.startswith('Bearer '):
                 token = auth_header.split(' ')[1]
-                AuthToken.revoke_token(token)
+                AuthToken.revoke_token(token, refresh_token=data.get('refresh_token'))
             
             return JsonResponse({'message': 'Logout successful'})
             
@@ -209,7 +339,7 @@ class ProfileView(View):
     @authenticate_request
     def get(self, request):
         """Get current user's profile"""
-        account = request.user_account
+        account = request.user_account.node
         return JsonResponse({
             'user': {
                 'uid': account.uid,
@@ -229,7 +359,7 @@ class ProfileView(View):
         """Update current user's profile"""
         try:
             data = json.loads(request.body)
-            account = request.user_account
+            account = request.user_account.node
             
             # Update allowed fields
             if 'display_name' in data:
@@ -244,6 +374,7 @@ class ProfileView(View):
                 account.email = data['email']
             
             account.save()
+            invalidate_account(account.uid)
             
             return JsonResponse({
                 'message': 'Profile updated successfully',
@@ -258,3 +389,27 @@ class ProfileView(View):
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=400)
+
+
+class SessionView(View):
+    """Active sessions of the current user - list them or log out everywhere"""
+    
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+    
+    @authenticate_request
+    def get(self, request):
+        """List the current user's active sessions"""
+        token = request.META['HTTP_AUTHORIZATION'].split(' ')[1]
+        sessions = AuthToken.list_sessions(request.user_account.uid, current_token=token)
+        return JsonResponse({'sessions': sessions, 'count': len(sessions)})
+    
+    @authenticate_request
+    def delete(self, request):
+        """Log out everywhere - revoke every session of the current user"""
+        try:
+            revoked = AuthToken.revoke_all(request.user_account.uid)
+            return JsonResponse({'message': 'All sessions revoked', 'revoked': revoked})
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=400)
@@ -0,0 +1,106 @@
+"""
+Chat membership checks.
+
+Authorizing a chat request only needs to know whether one account participates
+in one chat, so instead of loading every participant of the chat it runs a
+single anchored ``EXISTS`` from the account's ``PARTICIPATES_IN`` relationships
+(an account is in a handful of chats; a group chat may have hundreds of members).
+
+Positive answers are memoized per worker for ``CHAT_MEMBERSHIP_TTL`` seconds -
+a long-poll or a client paging through history asks the same question several
+times in a row. Negative answers are never cached, so a user added to a chat
+can use it immediately. Code that removes a participant or deletes a chat calls
+``invalidate_chat_membership``; other workers may keep authorizing the removed
+user until their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from neomodel import db
+
+
+# One row per existing chat: whether the account participates in it
+MEMBERSHIP_QUERY = """
+MATCH (c:Chat {uid: $chat_uid})
+RETURN EXISTS { (:Account {uid: $user_uid})-[:PARTICIPATES_IN]->(c) }
+"""
+
+MEMBER = 'member'
+NOT_PARTICIPANT = 'not_participant'
+CHAT_NOT_FOUND = 'chat_not_found'
+
+
+class MembershipCache:
+    """TTL/LRU set of ``(chat_uid, user_uid)`` pairs known to be members"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # Format: {(chat_uid, user_uid): cached_at}
+        self._chat_members = {}  # Format: {chat_uid: {user_uid, ...}} - the cached pairs by chat
+        self._lock = threading.Lock()
+
+    def check(self, chat_uid, user_uid):
+        """Return MEMBER, NOT_PARTICIPANT or CHAT_NOT_FOUND"""
+        key = (chat_uid, user_uid)
+        with self._lock:
+            cached_at = self._cache.get(key)
+            if cached_at is not None and time.monotonic() - cached_at < self.ttl:
+                self._cache.move_to_end(key)
+                return MEMBER
+
+        results, _ = db.cypher_query(MEMBERSHIP_QUERY, {'chat_uid': chat_uid, 'user_uid': user_uid})
+        if not results:
+            # Only this pair can be cached (and stale); a whole-chat invalidate
+            # here would let any client purge the cache with made-up chat uids
+            self.invalidate(chat_uid, user_uid)
+            return CHAT_NOT_FOUND
+        if not results[0][0]:
+            self.invalidate(chat_uid, user_uid)
+            return NOT_PARTICIPANT
+
+        if self.ttl > 0:
+            with self._lock:
+                self._cache[key] = time.monotonic()
+                self._cache.move_to_end(key)
+                self._chat_members.setdefault(chat_uid, set()).add(user_uid)
+                while len(self._cache) > self.max_entries:
+                    self._forget(*self._cache.popitem(last=False)[0])
+        return MEMBER
+
+    def invalidate(self, chat_uid, user_uid=None):
+        with self._lock:
+            if user_uid is not None:
+                if self._cache.pop((chat_uid, user_uid), None) is not None:
+                    self._forget(chat_uid, user_uid)
+            else:
+                for member_uid in self._chat_members.pop(chat_uid, ()):
+                    self._cache.pop((chat_uid, member_uid), None)
+
+    def _forget(self, chat_uid, user_uid):
+        """Drop a pair that left the cache from the per-chat index (lock held)"""
+        members = self._chat_members.get(chat_uid)
+        if members is not None:
+            members.discard(user_uid)
+            if not members:
+                del self._chat_members[chat_uid]
+
+
+membership_cache = MembershipCache(settings.CHAT_MEMBERSHIP_TTL, settings.CHAT_MEMBERSHIP_CACHE_SIZE)
+
+
+def chat_membership(chat_uid, user_uid):
+    """MEMBER, NOT_PARTICIPANT or CHAT_NOT_FOUND for ``user_uid`` in ``chat_uid``"""
+    return membership_cache.check(chat_uid, user_uid)
+
+
+def is_chat_participant(chat_uid, user_uid):
+    """Whether ``user_uid`` participates in ``chat_uid`` (False if the chat does not exist)"""
+    return chat_membership(chat_uid, user_uid) == MEMBER
+
+
+def invalidate_chat_membership(chat_uid, user_uid=None):
+    """Forget cached memberships of one participant, or of the whole chat"""
+    membership_cache.invalidate(chat_uid, user_uid)
@@ -0,0 +1,246 @@
+"""
+Coalescing writer for chat summaries.
+
+Every send used to update the chat's denormalized summary (last_message_at,
+message_count, last-message preview, LAST_MESSAGE) in its own transaction,
+taking the chat node's write lock: in a busy group chat concurrent sends queue
+up behind each other on that one node. With ``CHAT_SUMMARY_FLUSH_INTERVAL`` set,
+sends only create the message and ``record`` it here; a background thread per
+worker folds everything recorded for a chat (latest message wins, counts add
+up) and writes it every interval, in one statement for all dirty chats. Bucketed
+chats get their bucket counters and chain brought up to date the same way.
+Messages are created with an ``Unsequenced`` label; a flush gives every
+Unsequenced message of the chats it writes - whichever worker sent them - its
+sequence number (Message.seq) in send order, and long-polls waiting on
+``after_seq`` are woken once they have them.
+
+The summary then lags behind the messages by up to one interval. If a worker
+dies before flushing, its messages are numbered by the next flush of their
+chat, or by the sweep every writer runs for messages left Unsequenced for
+``ORPHAN_AGE`` seconds. The summaries themselves are restored by
+``python manage.py repair_chat_summaries``.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from neomodel import db
+
+from .realtime import chat_topic, publish
+
+
+# Seconds after which a message still Unsequenced is assumed to be a dead
+# worker's, and how often each writer looks for such messages
+ORPHAN_AGE = 60
+ORPHAN_SWEEP_INTERVAL = 60
+
+
+# Apply the pending summaries of many chats. Sending a message never takes the
+# chat's lock in this mode, so these flushes are the only chat writes; the
+# message_count SET serializes flushes of the same chat from several workers,
+# and the last-message fields only move forward. Chats that have no last_seq
+# yet are left to backfill_message_seq, which numbers their history first.
+FLUSH_QUERY = """
+UNWIND $chats AS row
+MATCH (c:Chat {uid: row.chat_uid})
+SET c.message_count = coalesce(c.message_count, 0) + row.count
+WITH c, row
+CALL {
+    WITH c
+    WITH c WHERE c.last_seq IS NOT NULL
+    MATCH (m:Unsequenced {chat_uid: c.uid})
+    WITH c, m ORDER BY m.created_at, m.uid
+    WITH c, collect(m) AS unsequenced, c.last_seq AS base
+    SET c.last_seq = base + size(unsequenced)
+    WITH unsequenced, base
+    UNWIND range(0, size(unsequenced) - 1) AS i
+    WITH unsequenced[i] AS m, base + i + 1 AS seq
+    SET m.seq = seq
+    REMOVE m:Unsequenced
+}
+CALL {
+    WITH c, row
+    WITH c, row WHERE row.last_message_uid IS NOT NULL
+                  AND coalesce(c.last_message_at, 0) <= row.last_message_at
+    MATCH (m:Message {uid: row.last_message_uid})
+    SET c.last_message_at = row.last_message_at,
+        c.last_message_uid = row.last_message_uid,
+        c.last_message_preview = row.last_message_preview,
+        c.last_message_type = row.last_message_type,
+        c.last_message_sender_uid = row.last_message_sender_uid,
+        c.last_message_sender_username = row.last_message_sender_username,
+        c.last_message_sender_display_name = row.last_message_sender_display_name
+    WITH c, m
+    OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+    DELETE old
+    WITH DISTINCT c, m
+    CREATE (c)-[:LAST_MESSAGE]->(m)
+}
+CALL {
+    WITH row
+    UNWIND row.buckets AS bucket_row
+    MATCH (b:MessageBucket {key: bucket_row.key})
+    SET b.message_count = coalesce(b.message_count, 0) + bucket_row.count,
+        b.last_at = CASE WHEN coalesce(b.last_at, 0) < bucket_row.last_at THEN bucket_row.last_at ELSE b.last_at END
+}
+CALL {
+    WITH c
+    WITH c WHERE c.bucketed
+    OPTIONAL MATCH (c)-[latest_rel:LATEST_BUCKET]->(latest:MessageBucket)
+    MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+    WHERE latest IS NULL OR b.day > latest.day
+    WITH c, latest, latest_rel, b ORDER BY b.day
+    WITH c, latest, latest_rel, collect(b) AS newer
+    DELETE latest_rel
+    WITH c, latest, newer
+    UNWIND range(0, size(newer) - 1) AS i
+    WITH c, newer[i] AS b, CASE WHEN i = 0 THEN latest ELSE newer[i - 1] END AS older,
+         i = size(newer) - 1 AS is_latest
+    FOREACH (_ IN CASE WHEN older IS NULL THEN [] ELSE [1] END | MERGE (b)-[:PREVIOUS_BUCKET]->(older))
+    FOREACH (_ IN CASE WHEN is_latest THEN [1] ELSE [] END | CREATE (c)-[:LATEST_BUCKET]->(b))
+}
+RETURN count(c)
+"""
+
+# Chats with messages left Unsequenced since before $before (their worker died
+# before flushing them)
+ORPHANS_QUERY = """
+MATCH (m:Unsequenced) WHERE m.created_at < $before
+WITH DISTINCT m.chat_uid AS chat_uid
+MATCH (c:Chat {uid: chat_uid}) WHERE c.last_seq IS NOT NULL
+RETURN chat_uid LIMIT 1000
+"""
+
+
+def empty_summary(chat_uid):
+    """Pending summary of a chat nothing has been recorded for yet"""
+    return {'chat_uid': chat_uid, 'count': 0, 'last_message_at': 0, 'last_message_uid': None, 'buckets': {}}
+
+
+class ChatSummaryWriter:
+    """Per-worker buffer of chat summary updates, flushed every ``interval`` seconds"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}  # Format: {chat_uid: summary row for FLUSH_QUERY}
+        self.counters = {'recorded': 0, 'flushes': 0, 'chats_written': 0, 'orphan_chats_sequenced': 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, chat_uid, message_uid, created_at, preview, message_type, sender, bucket_key=None):
+        """Fold one sent message into the chat's pending summary"""
+        with self._lock:
+            row = self.pending.get(chat_uid)
+            if row is None:
+                row = self.pending[chat_uid] = empty_summary(chat_uid)
+            row['count'] += 1
+            if created_at >= row['last_message_at']:
+                row.update({
+                    'last_message_at': created_at,
+                    'last_message_uid': message_uid,
+                    'last_message_preview': preview,
+                    'last_message_type': message_type,
+                    'last_message_sender_uid': sender.uid,
+                    'last_message_sender_username': sender.username,
+                    'last_message_sender_display_name': sender.display_name
+                })
+            if bucket_key:
+                bucket = row['buckets'].setdefault(bucket_key, {'key': bucket_key, 'count': 0, 'last_at': 0})
+                bucket['count'] += 1
+                bucket['last_at'] = max(bucket['last_at'], created_at)
+            self.counters['recorded'] += 1
+            if self._thread is None:
+                self._start()
+
+    def flush(self):
+        """Write every pending summary now; returns the number of chats written"""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        chats = [{**row, 'buckets': list(row['buckets'].values())} for row in pending.values()]
+        try:
+            db.cypher_query(FLUSH_QUERY, {'chats': chats})
+        except Exception as e:
+            # Keep the updates for the next flush (merged with anything recorded since)
+            print(f"Error flushing {len(chats)} chat summaries: {str(e)}")
+            with self._lock:
+                for row in pending.values():
+                    self._merge_back(row)
+            return 0
+        with self._lock:
+            self.counters['flushes'] += 1
+            self.counters['chats_written'] += len(chats)
+        for chat_uid in pending:
+            publish([chat_topic(chat_uid)], {'type': 'chat.sequenced', 'chat_uid': chat_uid})
+        return len(chats)
+
+    def _merge_back(self, row):
+        current = self.pending.get(row['chat_uid'])
+        if current is None:
+            self.pending[row['chat_uid']] = row
+            return
+        current['count'] += row['count']
+        if row['last_message_at'] > current['last_message_at']:
+            current.update({key: value for key, value in row.items() if key.startswith('last_message')})
+        for key, bucket in row['buckets'].items():
+            merged = current['buckets'].setdefault(key, {'key': key, 'count': 0, 'last_at': 0})
+            merged['count'] += bucket['count']
+            merged['last_at'] = max(merged['last_at'], bucket['last_at'])
+
+    def sweep_orphans(self):
+        """Number the messages of workers that died before flushing them"""
+        try:
+            results, _ = db.cypher_query(ORPHANS_QUERY, {'before': time.time() - ORPHAN_AGE})
+        except Exception as e:
+            print(f"Error looking for unsequenced messages: {str(e)}")
+            return 0
+        if not results:
+            return 0
+        # An empty summary only numbers the chat's Unsequenced messages
+        with self._lock:
+            for (chat_uid,) in results:
+                self.pending.setdefault(chat_uid, empty_summary(chat_uid))
+            self.counters['orphan_chats_sequenced'] += len(results)
+        return self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {'pending_chats': len(self.pending), **self.counters}
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='chat-summary-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        swept_at = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self.flush()
+            if time.monotonic() - swept_at >= ORPHAN_SWEEP_INTERVAL:
+                swept_at = time.monotonic()
+                self.sweep_orphans()
+
+    def close(self):
+        """Stop the background thread and write what is left"""
+        self._stop.set()
+        self.flush()
+
+
+_writer = None
+
+
+def get_summary_writer():
+    """The worker's coalescing writer, or ``None`` when summaries are written by each send"""
+    global _writer
+    interval = settings.CHAT_SUMMARY_FLUSH_INTERVAL / 1000
+    if interval <= 0:
+        return None
+    if _writer is None or _writer.interval != interval:
+        # Follow the setting when it changes (tests override it): write out the old buffer first
+        if _writer is not None:
+            _writer.close()
+        _writer = ChatSummaryWriter(interval)
+    return _writer
@@ -0,0 +1,196 @@
+"""
+In-process catalog of feelings.
+
+There are only a handful of ``Feeling`` and ``FeelingType`` nodes and they
+rarely change (``seed_feelings``, ``FeelingView.post``), so each worker keeps a
+snapshot of all of them - loaded when the server starts - and views resolve and
+serialize feelings from it: listing the feelings, validating a requested
+feeling, connecting a post to its node or matching it by element id inside a
+send statement, and rendering a post's or message's feeling from its name.
+
+Changes are published by bumping a version counter (``CatalogVersion`` node):
+the worker that made the change reloads at once, the others compare versions
+at most every ``FEELING_CATALOG_CHECK_INTERVAL`` seconds and reload when it
+moved. A feeling created on another worker may therefore be unknown here for
+up to that long.
+
+Clients cache the listing over HTTP: every snapshot carries a hash of its
+content, served as the listing's ETag and as the name of an immutable
+snapshot URL (see ``FeelingView``).
+
+Every post or message expressing a feeling used to be linked to one of the
+shared Feeling nodes with ``EXPRESSES_FEELING``. Creating a relationship locks
+both of its nodes, so all writes expressing the same feeling queued up on that
+one node, which also gathered millions of relationships. With
+``FEELING_STORAGE = 'property'`` new posts and messages store the feeling's
+name in an indexed ``feeling_name`` property instead. Reads accept both layouts
+(the property wins), so the setting can be switched before
+``python manage.py migrate_feeling_storage`` converts existing relationships.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from neomodel import db
+
+from .models import Feeling, FeelingType
+
+
+CATALOG_VERSION_NAME = 'feelings'
+
+VERSION_QUERY = """
+OPTIONAL MATCH (v:CatalogVersion {name: $name})
+RETURN coalesce(v.version, 0)
+"""
+
+# The version is read in the same statement as the data it describes
+CATALOG_QUERY = """
+OPTIONAL MATCH (v:CatalogVersion {name: $name})
+CALL {
+    MATCH (t:FeelingType)
+    RETURN collect(t) AS feeling_types
+}
+CALL {
+    MATCH (f:Feeling)
+    OPTIONAL MATCH (f)-[:HAS_TYPE]->(t:FeelingType)
+    WITH f, t ORDER BY f.name
+    RETURN collect({feeling: f, feeling_type: t.name}) AS feelings
+}
+RETURN coalesce(v.version, 0), feeling_types, feelings
+"""
+
+BUMP_VERSION_QUERY = """
+MERGE (v:CatalogVersion {name: $name})
+SET v.version = coalesce(v.version, 0) + 1
+RETURN v.version
+"""
+
+
+class CatalogSnapshot:
+    """One immutable load of the catalog"""
+
+    __slots__ = ('version', 'feelings', 'feeling_types', 'summaries', 'listing', 'content_hash')
+
+    def __init__(self, version, feeling_types, feelings):
+        self.version = version
+        self.feeling_types = {feeling_type.name: feeling_type for feeling_type in feeling_types}
+        self.feelings = {}  # Format: {name: Feeling}
+        self.summaries = {}  # Format: {name: {'name': name, 'color': color}}
+        self.listing = []  # FeelingView.get items, by name
+        for feeling, feeling_type_name in feelings:
+            self.feelings[feeling.name] = feeling
+            self.summaries[feeling.name] = {'name': feeling.name, 'color': feeling.color}
+            self.listing.append({
+                'name': feeling.name,
+                'color': feeling.color,
+                'description': feeling.description,
+                'feeling_type': feeling_type_name
+            })
+        # Identifies the listing, whichever worker loaded it
+        self.content_hash = hashlib.sha256(
+            json.dumps(self.listing, sort_keys=True, separators=(',', ':')).encode()
+        ).hexdigest()[:32]
+
+
+class FeelingCatalog:
+    """Per-worker catalog snapshot, reloaded when the published version changes"""
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """The current snapshot, after checking the version if it is due"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now  # One version check per interval, whatever its outcome
+            results, _ = db.cypher_query(VERSION_QUERY, {'name': CATALOG_VERSION_NAME})
+            if results[0][0] != snapshot.version:
+                return self.reload()
+        return snapshot
+
+    def reload(self):
+        results, _ = db.cypher_query(CATALOG_QUERY, {'name': CATALOG_VERSION_NAME})
+        version, feeling_types, feelings = results[0]
+        snapshot = CatalogSnapshot(
+            version,
+            [FeelingType.inflate(node) for node in feeling_types],
+            [(Feeling.inflate(row['feeling']), row['feeling_type']) for row in feelings]
+        )
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    def publish_change(self):
+        """Bump the version after the catalog changed, and reload this worker's copy"""
+        db.cypher_query(BUMP_VERSION_QUERY, {'name': CATALOG_VERSION_NAME})
+        return self.reload()
+
+
+feeling_catalog = FeelingCatalog(settings.FEELING_CATALOG_CHECK_INTERVAL)
+
+
+def load_feeling_catalog():
+    """Load the catalog when the server starts (it is loaded on first use otherwise)"""
+    try:
+        feeling_catalog.reload()
+    except Exception as e:
+        print(f"Feeling catalog not loaded at startup: {str(e)}")
+
+
+def feeling_catalog_changed():
+    """Publish a change to feelings or feeling types to every worker"""
+    feeling_catalog.publish_change()
+
+
+def feeling_listing():
+    """
+    Every feeling with its color, description and type name, by name, and the
+    hash of that listing
+    """
+    snapshot = feeling_catalog.snapshot()
+    return snapshot.listing, snapshot.content_hash
+
+
+def get_feeling(name):
+    """``{name, color}`` of a feeling by name, or ``None``"""
+    return feeling_catalog.snapshot().summaries.get(name) if name else None
+
+
+def get_feeling_node(name):
+    """The Feeling node with this name, for ``connect()``, or ``None``"""
+    return feeling_catalog.snapshot().feelings.get(name) if name else None
+
+
+def get_feeling_type_node(name):
+    """The FeelingType node with this name, or ``None``"""
+    return feeling_catalog.snapshot().feeling_types.get(name) if name else None
+
+
+def stores_feeling_property():
+    """Whether new posts and messages store their feeling as ``feeling_name``"""
+    return settings.FEELING_STORAGE == 'property'
+
+
+def feeling_params(name):
+    """
+    Query parameters attaching a requested feeling to a new post or message:
+    ``feeling_id`` is the element id of the Feeling to link with
+    EXPRESSES_FEELING, ``stored_feeling_name`` is set as the node's property.
+    Only one of them is used, depending on FEELING_STORAGE; unknown feelings
+    are neither linked nor stored.
+    """
+    feeling = get_feeling_node(name)
+    if feeling is None:
+        return {'feeling_id': None, 'stored_feeling_name': None}
+    if stores_feeling_property():
+        return {'feeling_id': None, 'stored_feeling_name': feeling.name}
+    return {'feeling_id': feeling.element_id, 'stored_feeling_name': None}
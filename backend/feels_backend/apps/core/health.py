@@ -4,6 +4,10 @@ from neomodel import db
 import time
 from drf_spectacular.utils import extend_schema
 
+from .chat_summary import get_summary_writer
+from .realtime import get_broker
+from .token_store import get_token_store
+
 class HealthCheckView(APIView):
     @extend_schema(
         summary="Health Check",
@@ -16,7 +20,10 @@ class HealthCheckView(APIView):
                     "timestamp": 1640995200.0,
                     "services": {
                         "neo4j": {"status": "healthy", "response_time_ms": 12.34},
-                        "django": {"status": "healthy", "version": "5.2"}
+                        "django": {"status": "healthy", "version": "5.2"},
+                        "auth_tokens": {"live": 1520, "expired": 312, "evicted": 0, "revoked": 41, "cached": 87},
+                        "realtime": {"topics": 240, "subscriptions": 251, "published": 9120, "delivered": 17433},
+                        "chat_summaries": {"pending_chats": 3, "recorded": 5210, "flushes": 812, "chats_written": 1630}
                     }
                 }
             },
@@ -63,4 +70,18 @@ class HealthCheckView(APIView):
             "version": "5.2"
         }
         
+        # Token store counters (live / expired / evicted tokens) for monitoring
+        try:
+            health_status["services"]["auth_tokens"] = get_token_store().stats()
+        except Exception as e:
+            health_status["services"]["auth_tokens"] = {"error": str(e)}
+        
+        # Connected push clients in this worker
+        health_status["services"]["realtime"] = get_broker().stats()
+        
+        # Coalesced chat summaries waiting to be written by this worker
+        summary_writer = get_summary_writer()
+        if summary_writer:
+            health_status["services"]["chat_summaries"] = summary_writer.stats()
+        
         return Response(health_status, status=200 if health_status["status"] == "healthy" else 503)
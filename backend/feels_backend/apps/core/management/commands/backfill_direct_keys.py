@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+
+# Give the 1:1 chats of one batch (walked in uid order) their canonical
+# participant-pair key. When duplicates of the same pair already exist, only
+# the first one keeps the key - the others stay readable but are no longer
+# returned by "open chat with X". The subquery runs per chat, so a duplicate
+# later in the same batch sees the key set by an earlier one.
+BACKFILL_BATCH = """
+MATCH (c:Chat) WHERE c.uid > $after
+WITH c ORDER BY c.uid LIMIT $batch
+CALL {
+    WITH c
+    WITH c, COLLECT { MATCH (a:Account)-[:PARTICIPATES_IN]->(c) RETURN a.uid ORDER BY a.uid } AS members
+    WHERE c.direct_key IS NULL AND NOT coalesce(c.is_group_chat, false) AND size(members) = 2
+    WITH c, members[0] + ':' + members[1] AS key
+    WHERE NOT EXISTS { MATCH (:Chat {direct_key: key}) }
+    SET c.direct_key = key
+    RETURN count(c) AS keyed
+}
+RETURN count(c), max(c.uid), sum(keyed)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Set the direct_key of existing 1:1 chats so new requests reuse them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Chats examined per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        after = ''
+        examined = keyed = 0
+        while True:
+            results, _ = db.cypher_query(BACKFILL_BATCH, {'after': after, 'batch': options['batch_size']})
+            batch_examined, last_uid, batch_keyed = results[0]
+            examined += batch_examined
+            keyed += batch_keyed
+            self.stdout.write(f'Examined {examined} chats', ending='\r')
+            if batch_examined < options['batch_size']:
+                break
+            after = last_uid
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Keyed {keyed} direct chats out of {examined}'))
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+from apps.core.management.commands.install_labels import install_composite_indexes
+
+
+# Chats in uid order
+CHATS_BATCH = """
+MATCH (c:Chat) WHERE c.uid > $after
+WITH c ORDER BY c.uid LIMIT $batch
+RETURN collect(c.uid)
+"""
+
+# Number the oldest batch of one chat's messages that have no sequence number
+# yet, in either layout. Until its history is numbered a chat has no last_seq,
+# and the send path leaves its new messages unnumbered too (they are numbered
+# here, after the older ones); progress is kept in backfilled_seq meanwhile.
+# The first SET takes the chat's lock, so the last batch - the one that is not
+# full - sees every message sent so far and hands last_seq to the send path in
+# the same transaction.
+SEQUENCE_BATCH = """
+MATCH (c:Chat {uid: $chat_uid})
+WHERE c.last_seq IS NULL
+SET c.backfilled_seq = coalesce(c.backfilled_seq, 0)
+WITH c
+CALL {
+    WITH c
+    CALL {
+        WITH c
+        MATCH (m:Message)-[:SENT_TO]->(c)
+        WHERE m.seq IS NULL
+        RETURN m
+        UNION
+        WITH c
+        MATCH (m:Message)-[:IN_BUCKET]->(:MessageBucket)-[:BUCKET_OF]->(c)
+        WHERE m.seq IS NULL
+        RETURN m
+    }
+    WITH m ORDER BY m.created_at, m.uid LIMIT $batch
+    RETURN collect(m) AS batch
+}
+WITH c, batch, c.backfilled_seq AS base
+SET c.backfilled_seq = base + size(batch)
+WITH c, batch, base
+CALL {
+    WITH c, batch, base
+    UNWIND range(0, size(batch) - 1) AS i
+    WITH c, batch[i] AS m, base + i + 1 AS seq
+    SET m.seq = seq, m.chat_uid = c.uid
+    REMOVE m:Unsequenced
+}
+FOREACH (_ IN CASE WHEN size(batch) < $batch THEN [1] ELSE [] END |
+    SET c.last_seq = c.backfilled_seq
+    REMOVE c.backfilled_seq)
+RETURN size(batch)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Number the messages of chats created before sequence numbers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Messages numbered per transaction (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        # Normally created by install_labels; the sync query needs it
+        install_composite_indexes()
+
+        after = ''
+        total = 0
+        while True:
+            results, _ = db.cypher_query(CHATS_BATCH, {'after': after, 'batch': 500})
+            chat_uids = results[0][0]
+            for chat_uid in chat_uids:
+                while True:
+                    results, _ = db.cypher_query(SEQUENCE_BATCH, {'chat_uid': chat_uid, 'batch': options['batch_size']})
+                    numbered = results[0][0] if results else 0
+                    total += numbered
+                    self.stdout.write(f'Numbered {total} messages', ending='\r')
+                    if numbered < options['batch_size']:
+                        break
+            if len(chat_uids) < 500:
+                break
+            after = chat_uids[-1]
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Numbered {total} messages'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+
+# Participants without a watermark have read up to the newest message they sent
+# or that carries the legacy Message.is_read flag (0 when there is none).
+# Batches walk the chats in uid order (keyset on the Chat.uid index), so each
+# batch only touches its own chats' relationships instead of rescanning every
+# PARTICIPATES_IN for the ones still missing a watermark.
+BACKFILL_BATCH = """
+MATCH (c:Chat) WHERE c.uid > $after
+WITH c ORDER BY c.uid LIMIT $batch
+CALL {
+    WITH c
+    MATCH (a:Account)-[r:PARTICIPATES_IN]->(c)
+    WHERE r.last_read_at IS NULL
+    CALL {
+        WITH a, c
+        OPTIONAL MATCH (m:Message)-[:SENT_TO]->(c)
+        WHERE coalesce(m.is_read, false) OR (m)-[:SENT_BY]->(a)
+        RETURN max(m.created_at) AS read_until
+    }
+    SET r.last_read_at = coalesce(read_until, 0.0)
+    RETURN count(r) AS updated
+}
+RETURN count(c), max(c.uid), sum(updated)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Initialize PARTICIPATES_IN read watermarks from the legacy Message.is_read flags'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Chats whose relationships are updated per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        after = ''
+        total = 0
+        while True:
+            results, _ = db.cypher_query(BACKFILL_BATCH, {'after': after, 'batch': options['batch_size']})
+            chats, last_uid, updated = results[0]
+            total += updated
+            if chats < options['batch_size']:
+                break
+            after = last_uid
+        self.stdout.write(self.style.SUCCESS(f'Initialized {total} read watermarks'))
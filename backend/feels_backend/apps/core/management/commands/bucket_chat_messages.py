@@ -0,0 +1,156 @@
+from django.core.management.base import BaseCommand, CommandError
+from neomodel import db
+
+
+# Chats still in the flat layout with at least $min_messages messages, in uid order
+CANDIDATES_BATCH = """
+MATCH (c:Chat) WHERE c.uid > $after
+WITH c ORDER BY c.uid LIMIT $batch
+RETURN c.uid, NOT coalesce(c.bucketed, false) AND coalesce(c.message_count, 0) >= $min_messages
+"""
+
+# Copy one batch of a flat chat's messages into per-day buckets. SENT_TO is
+# kept, so the chat keeps being served from the flat layout meanwhile.
+BUCKET_BATCH = """
+MATCH (c:Chat {uid: $chat_uid})<-[:SENT_TO]-(m:Message)
+WHERE NOT EXISTS { (m)-[:IN_BUCKET]->() }
+WITH c, m LIMIT $batch
+WITH c, m, toInteger(floor(m.created_at / 86400)) AS day
+MERGE (b:MessageBucket {key: c.uid + ':' + toString(day)})
+ON CREATE SET b.day = day, b.first_at = m.created_at, b.last_at = m.created_at, b.message_count = 0
+MERGE (b)-[:BUCKET_OF]->(c)
+SET b.first_at = CASE WHEN m.created_at < b.first_at THEN m.created_at ELSE b.first_at END,
+    b.last_at = CASE WHEN m.created_at > b.last_at THEN m.created_at ELSE b.last_at END,
+    b.message_count = b.message_count + 1
+CREATE (m)-[:IN_BUCKET]->(b)
+RETURN count(m)
+"""
+
+# Switch the chat to the bucketed layout. Setting the flag first takes the
+# chat's write lock, which the send path also takes, so messages sent since the
+# last batch are bucketed here and every later send sees the finished chain.
+# Coalesced sends (CHAT_SUMMARY_FLUSH_INTERVAL) never take that lock: one that
+# read the flat layout while this ran still links its message with SENT_TO
+# once this has committed. Running the statement again buckets such stragglers
+# (it returns how many) and relinks the chain around any bucket they opened.
+SWITCH_LAYOUT = """
+MATCH (c:Chat {uid: $chat_uid})
+SET c.bucketed = true
+WITH c
+CALL {
+    WITH c
+    MATCH (c)<-[:SENT_TO]-(m:Message)
+    WHERE NOT EXISTS { (m)-[:IN_BUCKET]->() }
+    WITH c, m, toInteger(floor(m.created_at / 86400)) AS day
+    MERGE (b:MessageBucket {key: c.uid + ':' + toString(day)})
+    ON CREATE SET b.day = day, b.first_at = m.created_at, b.last_at = m.created_at, b.message_count = 0
+    MERGE (b)-[:BUCKET_OF]->(c)
+    SET b.first_at = CASE WHEN m.created_at < b.first_at THEN m.created_at ELSE b.first_at END,
+        b.last_at = CASE WHEN m.created_at > b.last_at THEN m.created_at ELSE b.last_at END,
+        b.message_count = b.message_count + 1
+    CREATE (m)-[:IN_BUCKET]->(b)
+    RETURN count(m) AS stragglers
+}
+CALL {
+    WITH c
+    MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+    WITH b ORDER BY b.day
+    WITH collect(b) AS buckets
+    UNWIND range(1, size(buckets) - 1) AS i
+    WITH buckets[i] AS newer, buckets[i - 1] AS older
+    OPTIONAL MATCH (newer)-[stale:PREVIOUS_BUCKET]->(other)
+    WHERE other <> older
+    DELETE stale
+    WITH DISTINCT newer, older
+    MERGE (newer)-[:PREVIOUS_BUCKET]->(older)
+}
+OPTIONAL MATCH (c)-[old:LATEST_BUCKET]->()
+DELETE old
+WITH DISTINCT c, stragglers
+CALL {
+    WITH c
+    MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+    WITH c, b ORDER BY b.day DESC LIMIT 1
+    CREATE (c)-[:LATEST_BUCKET]->(b)
+}
+RETURN COUNT { (:MessageBucket)-[:BUCKET_OF]->(c) }, stragglers
+"""
+
+# Drop one batch of the now unused SENT_TO relationships. Only messages that
+# are already in a bucket are unlinked; stragglers keep SENT_TO until
+# SWITCH_LAYOUT has bucketed them.
+UNLINK_BATCH = """
+MATCH (:Chat {uid: $chat_uid, bucketed: true})<-[r:SENT_TO]-(m:Message)
+WHERE EXISTS { (m)-[:IN_BUCKET]->() }
+WITH r LIMIT $batch
+DELETE r
+RETURN count(r)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Move the messages of busy chats into per-day MessageBucket nodes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'chat_uids',
+            nargs='*',
+            help='Chats to convert (default: every flat chat with at least --min-messages messages)',
+        )
+        parser.add_argument(
+            '--min-messages',
+            type=int,
+            default=10000,
+            help='Only convert chats with at least this many messages (default: 10000)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Messages moved per transaction (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        chat_uids = options['chat_uids'] or self.candidates(options['min_messages'])
+        for chat_uid in chat_uids:
+            self.convert(chat_uid, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Converted {len(chat_uids)} chats to the bucketed layout'))
+
+    def candidates(self, min_messages):
+        after = ''
+        chat_uids = []
+        while True:
+            results, _ = db.cypher_query(CANDIDATES_BATCH, {'after': after, 'batch': 1000, 'min_messages': min_messages})
+            chat_uids.extend(uid for uid, eligible in results if eligible)
+            if len(results) < 1000:
+                return chat_uids
+            after = results[-1][0]
+
+    def convert(self, chat_uid, batch_size):
+        params = {'chat_uid': chat_uid, 'batch': batch_size}
+        moved = 0
+        while True:
+            results, _ = db.cypher_query(BUCKET_BATCH, params)
+            moved += results[0][0]
+            self.stdout.write(f'{chat_uid}: bucketed {moved} messages', ending='\r')
+            if results[0][0] < batch_size:
+                break
+
+        results, _ = db.cypher_query(SWITCH_LAYOUT, params)
+        if not results:
+            raise CommandError(f'Chat {chat_uid} not found')
+
+        # Unlink, then bucket whatever coalesced sends linked in the meantime,
+        # until a pass finds no stragglers
+        while True:
+            while True:
+                results, _ = db.cypher_query(UNLINK_BATCH, params)
+                if results[0][0] < batch_size:
+                    break
+            results, _ = db.cypher_query(SWITCH_LAYOUT, params)
+            buckets, stragglers = results[0]
+            if not stragglers:
+                break
+            self.stdout.write(f'{chat_uid}: bucketed {stragglers} messages sent during the switch', ending='\r')
+        self.stdout.write('')
+        self.stdout.write(f'{chat_uid}: {buckets} buckets')
@@ -0,0 +1,21 @@
+from django_neomodel.management.commands.install_labels import Command as InstallLabelsCommand
+from neomodel import db
+
+from apps.core.models import COMPOSITE_INDEXES
+
+
+def install_composite_indexes(stdout=None):
+    """Create the indexes of COMPOSITE_INDEXES that do not exist yet"""
+    for name, (model, properties) in COMPOSITE_INDEXES.items():
+        columns = ', '.join(f'n.{prop}' for prop in properties)
+        db.cypher_query(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{model.__label__}) ON ({columns})")
+        if stdout:
+            stdout.write(f" + Composite index {name} on {model.__label__}({', '.join(properties)})\n")
+
+
+class Command(InstallLabelsCommand):
+    help = 'Install labels, indexes and constraints, including composite indexes'
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        install_composite_indexes(stdout=self.stdout)
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+
+# Store one batch of linked feelings on their post or message and drop the
+# relationship (a feeling already stored on the node wins)
+TO_PROPERTY_BATCH = """
+MATCH (n)-[r:EXPRESSES_FEELING]->(f:Feeling)
+WITH n, r, f LIMIT $batch
+SET n.feeling_name = coalesce(n.feeling_name, f.name)
+DELETE r
+RETURN count(r)
+"""
+
+# Link one batch of stored feelings back to their Feeling node and drop the
+# property (feelings that no longer exist are dropped)
+TO_RELATIONSHIP_BATCH = """
+MATCH (n:{label}) WHERE n.feeling_name IS NOT NULL
+WITH n LIMIT $batch
+OPTIONAL MATCH (f:Feeling {{name: n.feeling_name}})
+FOREACH (_ IN CASE WHEN f IS NULL THEN [] ELSE [1] END | MERGE (n)-[:EXPRESSES_FEELING]->(f))
+REMOVE n.feeling_name
+RETURN count(n)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Convert the feelings of posts and messages between EXPRESSES_FEELING relationships and the feeling_name property'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to',
+            choices=['property', 'relationship'],
+            default='property',
+            help='Layout to convert to (default: property)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Posts and messages converted per transaction (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        if settings.FEELING_STORAGE != options['to']:
+            self.stdout.write(self.style.WARNING(
+                f"FEELING_STORAGE is '{settings.FEELING_STORAGE}': new posts and messages are still "
+                f"written in that layout. Set FEELING_STORAGE={options['to']} and restart the app first."
+            ))
+
+        if options['to'] == 'property':
+            queries = [TO_PROPERTY_BATCH]
+        else:
+            queries = [TO_RELATIONSHIP_BATCH.format(label=label) for label in ('Post', 'Message')]
+
+        total = 0
+        for query in queries:
+            while True:
+                results, _ = db.cypher_query(query, {'batch': options['batch_size']})
+                converted = results[0][0]
+                total += converted
+                self.stdout.write(f'Converted {total} feelings', ending='\r')
+                if converted < options['batch_size']:
+                    break
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f"Converted {total} feelings to the {options['to']} layout"))
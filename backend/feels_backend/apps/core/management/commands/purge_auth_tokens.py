@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from apps.core.token_store import get_token_store
+
+
+class Command(BaseCommand):
+    help = 'Delete expired authentication tokens from the token store (oldest first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of expired tokens to delete (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        store = get_token_store()
+        removed = store.purge_expired(options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired tokens'))
+        self.stdout.write(f'Token store stats: {store.stats()}')
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+
+# Recompute message_count, the last-message summary and the LAST_MESSAGE link of
+# one batch of chats (walked in uid order) from their messages, in either layout
+# (UNION also dedupes messages of a chat that is being bucketed).
+REPAIR_BATCH = """
+MATCH (c:Chat) WHERE c.uid > $after
+WITH c ORDER BY c.uid LIMIT $batch
+CALL {
+    WITH c
+    CALL {
+        WITH c
+        MATCH (m:Message)-[:SENT_TO]->(c)
+        RETURN m
+        UNION
+        WITH c
+        MATCH (m:Message)-[:IN_BUCKET]->(:MessageBucket)-[:BUCKET_OF]->(c)
+        RETURN m
+    }
+    WITH m ORDER BY m.created_at DESC
+    RETURN count(m) AS total, head(collect(m)) AS last
+}
+OPTIONAL MATCH (last)-[:SENT_BY]->(s:Account)
+OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+DELETE old
+WITH DISTINCT c, total, last, s
+SET c.message_count = total,
+    c.last_message_at = coalesce(last.created_at, c.last_message_at),
+    c.last_message_uid = last.uid,
+    c.last_message_preview = left(last.text, $preview_length),
+    c.last_message_type = last.message_type,
+    c.last_message_sender_uid = s.uid,
+    c.last_message_sender_username = s.username,
+    c.last_message_sender_display_name = s.display_name
+FOREACH (_ IN CASE WHEN last IS NULL THEN [] ELSE [1] END | CREATE (c)-[:LAST_MESSAGE]->(last))
+RETURN count(DISTINCT c), max(c.uid)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized message count and last-message summary of every chat'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Chats repaired per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        after = ''
+        total = 0
+        while True:
+            results, _ = db.cypher_query(REPAIR_BATCH, {
+                'after': after,
+                'batch': options['batch_size'],
+                'preview_length': settings.CHAT_PREVIEW_LENGTH
+            })
+            repaired, last_uid = results[0]
+            total += repaired
+            self.stdout.write(f'Repaired {total} chats', ending='\r')
+            if repaired < options['batch_size']:
+                break
+            after = last_uid
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Repaired {total} chat summaries'))
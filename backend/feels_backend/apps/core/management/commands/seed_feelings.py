@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from apps.core.feeling_catalog import feeling_catalog_changed
 from apps.core.models import Feeling, FeelingType
 
 
@@ -67,6 +68,9 @@ class Command(BaseCommand):
             feelings[feeling_data['name']] = feeling
             self.stdout.write(f'Created feeling: {feeling_data["name"]} ({feeling_data["color"]})')
         
+        # Running servers reload their feeling catalogs
+        feeling_catalog_changed()
+        
         self.stdout.write(
             self.style.SUCCESS(
                 'Successfully populated database with:\n'
@@ -1,11 +1,22 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from apps.core.feeling_catalog import stores_feeling_property
 from apps.core.models import Account, Feeling, Post, Chat, Message
+from apps.core.views.chat_view import direct_chat_key
 import hashlib
 
 
 class Command(BaseCommand):
     help = 'Populate the database with sample users, posts, and interactions'
 
+    def attach_feeling(self, node, feeling):
+        """Link the feeling to a post or message, or store it on it (FEELING_STORAGE)"""
+        if stores_feeling_property():
+            node.feeling_name = feeling.name
+            node.save()
+        else:
+            node.feeling.connect(feeling)
+
     def handle(self, *args, **options):
         self.stdout.write('Starting to populate users and content...')
         
@@ -85,7 +96,7 @@ class Command(BaseCommand):
             
             # Connect to feeling
             feeling = feelings[post_data['feeling']]
-            post.feeling.connect(feeling)
+            self.attach_feeling(post, feeling)
             
             # Update author's feelings shared count
             author.feelings_shared_count += 1
@@ -96,7 +107,8 @@ class Command(BaseCommand):
         # Create a sample chat
         chat1 = Chat(
             name="Alice and bob",
-            is_group_chat=False
+            is_group_chat=False,
+            direct_key=direct_chat_key(alice.uid, bob.uid)
         ).save()
         
         # Add participants
@@ -113,10 +125,12 @@ class Command(BaseCommand):
 
         last_msg = None
         
-        for msg_data in messages1_data:
+        for seq, msg_data in enumerate(messages1_data, start=1):
             message = Message(
                 text=msg_data['text'],
-                message_type='feeling' if 'feeling' in msg_data else 'text'
+                message_type='feeling' if 'feeling' in msg_data else 'text',
+                chat_uid=chat1.uid,
+                seq=seq
             ).save()
             
             message.sender.connect(msg_data['sender'])
@@ -124,17 +138,21 @@ class Command(BaseCommand):
             
             if 'feeling' in msg_data:
                 feeling = feelings[msg_data['feeling']]
-                message.feeling.connect(feeling)
+                self.attach_feeling(message, feeling)
 
             last_msg = message
 
         chat1.last_message.connect(last_msg)
+        chat1.last_seq = len(messages1_data)
+        chat1.save()
         
         self.stdout.write('Created sample chat and messages')
 
         chat2 = Chat(
             name="Alice and charlie",
-            is_group_chat=False
+            is_group_chat=False,
+            direct_key=direct_chat_key(alice.uid, charlie.uid),
+            last_seq=1
         ).save()
 
         chat2.participants.connect(alice)
@@ -142,14 +160,22 @@ class Command(BaseCommand):
 
         message2 = Message(
             text = "Hey! Did you get home safe last night?",
-            message_type = 'feeling'
+            message_type = 'feeling',
+            chat_uid = chat2.uid,
+            seq = 1
         ).save()
 
         message2.sender.connect(charlie)
         message2.chat.connect(chat2)
-        message2.feeling.connect(feelings["Anxious"])
+        self.attach_feeling(message2, feelings["Anxious"])
         chat2.last_message.connect(message2)
         
+        # Chats built through the models lack what the send path maintains:
+        # the denormalized summary (message count, last message) and the
+        # participants' read watermarks
+        call_command('repair_chat_summaries')
+        call_command('backfill_read_watermarks')
+        
         self.stdout.write(
             self.style.SUCCESS(
                 'Successfully populated database with:\n'
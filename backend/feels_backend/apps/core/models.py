@@ -1,5 +1,5 @@
 from neomodel import (
-    StructuredNode, StringProperty, IntegerProperty, DateTimeProperty,
+    StructuredNode, StructuredRel, StringProperty, IntegerProperty, DateTimeProperty,
     FloatProperty, RelationshipTo, RelationshipFrom, Relationship,
     UniqueIdProperty, ArrayProperty, BooleanProperty
 )
@@ -29,6 +29,26 @@ class Feeling(StructuredNode):
     feeling_type = RelationshipTo(FeelingType, 'HAS_TYPE')
 
 
+class CatalogVersion(StructuredNode):
+    """
+    Version counter of a catalog cached in every worker (e.g. 'feelings', see
+    apps/core/feeling_catalog.py), bumped whenever the catalog changes
+    """
+    name = StringProperty(unique_index=True, required=True)
+    version = IntegerProperty(default=0)
+
+
+class ParticipationRel(StructuredRel):
+    """
+    Account -[:PARTICIPATES_IN]-> Chat, carrying the participant's read watermark
+    Every message created at or before last_read_at counts as read by this participant;
+    last_read_seq is the same watermark as a sequence number (Message.seq), for
+    clients that sync with after_seq.
+    """
+    last_read_at = DateTimeProperty()
+    last_read_seq = IntegerProperty()
+
+
 class Account(StructuredNode):
     """
     User account model with statistics tracking
@@ -54,7 +74,7 @@ class Account(StructuredNode):
     friends = Relationship('Account', 'FRIENDS_WITH')
     sent_friend_requests = RelationshipTo('Account', 'SENT_FRIEND_REQUEST')
     received_friend_requests = RelationshipFrom('Account', 'SENT_FRIEND_REQUEST')
-    chat_participants = RelationshipTo('Chat', 'PARTICIPATES_IN')
+    chat_participants = RelationshipTo('Chat', 'PARTICIPATES_IN', model=ParticipationRel)
 
 
 class FriendRequest(StructuredNode):
@@ -82,8 +102,9 @@ class Post(StructuredNode):
     """
     uid = UniqueIdProperty()
     body = StringProperty(required=True)
-    created_at = DateTimeProperty(default_now=True)
+    created_at = DateTimeProperty(default_now=True, index=True)  # Range index for keyset pagination
     updated_at = DateTimeProperty()
+    feeling_name = StringProperty(index=True)  # Instead of EXPRESSES_FEELING, see apps/core/feeling_catalog.py
     
     # Relationships
     author = RelationshipTo(Account, 'CREATED_BY')
@@ -100,11 +121,31 @@ class Chat(StructuredNode):
     is_group_chat = BooleanProperty(default=False)
     created_at = DateTimeProperty(default_now=True)
     last_message_at = DateTimeProperty()
+    # Canonical "<uid>:<uid>" pair (sorted) of a 1:1 chat, so opening a chat with
+    # someone returns the existing one; group chats have none
+    direct_key = StringProperty(unique_index=True)
+    # Message layout: False - messages hang off the chat via SENT_TO; True - they
+    # are grouped in per-day MessageBucket nodes (see MessageBucket)
+    bucketed = BooleanProperty(default=False)
+    
+    # Denormalized summary, updated by the send path in the same transaction
+    # (``python manage.py repair_chat_summaries`` recomputes it)
+    message_count = IntegerProperty(default=0)
+    # Sequence number of the newest message; None for chats created before
+    # sequence numbers until ``python manage.py backfill_message_seq`` numbered them
+    last_seq = IntegerProperty(default=0)
+    last_message_uid = StringProperty()
+    last_message_preview = StringProperty()  # First CHAT_PREVIEW_LENGTH characters
+    last_message_type = StringProperty()
+    last_message_sender_uid = StringProperty()
+    last_message_sender_username = StringProperty()
+    last_message_sender_display_name = StringProperty()
     
     # Relationships
-    participants = RelationshipFrom(Account, 'PARTICIPATES_IN')
+    participants = RelationshipFrom(Account, 'PARTICIPATES_IN', model=ParticipationRel)
     messages = RelationshipFrom('Message', 'SENT_TO')
     last_message = RelationshipTo('Message', 'LAST_MESSAGE')
+    latest_bucket = RelationshipTo('MessageBucket', 'LATEST_BUCKET')
 
 
 class Message(StructuredNode):
@@ -118,10 +159,67 @@ class Message(StructuredNode):
         'feeling': 'Feeling',
         'image': 'Image'
     }, default='text')
-    created_at = DateTimeProperty(default_now=True)
-    is_read = BooleanProperty(default=False)
+    created_at = DateTimeProperty(default_now=True, index=True)  # Range index for keyset pagination
+    is_read = BooleanProperty(default=False)  # Legacy flag - read state lives on PARTICIPATES_IN.last_read_at
+    # Position in the chat, increasing with every message (Chat.last_seq holds the
+    # latest); (chat_uid, seq) has a composite index (COMPOSITE_INDEXES) for
+    # incremental sync. Messages sent with coalesced summaries carry an
+    # Unsequenced label until they are numbered.
+    chat_uid = StringProperty(index=True)
+    seq = IntegerProperty()
+    feeling_name = StringProperty(index=True)  # Instead of EXPRESSES_FEELING, see apps/core/feeling_catalog.py
     
     # Relationships
     sender = RelationshipTo(Account, 'SENT_BY')
-    chat = RelationshipTo(Chat, 'SENT_TO')
-    feeling = RelationshipTo(Feeling, 'EXPRESSES_FEELING')  # OPTIONAL 
\ No newline at end of file
+    chat = RelationshipTo(Chat, 'SENT_TO')  # Flat layout only
+    bucket = RelationshipTo('MessageBucket', 'IN_BUCKET')  # Bucketed layout only
+    feeling = RelationshipTo(Feeling, 'EXPRESSES_FEELING')  # OPTIONAL 
+
+
+class MessageBucket(StructuredNode):
+    """
+    One UTC day of a bucketed chat's messages
+    Spreads a busy chat's messages over many small nodes instead of one
+    supernode: (Message)-[:IN_BUCKET]->(MessageBucket)-[:BUCKET_OF]->(Chat),
+    with (Chat)-[:LATEST_BUCKET]->(newest)-[:PREVIOUS_BUCKET]->(older)...
+    linking the buckets newest-first for pagination.
+    """
+    key = StringProperty(unique_index=True)  # "<chat uid>:<day>"
+    day = IntegerProperty()  # Days since the Unix epoch
+    first_at = DateTimeProperty()  # Oldest and newest message in the bucket
+    last_at = DateTimeProperty()
+    message_count = IntegerProperty(default=0)
+    opened_by = StringProperty()  # Message that created the bucket (coalesced summaries)
+    
+    # Relationships
+    chat = RelationshipTo(Chat, 'BUCKET_OF')
+    previous = RelationshipTo('MessageBucket', 'PREVIOUS_BUCKET')
+
+
+class AuthSession(StructuredNode):
+    """
+    Persistent authentication token shared by all workers
+    Only a SHA-256 digest of the token is stored (see token_store.py)
+    """
+    token_key = StringProperty(unique_index=True, required=True)
+    user_uid = StringProperty(index=True, required=True)
+    created_at = FloatProperty(index=True, required=True)  # Epoch seconds, orders eviction
+    last_seen_at = FloatProperty()  # Epoch seconds, updated at most every AUTH_SESSION_TOUCH_INTERVAL
+    expires_at = FloatProperty(index=True, required=True)  # Epoch seconds
+
+
+class RevokedToken(StructuredNode):
+    """
+    Deny-list entry for a revoked refresh token (signed token mode)
+    Kept until access tokens minted from the refresh token can no longer be valid
+    """
+    rid = StringProperty(unique_index=True, required=True)
+    revoked_at = FloatProperty(index=True, required=True)  # Epoch seconds
+    expires_at = FloatProperty(index=True, required=True)  # Epoch seconds
+
+
+# Indexes over several properties, which neomodel cannot declare on a property;
+# ``python manage.py install_labels`` creates them along with the others
+COMPOSITE_INDEXES = {
+    'message_chat_seq': (Message, ('chat_uid', 'seq')),  # GET messages/?after_seq=N
+}
@@ -0,0 +1,43 @@
+"""
+Cursor (keyset) pagination helpers shared by the list endpoints.
+
+A cursor is an opaque URL-safe token encoding the raw ``created_at`` value
+(epoch float, as stored by neomodel) and the ``uid`` of a boundary item, so the
+next page can be selected with a range predicate pushed into Cypher instead of
+loading and slicing the whole collection in Python.
+"""
+import base64
+import json
+
+from django.conf import settings
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a malformed cursor"""
+
+
+def encode_cursor(created_at, uid):
+    """Encode a (created_at, uid) keyset position as an opaque cursor"""
+    payload = json.dumps([created_at, uid], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor back into a (created_at, uid) tuple"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, uid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(created_at), str(uid)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+
+
+def parse_limit(value, default, maximum=None):
+    """Parse a ``limit`` query parameter, clamped to the configured page-size ceiling"""
+    maximum = maximum or settings.MAX_PAGE_SIZE
+    if value in (None, ''):
+        return min(default, maximum)
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
@@ -0,0 +1,81 @@
+"""
+Read queries shared by several views.
+Each helper costs a single Cypher round-trip and returns projections ready to be
+serialized, so callers never follow relationships node by node.
+"""
+from neomodel import db
+
+from .feeling_catalog import get_feeling
+from .models import Post
+
+
+# Posts of one author, newest first, with the feeling's name projected alongside
+# (rendered from the feeling catalog).
+# Access is resolved in the same query: viewers may read their own posts and
+# their friends' posts; otherwise no posts are returned.
+AUTHOR_POSTS_QUERY = """
+MATCH (author:Account {uid: $author_uid})
+WITH author,
+     author.uid = $viewer_uid
+     OR EXISTS { (author)-[:FRIENDS_WITH]-(:Account {uid: $viewer_uid}) } AS allowed
+CALL {
+    WITH author, allowed
+    MATCH (p:Post)-[:CREATED_BY]->(author)
+    WHERE allowed
+      AND ($cursor_ts IS NULL OR p.created_at < $cursor_ts
+           OR (p.created_at = $cursor_ts AND p.uid < $cursor_uid))
+    WITH p
+    ORDER BY p.created_at DESC, p.uid DESC
+    LIMIT $limit
+    OPTIONAL MATCH (p)-[:EXPRESSES_FEELING]->(f:Feeling)
+    WHERE p.feeling_name IS NULL
+    RETURN collect({
+        post: p,
+        created_at: p.created_at,
+        feeling_name: coalesce(p.feeling_name, f.name)
+    }) AS page
+}
+RETURN author {.uid, .username, .display_name} AS author, allowed, page
+"""
+
+
+def get_author_posts(viewer_uid, author_uid, limit, cursor=None):
+    """
+    Fetch one page of an author's posts as seen by ``viewer_uid``.
+
+    Returns ``(author, allowed, posts, next_cursor_key)`` or ``None`` when the
+    author does not exist. ``posts`` are serialized dicts, newest first, and
+    ``next_cursor_key`` is the (created_at, uid) of the last post when another
+    page exists.
+    """
+    cursor_ts, cursor_uid = cursor or (None, None)
+    results, _ = db.cypher_query(AUTHOR_POSTS_QUERY, {
+        'author_uid': author_uid,
+        'viewer_uid': viewer_uid,
+        'cursor_ts': cursor_ts,
+        'cursor_uid': cursor_uid,
+        # Fetch one extra row to know whether there is another page
+        'limit': limit + 1
+    })
+    if not results:
+        return None
+
+    author, allowed, page = results[0]
+    page.sort(key=lambda row: (row['created_at'], row['post'].get('uid')), reverse=True)
+
+    next_cursor_key = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor_key = (page[-1]['created_at'], page[-1]['post'].get('uid'))
+
+    posts = []
+    for row in page:
+        post = Post.inflate(row['post'])
+        posts.append({
+            'uid': post.uid,
+            'body': post.body,
+            'created_at': str(post.created_at),
+            'author': author,
+            'feeling': get_feeling(row['feeling_name'])
+        })
+    return author, allowed, posts, next_cursor_key
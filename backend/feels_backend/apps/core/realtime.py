@@ -0,0 +1,152 @@
+"""
+Real-time event fan-out for push clients.
+
+Write paths (sending a message, reading a chat, friend requests) publish small
+JSON events to topics; connected clients subscribe to topics through the
+Server-Sent Events endpoint (``GET /api/events/``) instead of polling.
+
+Topics:
+- ``user:<uid>``: everything addressed to one account (new messages in their
+  chats, read receipts, friend requests).
+- ``chat:<uid>``: new messages in one chat (used by long-polling).
+
+The broker is chosen by the ``REALTIME_BROKER`` setting. ``InProcessBroker``
+delivers to subscribers of the current process only, which is enough for a
+single ASGI worker. To fan out across workers, subclass ``BaseBroker`` so that
+``publish`` writes to a shared bus (Redis pub/sub, NATS...) and every worker
+feeds what it receives from the bus into ``deliver``.
+
+Subscribers live on the ASGI event loop; ``publish`` may be called from the
+synchronous view threads, so delivery hops onto the subscriber's loop with
+``call_soon_threadsafe``. Each subscription has a bounded queue - a client
+that falls ``REALTIME_QUEUE_SIZE`` events behind is disconnected and expected
+to reconnect and re-sync over the REST API.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def user_topic(user_uid):
+    return f'user:{user_uid}'
+
+
+def chat_topic(chat_uid):
+    return f'chat:{chat_uid}'
+
+
+class Subscription:
+    """One subscriber's bounded event queue, bound to the event loop it was created on"""
+
+    def __init__(self, topics, queue_size):
+        self.topics = tuple(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def _put(self, event):
+        # Runs on the subscriber's loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next event, or ``None`` if nothing arrived within ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BaseBroker:
+    """Interface implemented by every broker"""
+
+    def subscribe(self, topics):
+        """Return a Subscription receiving events published to any of ``topics`` (call on the event loop)"""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, topics, event):
+        """Publish ``event`` (a JSON-serializable dict) to ``topics``; safe to call from any thread"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for monitoring"""
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    """Per-process pub/sub: topic -> set of subscriptions"""
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.REALTIME_QUEUE_SIZE
+        self.subscribers = {}  # Format: {topic: {Subscription, ...}}
+        self.counters = {'published': 0, 'delivered': 0}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics):
+        subscription = Subscription(topics, self.queue_size)
+        with self._lock:
+            for topic in subscription.topics:
+                self.subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[topic]
+
+    def publish(self, topics, event):
+        with self._lock:
+            self.counters['published'] += 1
+        self.deliver(topics, event)
+
+    def deliver(self, topics, event):
+        """Hand an event to the local subscribers of ``topics`` (each subscriber gets it once)"""
+        with self._lock:
+            targets = set()
+            for topic in topics:
+                targets.update(self.subscribers.get(topic, ()))
+            self.counters['delivered'] += len(targets)
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will be unsubscribed on disconnect
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'topics': len(self.subscribers),
+                'subscriptions': len({s for subs in self.subscribers.values() for s in subs}),
+                **self.counters
+            }
+
+
+_broker = None
+
+
+def get_broker():
+    """Return the process-wide broker configured in settings"""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.REALTIME_BROKER)()
+    return _broker
+
+
+def publish(topics, event):
+    """Publish an event without ever failing the write path that produced it"""
+    try:
+        get_broker().publish(topics, event)
+    except Exception as e:
+        print(f"Error publishing {event.get('type')} event: {str(e)}")
@@ -0,0 +1,99 @@
+"""
+Stateless signed access tokens (``AUTH_TOKEN_MODE = 'signed'``).
+
+An access token is a JSON payload ``{'uid', 'exp', 'rid'}`` signed with an HMAC
+derived from ``SECRET_KEY`` (``django.core.signing``). Validating one is pure CPU:
+no token-store lookup and no shared state on the request path.
+
+Access tokens are short-lived (``AUTH_ACCESS_TOKEN_LIFETIME``) and are minted
+from an opaque refresh token kept server-side in the token store. ``rid`` is
+a short id of that refresh token; revoking it puts the id on a compact
+deny-list that is mirrored in every worker and re-synced from the token store
+at most every ``AUTH_DENYLIST_SYNC_INTERVAL`` seconds, so a logout takes effect
+immediately in the issuing worker and within that interval elsewhere.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from .token_store import get_token_store, session_id, token_key
+
+REFRESH_TOKEN_PREFIX = 'rt.'
+
+_signer = signing.Signer(salt='apps.core.signed_tokens.access')
+
+
+def is_signed_token(token):
+    """Signed tokens carry a ':' separator; opaque urlsafe tokens never do"""
+    return ':' in token
+
+
+def is_refresh_token(token):
+    """Refresh tokens are opaque tokens with a prefix urlsafe tokens never produce"""
+    return token.startswith(REFRESH_TOKEN_PREFIX)
+
+
+def refresh_token_id(refresh_token):
+    """Short id of a refresh token embedded in the access tokens minted from it (its session id)"""
+    return session_id(token_key(refresh_token))
+
+
+def create_access_token(user_uid, rid):
+    """Sign a short-lived access token for ``user_uid`` bound to refresh token ``rid``"""
+    return _signer.sign_object({
+        'uid': user_uid,
+        'exp': int(time.time()) + settings.AUTH_ACCESS_TOKEN_LIFETIME,
+        'rid': rid,
+    })
+
+
+def read_access_token(token):
+    """Return the payload of a valid, unexpired access token or ``None``"""
+    try:
+        payload = _signer.unsign_object(token)
+    except (signing.BadSignature, ValueError):
+        return None
+    if payload.get('exp', 0) < time.time():
+        return None
+    return payload
+
+
+class RevocationList:
+    """Per-worker mirror of the refresh-token deny-list kept in the token store"""
+
+    def __init__(self, sync_interval=None):
+        self.sync_interval = sync_interval if sync_interval is not None else settings.AUTH_DENYLIST_SYNC_INTERVAL
+        self.entries = {}  # Format: {rid: denied_until_epoch}
+        self._synced_at = 0.0  # Wall-clock time of the last sync
+        self._checked_at = float('-inf')  # Monotonic time of the last sync
+        self._lock = threading.Lock()
+
+    def add(self, rid, until):
+        """Deny ``rid`` until ``until`` (epoch seconds), locally and in the shared store"""
+        with self._lock:
+            self.entries[rid] = until
+        get_token_store().deny(rid, until)
+
+    def contains(self, rid):
+        self._sync_if_stale()
+        until = self.entries.get(rid)
+        return until is not None and until > time.time()
+
+    def _sync_if_stale(self):
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.sync_interval:
+                return
+            self._checked_at = time.monotonic()
+            # Overlap the window a little to tolerate clock skew between workers
+            since = self._synced_at - self.sync_interval
+            self._synced_at = time.time()
+        fresh = get_token_store().denied_since(since)
+        now = time.time()
+        with self._lock:
+            self.entries.update(fresh)
+            self.entries = {rid: until for rid, until in self.entries.items() if until > now}
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,537 @@
+"""
+Storage backends for authentication tokens.
+
+``AuthToken`` talks to a token store chosen by the ``AUTH_TOKEN_STORE`` setting.
+Stores keep one record per token - ``{'user_uid': ..., 'expires': epoch,
+'created_at': epoch, 'last_seen': epoch}`` - and only ever persist a SHA-256
+digest of the token itself. Tokens are also indexed by user, so listing or
+revoking one user's sessions costs O(sessions of that user), and each user is
+capped at ``AUTH_MAX_SESSIONS_PER_USER`` sessions (oldest evicted first).
+
+- ``MemoryTokenStore``: per-process dict, tokens are lost on restart and not
+  shared between workers (development only).
+- ``Neo4jTokenStore``: ``AuthSession`` nodes in Neo4j, shared by every worker
+  and surviving deploys.
+
+Expired tokens are swept incrementally in expiry order (a min-heap in memory,
+the ``expires_at`` range index in Neo4j) whenever tokens are issued, and the
+store is capped at ``AUTH_TOKEN_MAX_TOKENS`` by evicting the oldest tokens (by
+creation time - refresh and access sessions have very different lifetimes).
+``stats()`` exposes live/expired/evicted counters.
+
+The configured store is wrapped in a ``CachedTokenStore`` - a small per-worker
+TTL cache - so validating a recently seen token does not hit the database.
+A token revoked in another worker stays valid here for at most
+``AUTH_TOKEN_CACHE_TTL`` seconds.
+"""
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from neomodel import db
+
+
+def token_key(token):
+    """Digest under which a token is stored"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def session_id(key):
+    """Public id of a session, derived from its token key (equals the refresh-token id of signed mode)"""
+    return key[:32]
+
+
+class BaseTokenStore:
+    """Interface implemented by every token store"""
+
+    def save(self, token, user_uid, expires):
+        """Store a new token for ``user_uid`` expiring at ``expires`` (epoch seconds)
+        and return the keys of sessions evicted to make room for it"""
+        raise NotImplementedError
+
+    def get(self, token):
+        """Return the token record or ``None`` if the token is unknown"""
+        raise NotImplementedError
+
+    def delete(self, token):
+        """Forget a token (logout)"""
+        raise NotImplementedError
+
+    def touch(self, token, now):
+        """Record that a token was used at ``now``"""
+        raise NotImplementedError
+
+    def list_user(self, user_uid):
+        """Return the live sessions of ``user_uid``, oldest first, as
+        ``{'key', 'created_at', 'last_seen', 'expires'}`` dicts"""
+        raise NotImplementedError
+
+    def delete_user(self, user_uid):
+        """Forget every token of ``user_uid`` (log out everywhere) and return their keys"""
+        raise NotImplementedError
+
+    def purge_expired(self, limit=None):
+        """Delete up to ``limit`` expired tokens, oldest first, and return how many were removed"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for monitoring: live, expired and evicted tokens"""
+        raise NotImplementedError
+
+    def deny(self, rid, until):
+        """Put refresh-token id ``rid`` on the revocation deny-list until ``until`` (epoch seconds)"""
+        raise NotImplementedError
+
+    def denied_since(self, since):
+        """Return ``{rid: until}`` for unexpired deny-list entries added after ``since``"""
+        raise NotImplementedError
+
+
+class MemoryTokenStore(BaseTokenStore):
+    """
+    Per-process in-memory token storage
+    A min-heap of (expires, token_key) drives sweeping; ``tokens`` is kept in
+    creation order, so eviction pops its first entry. Heap entries of removed
+    tokens are skipped lazily and compacted away once they outnumber the live
+    tokens. ``user_tokens`` keeps each user's token keys in creation order, so
+    the first one is the user's oldest session.
+    """
+
+    def __init__(self, max_tokens=None, sweep_batch=None, max_sessions_per_user=None):
+        self.tokens = {}  # Format: {token_key: {'user_uid': 'xxx', 'expires': epoch, 'created_at': epoch, 'last_seen': epoch}}
+        self.user_tokens = {}  # Format: {user_uid: {token_key: None}} (insertion-ordered set)
+        self.max_tokens = max_tokens or settings.AUTH_TOKEN_MAX_TOKENS
+        self.sweep_batch = sweep_batch or settings.AUTH_TOKEN_SWEEP_BATCH
+        self.max_sessions_per_user = max_sessions_per_user or settings.AUTH_MAX_SESSIONS_PER_USER
+        self.counters = {'expired': 0, 'evicted': 0, 'revoked': 0}
+        self.denied = {}  # Format: {rid: (until, denied_at)}
+        self._expiry_heap = []
+        self._lock = threading.Lock()
+
+    def _is_live(self, entry):
+        record = self.tokens.get(entry[1])
+        return record is not None and record['expires'] == entry[0]
+
+    def _remove(self, key):
+        """Drop a token from the primary map and the per-user index"""
+        record = self.tokens.pop(key, None)
+        if record is None:
+            return None
+        keys = self.user_tokens.get(record['user_uid'])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self.user_tokens[record['user_uid']]
+        return record
+
+    def _sweep(self, now, limit):
+        removed = 0
+        popped = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now and popped < limit:
+            entry = heapq.heappop(self._expiry_heap)
+            popped += 1
+            if self._is_live(entry):
+                self._remove(entry[1])
+                removed += 1
+        self.counters['expired'] += removed
+        return removed
+
+    def _evict_oldest(self):
+        if not self.tokens:
+            return None
+        key = next(iter(self.tokens))
+        self._remove(key)
+        self.counters['evicted'] += 1
+        return key
+
+    def _compact(self):
+        if len(self._expiry_heap) > 2 * len(self.tokens) + 64:
+            self._expiry_heap = [(record['expires'], key) for key, record in self.tokens.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def save(self, token, user_uid, expires):
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            # Amortized cleanup: every new token pays for sweeping a few expired ones
+            self._sweep(now, self.sweep_batch)
+            evicted = []
+            while len(self.tokens) >= self.max_tokens:
+                key_evicted = self._evict_oldest()
+                if key_evicted is None:
+                    break
+                evicted.append(key_evicted)
+            # Per-user cap: evict the user's oldest sessions
+            user_keys = self.user_tokens.get(user_uid, {})
+            while len(user_keys) >= self.max_sessions_per_user:
+                oldest = next(iter(user_keys))
+                self._remove(oldest)
+                evicted.append(oldest)
+                self.counters['evicted'] += 1
+            self.tokens[key] = {'user_uid': user_uid, 'expires': expires, 'created_at': now, 'last_seen': now}
+            self.user_tokens.setdefault(user_uid, {})[key] = None
+            heapq.heappush(self._expiry_heap, (expires, key))
+            self._compact()
+            return evicted
+
+    def get(self, token):
+        key = token_key(token)
+        with self._lock:
+            record = self.tokens.get(key)
+            if record is not None and time.time() > record['expires']:
+                self._remove(key)
+                self.counters['expired'] += 1
+                return None
+            return record
+
+    def delete(self, token):
+        with self._lock:
+            if self._remove(token_key(token)) is not None:
+                self.counters['revoked'] += 1
+
+    def touch(self, token, now):
+        with self._lock:
+            record = self.tokens.get(token_key(token))
+            if record is not None:
+                record['last_seen'] = now
+
+    def list_user(self, user_uid):
+        now = time.time()
+        with self._lock:
+            sessions = []
+            for key in self.user_tokens.get(user_uid, ()):
+                record = self.tokens[key]
+                if record['expires'] > now:
+                    sessions.append({
+                        'key': key, 'created_at': record['created_at'],
+                        'last_seen': record['last_seen'], 'expires': record['expires']
+                    })
+            return sessions
+
+    def delete_user(self, user_uid):
+        with self._lock:
+            keys = list(self.user_tokens.pop(user_uid, ()))
+            for key in keys:
+                del self.tokens[key]
+            self.counters['revoked'] += len(keys)
+            return keys
+
+    def purge_expired(self, limit=None):
+        now = time.time()
+        with self._lock:
+            removed = self._sweep(now, limit or len(self._expiry_heap))
+            self._compact()
+            self.denied = {rid: entry for rid, entry in self.denied.items() if entry[0] > now}
+            return removed
+
+    def stats(self):
+        with self._lock:
+            return {'live': len(self.tokens), **self.counters, 'denied': len(self.denied)}
+
+    def deny(self, rid, until):
+        with self._lock:
+            self.denied[rid] = (until, time.time())
+
+    def denied_since(self, since):
+        now = time.time()
+        with self._lock:
+            return {
+                rid: until for rid, (until, denied_at) in self.denied.items()
+                if denied_at > since and until > now
+            }
+
+
+class Neo4jTokenStore(BaseTokenStore):
+    """
+    Tokens persisted as AuthSession nodes, shared across workers and restarts
+    Sweeping walks the expires_at index and runs at most once per
+    ``AUTH_TOKEN_SWEEP_INTERVAL`` seconds per worker, piggybacking on logins;
+    the global cap then evicts the oldest sessions on the created_at index.
+    Per-user operations walk the ``user_uid`` index.
+    Counters are per worker; ``live`` counts unexpired sessions on the
+    expires_at index, recounted at most once per sweep interval, while the cap
+    is enforced on every stored session (the label count store, expired ones
+    included until they are swept).
+    """
+
+    def __init__(self, max_tokens=None, sweep_batch=None, sweep_interval=None, max_sessions_per_user=None):
+        self.max_tokens = max_tokens or settings.AUTH_TOKEN_MAX_TOKENS
+        self.max_sessions_per_user = max_sessions_per_user or settings.AUTH_MAX_SESSIONS_PER_USER
+        self.sweep_batch = sweep_batch or settings.AUTH_TOKEN_SWEEP_BATCH
+        self.sweep_interval = sweep_interval if sweep_interval is not None else settings.AUTH_TOKEN_SWEEP_INTERVAL
+        self.counters = {'expired': 0, 'evicted': 0, 'revoked': 0}
+        self._last_sweep = 0.0
+        self._live = (0, float('-inf'))  # (live session count, monotonic time it was counted)
+        self._lock = threading.Lock()
+
+    def save(self, token, user_uid, expires):
+        # Create the session and evict the user's oldest ones beyond the cap in one statement
+        results, _ = db.cypher_query(
+            """
+            CREATE (:AuthSession {
+                token_key: $token_key, user_uid: $user_uid,
+                created_at: $now, last_seen_at: $now, expires_at: $expires
+            })
+            WITH 1 AS created
+            MATCH (old:AuthSession {user_uid: $user_uid})
+            WITH old ORDER BY old.created_at DESC SKIP $max_sessions
+            WITH old, old.token_key AS key
+            DELETE old
+            RETURN collect(key)
+            """,
+            {
+                'token_key': token_key(token), 'user_uid': user_uid, 'now': time.time(),
+                'expires': expires, 'max_sessions': self.max_sessions_per_user
+            }
+        )
+        evicted = results[0][0] if results else []
+        self.counters['evicted'] += len(evicted)
+        return evicted + self._maybe_sweep()
+
+    def get(self, token):
+        results, _ = db.cypher_query(
+            """
+            MATCH (s:AuthSession {token_key: $token_key}) WHERE s.expires_at > $now
+            RETURN s.user_uid, s.expires_at, s.created_at, coalesce(s.last_seen_at, s.created_at)
+            """,
+            {'token_key': token_key(token), 'now': time.time()}
+        )
+        if not results:
+            return None
+        user_uid, expires, created_at, last_seen = results[0]
+        return {'user_uid': user_uid, 'expires': expires, 'created_at': created_at, 'last_seen': last_seen}
+
+    def delete(self, token):
+        results, _ = db.cypher_query(
+            "MATCH (s:AuthSession {token_key: $token_key}) DELETE s RETURN count(s)",
+            {'token_key': token_key(token)}
+        )
+        self.counters['revoked'] += results[0][0]
+
+    def touch(self, token, now):
+        db.cypher_query(
+            "MATCH (s:AuthSession {token_key: $token_key}) SET s.last_seen_at = $now",
+            {'token_key': token_key(token), 'now': now}
+        )
+
+    def list_user(self, user_uid):
+        results, _ = db.cypher_query(
+            """
+            MATCH (s:AuthSession {user_uid: $user_uid}) WHERE s.expires_at > $now
+            RETURN s.token_key, s.created_at, coalesce(s.last_seen_at, s.created_at), s.expires_at
+            ORDER BY s.created_at
+            """,
+            {'user_uid': user_uid, 'now': time.time()}
+        )
+        return [
+            {'key': key, 'created_at': created_at, 'last_seen': last_seen, 'expires': expires}
+            for key, created_at, last_seen, expires in results
+        ]
+
+    def delete_user(self, user_uid):
+        results, _ = db.cypher_query(
+            """
+            MATCH (s:AuthSession {user_uid: $user_uid})
+            WITH s, s.token_key AS key
+            DELETE s
+            RETURN collect(key)
+            """,
+            {'user_uid': user_uid}
+        )
+        keys = results[0][0] if results else []
+        self.counters['revoked'] += len(keys)
+        return keys
+
+    def _maybe_sweep(self):
+        """Sweep and enforce the global cap if due; returns the keys evicted by the cap"""
+        with self._lock:
+            if time.monotonic() - self._last_sweep < self.sweep_interval:
+                return []
+            self._last_sweep = time.monotonic()
+        self.purge_expired(self.sweep_batch)
+        return self._enforce_cap()
+
+    def purge_expired(self, limit=None):
+        removed_total = 0
+        while True:
+            batch = min(limit - removed_total, self.sweep_batch) if limit else self.sweep_batch
+            if batch <= 0:
+                break
+            results, _ = db.cypher_query(
+                """
+                MATCH (s:AuthSession) WHERE s.expires_at <= $now
+                WITH s ORDER BY s.expires_at LIMIT $batch
+                DELETE s
+                RETURN count(s)
+                """,
+                {'now': time.time(), 'batch': batch}
+            )
+            removed = results[0][0]
+            removed_total += removed
+            if removed < batch:
+                break
+        self.counters['expired'] += removed_total
+        db.cypher_query(
+            "MATCH (r:RevokedToken) WHERE r.expires_at <= $now DELETE r",
+            {'now': time.time()}
+        )
+        return removed_total
+
+    def _enforce_cap(self):
+        excess = self._count_stored() - self.max_tokens
+        if excess <= 0:
+            return []
+        results, _ = db.cypher_query(
+            """
+            MATCH (s:AuthSession) WHERE s.created_at IS NOT NULL
+            WITH s ORDER BY s.created_at LIMIT $excess
+            WITH s, s.token_key AS key
+            DELETE s
+            RETURN collect(key)
+            """,
+            {'excess': excess}
+        )
+        evicted = results[0][0] if results else []
+        self.counters['evicted'] += len(evicted)
+        return evicted
+
+    def _count_stored(self):
+        results, _ = db.cypher_query("MATCH (s:AuthSession) RETURN count(s)")
+        return results[0][0]
+
+    def _count_live(self):
+        results, _ = db.cypher_query(
+            "MATCH (s:AuthSession) WHERE s.expires_at > $now RETURN count(s)",
+            {'now': time.time()}
+        )
+        return results[0][0]
+
+    def stats(self):
+        # Health checks poll this; a range count per probe is not worth it
+        live, counted_at = self._live
+        if time.monotonic() - counted_at >= self.sweep_interval:
+            live = self._count_live()
+            self._live = (live, time.monotonic())
+        return {'live': live, **self.counters}
+
+    def deny(self, rid, until):
+        db.cypher_query(
+            """
+            MERGE (r:RevokedToken {rid: $rid})
+            SET r.expires_at = $until, r.revoked_at = $now
+            """,
+            {'rid': rid, 'until': until, 'now': time.time()}
+        )
+
+    def denied_since(self, since):
+        results, _ = db.cypher_query(
+            """
+            MATCH (r:RevokedToken) WHERE r.revoked_at > $since AND r.expires_at > $now
+            RETURN r.rid, r.expires_at
+            """,
+            {'since': since, 'now': time.time()}
+        )
+        return dict(results)
+
+
+class CachedTokenStore(BaseTokenStore):
+    """Read-through, write-through per-worker TTL/LRU cache in front of another store"""
+
+    def __init__(self, backend, ttl, max_entries):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # Format: {token_key: (record, cached_at)}
+        self._lock = threading.Lock()
+
+    def _remember(self, key, record):
+        with self._lock:
+            self._cache[key] = (record, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def save(self, token, user_uid, expires):
+        evicted = self.backend.save(token, user_uid, expires)
+        with self._lock:
+            for key in evicted:
+                self._cache.pop(key, None)
+        now = time.time()
+        self._remember(
+            token_key(token), {'user_uid': user_uid, 'expires': expires, 'created_at': now, 'last_seen': now}
+        )
+        return evicted
+
+    def get(self, token):
+        key = token_key(token)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl and entry[0]['expires'] > time.time():
+                self._cache.move_to_end(key)
+                return entry[0]
+
+        record = self.backend.get(token)
+        if record is None:
+            with self._lock:
+                self._cache.pop(key, None)
+        else:
+            self._remember(key, record)
+        return record
+
+    def delete(self, token):
+        with self._lock:
+            self._cache.pop(token_key(token), None)
+        self.backend.delete(token)
+
+    def touch(self, token, now):
+        self.backend.touch(token, now)
+        with self._lock:
+            entry = self._cache.get(token_key(token))
+            if entry:
+                entry[0]['last_seen'] = now
+
+    def list_user(self, user_uid):
+        return self.backend.list_user(user_uid)
+
+    def delete_user(self, user_uid):
+        keys = self.backend.delete_user(user_uid)
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+        return keys
+
+    def purge_expired(self, limit=None):
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (record, _) in self._cache.items() if record['expires'] <= now]:
+                del self._cache[key]
+        return self.backend.purge_expired(limit)
+
+    def stats(self):
+        with self._lock:
+            cached = len(self._cache)
+        return {**self.backend.stats(), 'cached': cached}
+
+    def deny(self, rid, until):
+        self.backend.deny(rid, until)
+
+    def denied_since(self, since):
+        return self.backend.denied_since(since)
+
+
+_token_store = None
+
+
+def get_token_store():
+    """Return the process-wide token store configured in settings"""
+    global _token_store
+    if _token_store is None:
+        backend = import_string(settings.AUTH_TOKEN_STORE)()
+        if settings.AUTH_TOKEN_CACHE_TTL > 0:
+            backend = CachedTokenStore(backend, settings.AUTH_TOKEN_CACHE_TTL, settings.AUTH_TOKEN_CACHE_SIZE)
+        _token_store = backend
+    return _token_store
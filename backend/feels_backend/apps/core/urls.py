@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .authentication import AuthView, ProfileView
+from .authentication import AuthView, ProfileView, SessionView
 from .demo_views import DemoView
 from .health import HealthCheckView
 
@@ -15,6 +15,7 @@ urlpatterns = [
     
     # Authentication endpoints
     path('auth/', AuthView.as_view(), name='auth'),
+    path('auth/sessions/', SessionView.as_view(), name='auth_sessions'),
     path('profile/', ProfileView.as_view(), name='profile'),
     
     # Account endpoints
@@ -28,6 +29,7 @@ urlpatterns = [
     
     # Feeling endpoints
     path('feelings/', views.FeelingView.as_view(), name='feelings'),
+    path('feelings/snapshots/<str:content_hash>/', views.FeelingSnapshotView.as_view(), name='feeling_snapshot'),
     
     # Friend request endpoints
     path('friend-requests/', views.FriendRequestView.as_view(), name='friend_requests'),
@@ -36,5 +38,10 @@ urlpatterns = [
     # Chat endpoints
     path('chats/', views.ChatView.as_view(), name='chats'),
     path('chats/<str:chat_id>/', views.ChatView.as_view(), name='chat_detail'),
-    path('chats/<str:chat_id>/messages/', views.MessageView.as_view(), name='chat_messages'),
+    path('chats/<str:chat_id>/messages/', views.LongPollMessageView.as_view(), name='chat_messages'),
+    path('chats/<str:chat_id>/read/', views.ChatReadView.as_view(), name='chat_read'),
+    path('messages/batch/', views.MessageBatchView.as_view(), name='message_batch'),
+    
+    # Real-time events (Server-Sent Events, served under ASGI)
+    path('events/', views.EventStreamView.as_view(), name='events'),
 ]
@@ -5,17 +5,23 @@ This package contains all view classes organized in separate modules.
 
 from .account_view import AccountView
 from .post_view import PostView
-from .feeling_view import FeelingView
+from .feeling_view import FeelingView, FeelingSnapshotView
 from .friend_request_view import FriendRequestView
 from .user_posts_view import UserPostsView
-from .chat_view import ChatView, MessageView
+from .chat_view import ChatView, MessageView, ChatReadView, MessageBatchView, LongPollMessageView
+from .event_stream_view import EventStreamView
 
 __all__ = [
     'AccountView',
     'PostView', 
     'FeelingView',
+    'FeelingSnapshotView',
     'FriendRequestView',
     'UserPostsView',
     'ChatView',
-    'MessageView'
+    'MessageView',
+    'ChatReadView',
+    'MessageBatchView',
+    'LongPollMessageView',
+    'EventStreamView'
 ]
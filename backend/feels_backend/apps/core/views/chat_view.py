@@ -4,10 +4,533 @@ from rest_framework import status
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 import json
-from datetime import datetime
+import time
+import uuid
+from functools import wraps
 
-from ..models import Account, Chat, Message, Feeling
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from neomodel import db
+
+from ..models import Chat, Message, ParticipationRel
 from ..authentication import authenticate_request
+from ..chat_membership import CHAT_NOT_FOUND, MEMBER, chat_membership, invalidate_chat_membership
+from ..chat_summary import get_summary_writer
+from ..feeling_catalog import feeling_params, get_feeling
+from ..pagination import decode_cursor, encode_cursor, parse_limit
+from ..realtime import chat_topic, get_broker, publish, user_topic
+
+
+# Inbox projection: every chat of the user together with the other participants
+# and the unread count (messages newer than the user's read watermark - sending
+# advances the sender's own watermark, so no per-message sender check is needed).
+# Message count and last message come from the chat's denormalized summary, and
+# messages are only visited for chats with something unread - in a bucketed
+# chat, only those of the buckets newer than the watermark.
+# Sorted by last message time (most recent first, chats without messages last).
+INBOX_QUERY = """
+MATCH (me:Account {uid: $user_uid})-[r:PARTICIPATES_IN]->(c:Chat)
+CALL {
+    WITH c
+    OPTIONAL MATCH (p:Account)-[:PARTICIPATES_IN]->(c)
+    WHERE p.uid <> $user_uid
+    RETURN collect(p {.username}) AS other_participants
+}
+CALL {
+    WITH c, r
+    WITH c, r WHERE coalesce(r.last_read_at, 0) < coalesce(c.last_message_at, 0)
+    CALL {
+        WITH c, r
+        WITH c, r WHERE NOT coalesce(c.bucketed, false)
+        MATCH (m:Message)-[:SENT_TO]->(c)
+        WHERE m.created_at > coalesce(r.last_read_at, 0)
+        RETURN m
+        UNION ALL
+        WITH c, r
+        MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+        WHERE c.bucketed AND b.day >= toInteger(floor(coalesce(r.last_read_at, 0) / 86400))
+        MATCH (m:Message)-[:IN_BUCKET]->(b)
+        WHERE m.created_at > coalesce(r.last_read_at, 0)
+        RETURN m
+    }
+    RETURN count(m) AS unread_count
+}
+RETURN c, other_participants, unread_count
+ORDER BY coalesce(c.last_message_at, 0) DESC
+"""
+
+# Chat detail: membership check and participants in one round-trip
+CHAT_DETAIL_QUERY = """
+MATCH (:Account {uid: $user_uid})-[:PARTICIPATES_IN]->(c:Chat {uid: $chat_uid})
+CALL {
+    WITH c
+    MATCH (p:Account)-[:PARTICIPATES_IN]->(c)
+    RETURN collect(p {.uid, .username, .display_name}) AS participants
+}
+RETURN c, participants
+"""
+
+# One page of a chat's messages with sender and feeling projected in the same
+# round-trip. ``source`` selects the messages (MESSAGE_CURSOR_SOURCE or
+# MESSAGE_SEQ_SOURCE) and ``order_by`` the order the page is cut in; the page is
+# collected in a subquery so the total count is returned even for empty pages.
+# The viewer's read watermark and the lowest watermark of the other participants
+# are returned so read state can be derived per message.
+MESSAGE_PAGE_QUERY = """
+MATCH (c:Chat {{uid: $chat_uid}})
+OPTIONAL MATCH (:Account {{uid: $user_uid}})-[mine:PARTICIPATES_IN]->(c)
+CALL {{
+    WITH c
+    OPTIONAL MATCH (o:Account)-[other:PARTICIPATES_IN]->(c)
+    WHERE o.uid <> $user_uid
+    RETURN min(coalesce(other.last_read_at, 0)) AS others_read_at
+}}
+CALL {{
+    WITH c
+    CALL {{
+{source}
+    }}
+    WITH m
+    ORDER BY {order_by}
+    SKIP $skip
+    LIMIT $limit
+    OPTIONAL MATCH (m)-[:SENT_BY]->(s:Account)
+    OPTIONAL MATCH (m)-[:EXPRESSES_FEELING]->(f:Feeling)
+    WHERE m.feeling_name IS NULL
+    RETURN collect({{
+        message: m,
+        created_at: m.created_at,
+        seq: m.seq,
+        sender: CASE WHEN s IS NULL THEN NULL ELSE s {{.uid, .username, .display_name}} END,
+        feeling_name: coalesce(m.feeling_name, f.name)
+    }}) AS page
+}}
+RETURN CASE WHEN c.bucketed THEN coalesce(c.message_count, 0)
+            ELSE COUNT {{ (c)<-[:SENT_TO]-() }} END AS total_count, page,
+       coalesce(mine.last_read_at, 0) AS my_read_at, others_read_at,
+       c.last_seq AS last_seq, mine.last_read_seq AS my_read_seq
+"""
+
+# Keyset selection, in either layout. ``where`` and ``order`` select the
+# direction. In a bucketed chat the buckets are walked by day in page order and
+# only those needed to fill the page are opened: ``bucket_where`` skips buckets
+# entirely on the wrong side of the cursor, and ``bucket_full`` tells whether
+# all of a bucket's messages are on the right side (the ones around the cursor
+# are not counted, so the page is never short). Buckets are compared by day
+# rather than by their first/last timestamps, which may lag behind when
+# summaries are coalesced; a message can sit in the bucket of the day after its
+# own (see SEND_MESSAGE_QUERY), never before.
+MESSAGE_CURSOR_SOURCE = """
+        WITH c
+        WITH c WHERE NOT coalesce(c.bucketed, false)
+        MATCH (c)<-[:SENT_TO]-(m:Message)
+        WHERE {where}
+        RETURN m
+        UNION ALL
+        WITH c
+        MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+        WHERE c.bucketed AND {bucket_where}
+        WITH b ORDER BY b.day {order}
+        WITH collect(b) AS ordered
+        WITH reduce(acc = {{total: 0, buckets: []}}, bucket IN ordered |
+            CASE WHEN acc.total >= $skip + $limit THEN acc
+                 ELSE {{
+                     total: acc.total + CASE WHEN {bucket_full} THEN bucket.message_count ELSE 0 END,
+                     buckets: acc.buckets + [bucket]
+                 }} END).buckets AS buckets
+        UNWIND buckets AS b
+        MATCH (m:Message)-[:IN_BUCKET]->(b)
+        WHERE {where}
+        RETURN m"""
+
+# Incremental sync: the messages after a sequence number, read from the
+# (chat_uid, seq) index without touching the chat in either layout
+MESSAGE_SEQ_SOURCE = """
+        MATCH (m:Message {chat_uid: $chat_uid})
+        WHERE m.seq > $after_seq
+        RETURN m ORDER BY m.seq LIMIT $limit"""
+
+# Send a message in one statement (one transaction): the membership check is the
+# anchoring MATCH, so a non-participant creates nothing and gets no rows back.
+# Setting last_message_at first takes the chat's write lock, serializing
+# concurrent sends so exactly one LAST_MESSAGE relationship survives, each
+# message gets the next sequence number of its chat (last_seq; chats created
+# before sequence numbers have none until backfill_message_seq has numbered
+# their history, and neither do their new messages) - and, in a
+# bucketed chat, so that a new day's bucket is started and chained only once
+# (a message sent by a worker whose clock lags goes to the newest bucket, even
+# if that is the next day's). The feeling is either linked ($feeling_id, found
+# by element id) or stored on the message ($stored_feeling_name), see
+# feeling_catalog.feeling_params.
+SEND_MESSAGE_QUERY = """
+MATCH (me:Account {uid: $user_uid})-[mine:PARTICIPATES_IN]->(c:Chat {uid: $chat_uid})
+SET c.last_message_at = $now, mine.last_read_at = $now,
+    c.message_count = coalesce(c.message_count, 0) + 1,
+    c.last_seq = c.last_seq + 1,
+    c.last_message_uid = $message_uid,
+    c.last_message_preview = left($text, $preview_length),
+    c.last_message_type = $message_type,
+    c.last_message_sender_uid = me.uid,
+    c.last_message_sender_username = me.username,
+    c.last_message_sender_display_name = me.display_name
+SET mine.last_read_seq = coalesce(c.last_seq, mine.last_read_seq)
+WITH me, c
+OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+DELETE old
+WITH DISTINCT me, c
+CALL {
+    WITH c
+    WITH c WHERE c.bucketed
+    OPTIONAL MATCH (c)-[latest_rel:LATEST_BUCKET]->(latest:MessageBucket)
+    WITH c, latest, latest_rel, toInteger(floor($now / 86400)) AS day
+    WHERE latest IS NULL OR latest.day < day
+    CREATE (b:MessageBucket {
+        key: c.uid + ':' + toString(day), day: day,
+        first_at: $now, last_at: $now, message_count: 0
+    })
+    CREATE (b)-[:BUCKET_OF]->(c)
+    CREATE (c)-[:LATEST_BUCKET]->(b)
+    FOREACH (_ IN CASE WHEN latest IS NULL THEN [] ELSE [1] END | CREATE (b)-[:PREVIOUS_BUCKET]->(latest))
+    DELETE latest_rel
+}
+OPTIONAL MATCH (c)-[:LATEST_BUCKET]->(bucket:MessageBucket)
+WHERE c.bucketed
+OPTIONAL MATCH (f:Feeling) WHERE elementId(f) = $feeling_id
+CREATE (m:Message {
+    uid: $message_uid, text: $text, message_type: $message_type,
+    created_at: $now, is_read: false, chat_uid: c.uid, seq: c.last_seq,
+    feeling_name: $stored_feeling_name
+})
+CREATE (m)-[:SENT_BY]->(me)
+CREATE (c)-[:LAST_MESSAGE]->(m)
+FOREACH (_ IN CASE WHEN bucket IS NULL THEN [1] ELSE [] END | CREATE (m)-[:SENT_TO]->(c))
+FOREACH (_ IN CASE WHEN bucket IS NULL THEN [] ELSE [1] END |
+    CREATE (m)-[:IN_BUCKET]->(bucket)
+    SET bucket.message_count = bucket.message_count + 1, bucket.last_at = $now)
+FOREACH (_ IN CASE WHEN f IS NULL THEN [] ELSE [1] END | CREATE (m)-[:EXPRESSES_FEELING]->(f))
+RETURN m, f.name AS feeling_name,
+       COLLECT { MATCH (p:Account)-[:PARTICIPATES_IN]->(c) RETURN p.uid } AS participant_uids,
+       bucket.key AS bucket_key
+"""
+
+# Send without touching the chat node, for coalesced summaries (see
+# apps/core/chat_summary.py): concurrent sends to one chat only create
+# relationships to it, which does not take its lock. Today's bucket is found
+# or created by its unique key instead of through the chain, and the message is
+# labelled Unsequenced until a flush gives it its sequence number (the
+# sender's last_read_seq catches up when they next mark the chat read).
+SEND_MESSAGE_COALESCED_QUERY = """
+MATCH (me:Account {uid: $user_uid})-[mine:PARTICIPATES_IN]->(c:Chat {uid: $chat_uid})
+SET mine.last_read_at = $now
+WITH me, c
+CALL {
+    WITH c
+    WITH c WHERE c.bucketed
+    WITH c, toInteger(floor($now / 86400)) AS day
+    MERGE (b:MessageBucket {key: c.uid + ':' + toString(day)})
+    ON CREATE SET b.day = day, b.first_at = $now, b.last_at = $now, b.message_count = 0,
+                  b.opened_by = $message_uid
+    FOREACH (_ IN CASE WHEN b.opened_by = $message_uid THEN [1] ELSE [] END | CREATE (b)-[:BUCKET_OF]->(c))
+}
+OPTIONAL MATCH (bucket:MessageBucket {key: $chat_uid + ':' + toString(toInteger(floor($now / 86400)))})
+WHERE c.bucketed
+OPTIONAL MATCH (f:Feeling) WHERE elementId(f) = $feeling_id
+CREATE (m:Message:Unsequenced {
+    uid: $message_uid, text: $text, message_type: $message_type,
+    created_at: $now, is_read: false, chat_uid: c.uid,
+    feeling_name: $stored_feeling_name
+})
+CREATE (m)-[:SENT_BY]->(me)
+FOREACH (_ IN CASE WHEN bucket IS NULL THEN [1] ELSE [] END | CREATE (m)-[:SENT_TO]->(c))
+FOREACH (_ IN CASE WHEN bucket IS NULL THEN [] ELSE [1] END | CREATE (m)-[:IN_BUCKET]->(bucket))
+FOREACH (_ IN CASE WHEN f IS NULL THEN [] ELSE [1] END | CREATE (m)-[:EXPRESSES_FEELING]->(f))
+RETURN m, f.name AS feeling_name,
+       COLLECT { MATCH (p:Account)-[:PARTICIPATES_IN]->(c) RETURN p.uid } AS participant_uids,
+       bucket.key AS bucket_key
+"""
+
+# Send a batch of queued messages, across any number of the user's chats, in one
+# statement. Each message uid is derived from the client's id for it (see
+# client_message_uid), so messages already written by an earlier attempt are
+# found and reported instead of sent twice. Chats the user is not in match no
+# rows and nothing is written to them. ``write`` writes a chat's new messages:
+# SEND_BATCH_WRITE (summary, sequence numbers and bucket under the chat's lock,
+# taken once per chat rather than once per message) or
+# SEND_BATCH_WRITE_COALESCED (messages only, see SEND_MESSAGE_COALESCED_QUERY).
+# Two concurrent retries of the same batch collide on the Message uid
+# constraint; the one that fails can simply be retried again.
+SEND_BATCH_QUERY = """
+MATCH (me:Account {{uid: $user_uid}})
+UNWIND $chats AS chat_row
+MATCH (me)-[mine:PARTICIPATES_IN]->(c:Chat {{uid: chat_row.chat_uid}})
+WITH me, mine, c, chat_row, COLLECT {{
+    UNWIND chat_row.messages AS row
+    MATCH (m:Message {{uid: row.message_uid}})
+    RETURN m.uid
+}} AS duplicate_uids
+WITH me, mine, c, chat_row, duplicate_uids,
+     [row IN chat_row.messages WHERE NOT row.message_uid IN duplicate_uids] AS fresh
+CALL {{
+    WITH me, mine, c, fresh
+    WITH me, mine, c, fresh, fresh[0] AS first, fresh[-1] AS last
+    WHERE last IS NOT NULL
+{write}
+}}
+RETURN c.uid, duplicate_uids, COLLECT {{
+           UNWIND chat_row.messages AS row
+           MATCH (m:Message {{uid: row.message_uid}})
+           OPTIONAL MATCH (m)-[:EXPRESSES_FEELING]->(f:Feeling)
+           WHERE m.feeling_name IS NULL
+           RETURN {{message: m, feeling_name: coalesce(m.feeling_name, f.name)}}
+       }} AS messages,
+       COLLECT {{ MATCH (p:Account)-[:PARTICIPATES_IN]->(c) RETURN p.uid }} AS participant_uids,
+       CASE WHEN c.bucketed AND size(fresh) > 0
+            THEN c.uid + ':' + toString(toInteger(floor(fresh[-1].created_at / 86400))) END AS bucket_key
+"""
+
+# All of a chat's new messages go to the newest bucket, started or not by the
+# last of them as in SEND_MESSAGE_QUERY
+SEND_BATCH_WRITE = """
+    SET c.last_message_at = last.created_at, mine.last_read_at = last.created_at,
+        c.message_count = coalesce(c.message_count, 0) + size(fresh),
+        c.last_seq = c.last_seq + size(fresh),
+        c.last_message_uid = last.message_uid,
+        c.last_message_preview = left(last.text, $preview_length),
+        c.last_message_type = last.message_type,
+        c.last_message_sender_uid = me.uid,
+        c.last_message_sender_username = me.username,
+        c.last_message_sender_display_name = me.display_name
+    SET mine.last_read_seq = coalesce(c.last_seq, mine.last_read_seq)
+    WITH me, c, fresh, first, last, c.last_seq - size(fresh) AS base
+    OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+    DELETE old
+    WITH DISTINCT me, c, fresh, first, last, base
+    CALL {
+        WITH c, first, last
+        WITH c, first, last WHERE c.bucketed
+        OPTIONAL MATCH (c)-[latest_rel:LATEST_BUCKET]->(latest:MessageBucket)
+        WITH c, first, latest, latest_rel, toInteger(floor(last.created_at / 86400)) AS day
+        WHERE latest IS NULL OR latest.day < day
+        CREATE (b:MessageBucket {
+            key: c.uid + ':' + toString(day), day: day,
+            first_at: first.created_at, last_at: first.created_at, message_count: 0
+        })
+        CREATE (b)-[:BUCKET_OF]->(c)
+        CREATE (c)-[:LATEST_BUCKET]->(b)
+        FOREACH (_ IN CASE WHEN latest IS NULL THEN [] ELSE [1] END | CREATE (b)-[:PREVIOUS_BUCKET]->(latest))
+        DELETE latest_rel
+    }
+    OPTIONAL MATCH (c)-[:LATEST_BUCKET]->(bucket:MessageBucket)
+    WHERE c.bucketed
+    UNWIND range(0, size(fresh) - 1) AS i
+    WITH me, c, bucket, fresh[i] AS row, base + i + 1 AS seq, i = size(fresh) - 1 AS is_last
+    OPTIONAL MATCH (f:Feeling) WHERE elementId(f) = row.feeling_id
+    CREATE (m:Message {
+        uid: row.message_uid, text: row.text, message_type: row.message_type,
+        created_at: row.created_at, is_read: false, chat_uid: c.uid, seq: seq,
+        feeling_name: row.stored_feeling_name
+    })
+    CREATE (m)-[:SENT_BY]->(me)
+    FOREACH (_ IN CASE WHEN is_last THEN [1] ELSE [] END | CREATE (c)-[:LAST_MESSAGE]->(m))
+    FOREACH (_ IN CASE WHEN bucket IS NULL THEN [1] ELSE [] END | CREATE (m)-[:SENT_TO]->(c))
+    FOREACH (_ IN CASE WHEN bucket IS NULL THEN [] ELSE [1] END |
+        CREATE (m)-[:IN_BUCKET]->(bucket)
+        SET bucket.message_count = bucket.message_count + 1, bucket.last_at = row.created_at)
+    FOREACH (_ IN CASE WHEN f IS NULL THEN [] ELSE [1] END | CREATE (m)-[:EXPRESSES_FEELING]->(f))"""
+
+SEND_BATCH_WRITE_COALESCED = """
+    SET mine.last_read_at = last.created_at
+    WITH me, c, fresh, first, last, toInteger(floor(last.created_at / 86400)) AS day
+    CALL {
+        WITH c, first, last, day
+        WITH c, first, last, day WHERE c.bucketed
+        MERGE (b:MessageBucket {key: c.uid + ':' + toString(day)})
+        ON CREATE SET b.day = day, b.first_at = first.created_at, b.last_at = first.created_at,
+                      b.message_count = 0, b.opened_by = last.message_uid
+        FOREACH (_ IN CASE WHEN b.opened_by = last.message_uid THEN [1] ELSE [] END | CREATE (b)-[:BUCKET_OF]->(c))
+    }
+    OPTIONAL MATCH (bucket:MessageBucket {key: c.uid + ':' + toString(day)})
+    WHERE c.bucketed
+    UNWIND fresh AS row
+    OPTIONAL MATCH (f:Feeling) WHERE elementId(f) = row.feeling_id
+    CREATE (m:Message:Unsequenced {
+        uid: row.message_uid, text: row.text, message_type: row.message_type,
+        created_at: row.created_at, is_read: false, chat_uid: c.uid,
+        feeling_name: row.stored_feeling_name
+    })
+    CREATE (m)-[:SENT_BY]->(me)
+    FOREACH (_ IN CASE WHEN bucket IS NULL THEN [1] ELSE [] END | CREATE (m)-[:SENT_TO]->(c))
+    FOREACH (_ IN CASE WHEN bucket IS NULL THEN [] ELSE [1] END | CREATE (m)-[:IN_BUCKET]->(bucket))
+    FOREACH (_ IN CASE WHEN f IS NULL THEN [] ELSE [1] END | CREATE (m)-[:EXPRESSES_FEELING]->(f))"""
+
+# Advance the user's read watermarks (time and sequence number) to a message,
+# or the chat's last message, in one relationship write. Watermarks never move
+# backwards; the sequence watermark stays put for unnumbered messages.
+MARK_READ_QUERY = """
+MATCH (:Account {uid: $user_uid})-[r:PARTICIPATES_IN]->(c:Chat {uid: $chat_uid})
+OPTIONAL MATCH (target:Message {uid: $message_uid})
+WHERE EXISTS { (target)-[:SENT_TO]->(c) } OR EXISTS { (target)-[:IN_BUCKET]->(:MessageBucket)-[:BUCKET_OF]->(c) }
+WITH r, c, CASE WHEN $message_uid IS NULL THEN coalesce(c.last_message_at, $now)
+                ELSE target.created_at END AS read_until,
+           CASE WHEN $message_uid IS NULL THEN c.last_seq ELSE target.seq END AS read_seq
+WHERE read_until IS NOT NULL
+SET r.last_read_at = CASE WHEN coalesce(r.last_read_at, 0) < read_until
+                          THEN read_until ELSE r.last_read_at END,
+    r.last_read_seq = CASE WHEN coalesce(r.last_read_seq, 0) < read_seq
+                           THEN read_seq ELSE r.last_read_seq END
+RETURN r.last_read_at, r.last_read_seq,
+       COLLECT { MATCH (p:Account)-[:PARTICIPATES_IN]->(c) RETURN p.uid } AS participant_uids
+"""
+
+# mark_as_read for one page of messages: advance the reader's watermark to the
+# newest message read and set the legacy is_read flag, all in one statement.
+# Returns the participants to notify of the read receipt.
+MARK_PAGE_READ_QUERY = """
+MATCH (:Account {uid: $user_uid})-[r:PARTICIPATES_IN]->(c:Chat {uid: $chat_uid})
+SET r.last_read_at = CASE WHEN coalesce(r.last_read_at, 0) < $read_until
+                          THEN $read_until ELSE r.last_read_at END,
+    r.last_read_seq = CASE WHEN coalesce(r.last_read_seq, 0) < $read_seq
+                           THEN $read_seq ELSE r.last_read_seq END
+WITH c
+CALL {
+    WITH c
+    UNWIND $message_uids AS message_uid
+    MATCH (m:Message {uid: message_uid})
+    WHERE EXISTS { (m)-[:SENT_TO]->(c) } OR EXISTS { (m)-[:IN_BUCKET]->(:MessageBucket)-[:BUCKET_OF]->(c) }
+    SET m.is_read = true
+}
+RETURN COLLECT { MATCH (p:Account)-[:PARTICIPATES_IN]->(c) RETURN p.uid } AS participant_uids
+"""
+
+
+# Create a chat in one statement: resolve every requested username (unknown
+# ones are returned in not_found and nothing is created), add the requesting
+# user, derive is_group_chat, the default name and the direct-chat key, create
+# the chat and connect its participants. A 1:1 chat is MERGEd on its
+# direct_key, which returns the existing chat instead - the unique constraint
+# on direct_key makes concurrent retries resolve to a single chat.
+# Participants are only connected when the chat was created by this statement.
+CREATE_CHAT_QUERY = """
+UNWIND $usernames AS username
+OPTIONAL MATCH (a:Account {username: username})
+WITH collect(CASE WHEN a IS NULL THEN username END) AS not_found,
+     collect(a {.uid, .username, .display_name}) AS found
+WITH not_found,
+     found + CASE WHEN any(p IN found WHERE p.uid = $user.uid) THEN [] ELSE [$user] END AS participants
+WITH not_found, participants,
+     coalesce($is_group_chat, size(participants) > 2) AS is_group_chat,
+     [p IN participants WHERE p.uid <> $user.uid |
+      CASE WHEN coalesce(p.display_name, '') = '' THEN p.username ELSE p.display_name END] AS others
+WITH not_found, participants, is_group_chat,
+     NOT is_group_chat AND size(participants) = 2 AS is_direct,
+     coalesce($name, CASE
+         WHEN is_group_chat
+         THEN 'Group with ' + reduce(s = '', i IN range(0, size(others[..2]) - 1) |
+                                     s + CASE WHEN i = 0 THEN '' ELSE ', ' END + others[i])
+              + CASE WHEN size(others) > 2 THEN ' and ' + toString(size(others) - 2) + ' others' ELSE '' END
+         ELSE 'Chat with ' + coalesce(others[0], 'Unknown')
+     END) AS name
+WITH not_found, participants, is_group_chat, is_direct, name,
+     CASE WHEN is_direct THEN
+         CASE WHEN participants[0].uid < participants[1].uid
+              THEN participants[0].uid + ':' + participants[1].uid
+              ELSE participants[1].uid + ':' + participants[0].uid END
+     END AS direct_key
+CALL {
+    WITH not_found, is_direct, name, direct_key
+    WITH not_found, is_direct, name, direct_key WHERE size(not_found) = 0 AND is_direct
+    MERGE (c:Chat {direct_key: direct_key})
+    ON CREATE SET c.uid = $chat_uid, c.name = name, c.is_group_chat = false,
+                  c.created_at = $now, c.message_count = 0, c.last_seq = 0, c.bucketed = $bucketed
+    RETURN c
+    UNION ALL
+    WITH not_found, is_direct, is_group_chat, name
+    WITH not_found, is_direct, is_group_chat, name WHERE size(not_found) = 0 AND NOT is_direct
+    CREATE (c:Chat {
+        uid: $chat_uid, name: name, is_group_chat: is_group_chat,
+        created_at: $now, message_count: 0, last_seq: 0, bucketed: $bucketed
+    })
+    RETURN c
+    UNION ALL
+    WITH not_found
+    WITH not_found WHERE size(not_found) > 0
+    RETURN NULL AS c
+}
+WITH c, participants, not_found, coalesce(c.uid = $chat_uid, false) AS created
+CALL {
+    WITH c, participants, created
+    WITH c, participants, created WHERE created
+    UNWIND participants AS participant
+    MATCH (a:Account {uid: participant.uid})
+    CREATE (a)-[:PARTICIPATES_IN]->(c)
+}
+RETURN c, created, participants, not_found
+"""
+
+
+def direct_chat_key(uid_a, uid_b):
+    """Canonical key of the 1:1 chat between two accounts (order-independent)"""
+    return ':'.join(sorted((uid_a, uid_b)))
+
+
+def client_message_uid(sender_uid, client_id):
+    """Message uid for a client-generated id - the same on every retry of the send"""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f'feels:message:{sender_uid}:{client_id}').hex
+
+
+def batch_message_error(item):
+    """Why one message of a batch send cannot be sent, or None"""
+    if not isinstance(item, dict):
+        return 'Each message must be an object'
+    client_id = item.get('client_id')
+    if not isinstance(client_id, str) or not client_id or len(client_id) > 100:
+        return 'client_id is required (at most 100 characters)'
+    if not isinstance(item.get('chat_uid'), str) or not item['chat_uid']:
+        return 'chat_uid is required'
+    if not isinstance(item.get('text'), str) or not item['text'].strip():
+        return 'Message text is required'
+    message_type = item.get('message_type', 'text')
+    if not isinstance(message_type, str) or message_type not in Message.message_type.choices:
+        return f'Invalid message_type: {message_type}'
+    if item.get('feeling_name') is not None and not isinstance(item['feeling_name'], str):
+        return 'feeling_name must be a string'
+    return None
+
+
+def chat_access_error(chat_uid, user_uid, fresh=True):
+    """
+    404/403 response explaining why ``user_uid`` cannot act on a chat, or None
+    ``fresh`` skips the membership memo - used after a chat-scoped statement
+    anchored on the membership matched nothing, which outranks a cached answer.
+    """
+    if fresh:
+        invalidate_chat_membership(chat_uid, user_uid)
+    membership = chat_membership(chat_uid, user_uid)
+    if membership == CHAT_NOT_FOUND:
+        return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
+    if membership != MEMBER:
+        return Response({
+            'error': 'Access denied - you are not a participant in this chat'
+        }, status=status.HTTP_403_FORBIDDEN)
+    return None
+
+
+def last_message_summary(chat):
+    """Render a chat's denormalized last-message summary"""
+    if not chat.last_message_uid:
+        return None
+    return {
+        'uid': chat.last_message_uid,
+        'text': chat.last_message_preview,
+        'message_type': chat.last_message_type,
+        'created_at': str(chat.last_message_at),
+        'sender': {
+            'uid': chat.last_message_sender_uid,
+            'username': chat.last_message_sender_username,
+            'display_name': chat.last_message_sender_display_name
+        } if chat.last_message_sender_uid else None
+    }
 
 
 class ChatView(APIView):
@@ -91,20 +614,12 @@ class ChatView(APIView):
             user = request.user_account
             
             if chat_id:
-                try:
-                    chat = Chat.nodes.get(uid=chat_id)
-                except Chat.DoesNotExist:
-                    return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
+                results, _ = db.cypher_query(CHAT_DETAIL_QUERY, {'user_uid': user.uid, 'chat_uid': chat_id})
+                if not results:
+                    return chat_access_error(chat_id, user.uid)
                 
-                # Check if user is a participant
-                participants = list(chat.participants.all())
-                if user not in participants:
-                    return Response({
-                        'error': 'Access denied - you are not a participant in this chat'
-                    }, status=status.HTTP_403_FORBIDDEN)
-                
-                messages = list(chat.messages.all())
-                last_message = chat.last_message.single() if chat.last_message.all() else None
+                chat_node, participants = results[0]
+                chat = Chat.inflate(chat_node)
                 
                 return Response({
                     'uid': chat.uid,
@@ -112,41 +627,17 @@ class ChatView(APIView):
                     'is_group_chat': chat.is_group_chat,
                     'created_at': str(chat.created_at),
                     'last_message_at': str(chat.last_message_at) if chat.last_message_at else None,
-                    'participants': [
-                        {
-                            'uid': participant.uid,
-                            'username': participant.username,
-                            'display_name': participant.display_name
-                        } for participant in participants
-                    ],
-                    'message_count': len(messages),
-                    'last_message': {
-                        'uid': last_message.uid,
-                        'text': last_message.text,
-                        'message_type': last_message.message_type,
-                        'created_at': str(last_message.created_at),
-                        'sender': {
-                            'uid': last_message.sender.single().uid,
-                            'username': last_message.sender.single().username,
-                            'display_name': last_message.sender.single().display_name
-                        } if last_message.sender.all() else None
-                    } if last_message else None
+                    'participants': participants,
+                    'message_count': chat.message_count or 0,
+                    'last_message': last_message_summary(chat)
                 })
             else:
-                # List all user's chats
-                user_chats = list(user.chat_participants.all())
+                # List all user's chats in a single round-trip
+                results, _ = db.cypher_query(INBOX_QUERY, {'user_uid': user.uid})
                 
                 chats_data = []
-                for chat in user_chats:
-                    participants = list(chat.participants.all())
-                    messages = list(chat.messages.all())
-                    last_message = chat.last_message.single() if chat.last_message.all() else None
-                    
-                    # Count unread messages for this user
-                    unread_count = sum(1 for msg in messages if not msg.is_read and msg.sender.single().uid != user.uid)
-                    
-                    # Get other participants' usernames (exclude current user)
-                    other_participants = [{"username": p.username} for p in participants if p.uid != user.uid]
+                for chat_node, other_participants, unread_count in results:
+                    chat = Chat.inflate(chat_node)
                     
                     chat_data = {
                         'uid': chat.uid,
@@ -156,24 +647,11 @@ class ChatView(APIView):
                         'last_message_at': str(chat.last_message_at) if chat.last_message_at else None,
                         'participants': other_participants,
                         'unread_count': unread_count,
-                        'message_count': len(messages),
-                        'last_message': {
-                            'uid': last_message.uid,
-                            'text': last_message.text,
-                            'message_type': last_message.message_type,
-                            'created_at': str(last_message.created_at),
-                            'sender': {
-                                'uid': last_message.sender.single().uid,
-                                'username': last_message.sender.single().username,
-                                'display_name': last_message.sender.single().display_name
-                            } if last_message.sender.all() else None
-                        } if last_message else None
+                        'message_count': chat.message_count or 0,
+                        'last_message': last_message_summary(chat)
                     }
                     chats_data.append(chat_data)
                 
-                # Sort by last message time (most recent first)
-                chats_data.sort(key=lambda x: x['last_message_at'] or '1900-01-01T00:00:00Z', reverse=True)
-                
                 return Response({
                     'chats': chats_data,
                     'count': len(chats_data)
@@ -184,7 +662,8 @@ class ChatView(APIView):
     
     @extend_schema(
         summary="Create a new chat",
-        description="Create a new chat conversation with specified participants. Requires authentication.",
+        description="Create a new chat conversation with specified participants. Requires authentication. "
+                    "A 1:1 chat is unique per pair of users: if it already exists it is returned with 200.",
         request={
             "type": "object",
             "properties": {
@@ -221,6 +700,7 @@ class ChatView(APIView):
                     "message": "Chat created successfully"
                 }
             },
+            200: {"description": "Existing 1:1 chat with the same participant returned"},
             400: {"description": "Bad request - validation error"},
             404: {"description": "One or more participants not found"},
             401: {"description": "Authentication required"}
@@ -239,47 +719,30 @@ class ChatView(APIView):
                     'error': 'At least one participant username is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Find all participants
-            participants = []
-            not_found_users = []
+            if not isinstance(participant_usernames, list):
+                return Response({
+                    'error': 'participant_usernames must be a list'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            for username in participant_usernames:
-                try:
-                    participant = Account.nodes.get(username=username)
-                    participants.append(participant)
-                except Account.DoesNotExist:
-                    not_found_users.append(username)
+            # Participant lookup, creation (or the existing 1:1 chat) and
+            # connections in one round-trip
+            results, _ = db.cypher_query(CREATE_CHAT_QUERY, {
+                'usernames': list(dict.fromkeys(participant_usernames)),
+                'user': {'uid': user.uid, 'username': user.username, 'display_name': user.display_name},
+                'is_group_chat': bool(data['is_group_chat']) if 'is_group_chat' in data else None,
+                'name': data.get('name') or None,
+                'chat_uid': uuid.uuid4().hex,
+                'bucketed': settings.CHAT_MESSAGE_LAYOUT == 'bucketed',
+                'now': time.time()
+            })
+            chat_node, created, participants, not_found_users = results[0]
             
             if not_found_users:
                 return Response({
                     'error': f'Users not found: {", ".join(not_found_users)}'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            # Add the requesting user if not already included
-            if user not in participants:
-                participants.append(user)
-            
-            is_group_chat = data.get('is_group_chat', len(participants) > 2)
-            
-            chat_name = data.get('name')
-            if not chat_name:
-                other_participants = [p.display_name or p.username for p in participants if p.uid != user.uid]
-                if is_group_chat:
-                    chat_name = f"Group with {', '.join(other_participants[:2])}"
-                    if len(other_participants) > 2:
-                        chat_name += f" and {len(other_participants) - 2} others"
-                else:
-                    chat_name = f"Chat with {other_participants[0] if other_participants else 'Unknown'}"
-            
-            # Create the chat
-            chat = Chat(
-                name=chat_name,
-                is_group_chat=is_group_chat
-            ).save()
-            
-            # Connect all participants
-            for participant in participants:
-                chat.participants.connect(participant)
+            chat = Chat.inflate(chat_node)
             
             # Return chat details
             return Response({
@@ -287,15 +750,9 @@ class ChatView(APIView):
                 'name': chat.name,
                 'is_group_chat': chat.is_group_chat,
                 'created_at': str(chat.created_at),
-                'participants': [
-                    {
-                        'uid': participant.uid,
-                        'username': participant.username,
-                        'display_name': participant.display_name
-                    } for participant in participants
-                ],
-                'message': 'Chat created successfully'
-            }, status=status.HTTP_201_CREATED)
+                'participants': participants,
+                'message': 'Chat created successfully' if created else 'Chat already exists'
+            }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
             
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -312,13 +769,40 @@ class MessageView(APIView):
                 name='limit',
                 type=OpenApiTypes.INT,
                 location=OpenApiParameter.QUERY,
-                description='Number of messages to return (default: 50)'
+                description='Number of messages to return (default: 50, capped at MAX_PAGE_SIZE)'
+            ),
+            OpenApiParameter(
+                name='before',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Cursor - return messages older than this position (use before_cursor from a previous page)'
+            ),
+            OpenApiParameter(
+                name='after',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Cursor - return messages newer than this position (use after_cursor from a previous page)'
+            ),
+            OpenApiParameter(
+                name='after_seq',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Incremental sync - return the messages whose seq is greater than this, in seq order '
+                            '(compare with last_seq to detect gaps); takes precedence over cursors and offset. '
+                            'Chats created before sequence numbers answer 409 until they are backfilled'
+            ),
+            OpenApiParameter(
+                name='wait',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Long-poll - with after or after_seq, wait up to this many seconds (capped at '
+                            'LONG_POLL_MAX_WAIT) for a new message instead of returning an empty page'
             ),
             OpenApiParameter(
                 name='offset',
                 type=OpenApiTypes.INT,
                 location=OpenApiParameter.QUERY,
-                description='Number of messages to skip (default: 0)'
+                description='Deprecated - number of messages to skip, ignored when a cursor is given (default: 0)'
             ),
             OpenApiParameter(
                 name='mark_as_read',
@@ -337,6 +821,7 @@ class MessageView(APIView):
                             "text": "Hey, how are you?",
                             "message_type": "text",
                             "created_at": "2023-12-01T10:00:00Z",
+                            "seq": 42,
                             "is_read": True,
                             "sender": {
                                 "uid": "acc_123",
@@ -350,11 +835,17 @@ class MessageView(APIView):
                         }
                     ],
                     "count": 1,
-                    "has_more": False
+                    "total_count": 1,
+                    "has_more": False,
+                    "last_seq": 42,
+                    "last_read_seq": 41,
+                    "before_cursor": "WzE3MDE0MjQ4MDAuMCwibXNnXzEyMyJd",
+                    "after_cursor": "WzE3MDE0MjQ4MDAuMCwibXNnXzEyMyJd"
                 }
             },
             403: {"description": "Access denied - not a chat participant"},
             404: {"description": "Chat not found"},
+            409: {"description": "after_seq on a chat whose messages are not numbered yet (last_seq is null)"},
             401: {"description": "Authentication required"}
         }
     )
@@ -364,65 +855,135 @@ class MessageView(APIView):
         try:
             user = request.user_account
             
-            # Get chat and verify user is a participant
-            try:
-                chat = Chat.nodes.get(uid=chat_id)
-            except Chat.DoesNotExist:
-                return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
+            # Verify the user is a participant without loading the chat's members
+            error = chat_access_error(chat_id, user.uid, fresh=False)
+            if error:
+                return error
             
-            participants = list(chat.participants.all())
-            if user not in participants:
-                return Response({
-                    'error': 'Access denied - you are not a participant in this chat'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # Pagination 
-            limit = int(request.GET.get('limit', 50))
-            offset = int(request.GET.get('offset', 0))
+            # Pagination
+            try:
+                limit = parse_limit(request.GET.get('limit'), default=50)
+                offset = int(request.GET.get('offset', 0))
+                before = decode_cursor(request.GET['before']) if request.GET.get('before') else None
+                after = decode_cursor(request.GET['after']) if request.GET.get('after') else None
+                after_seq = int(request.GET['after_seq']) if request.GET.get('after_seq') else None
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             mark_as_read = request.GET.get('mark_as_read', 'false').lower() == 'true'
             
-            messages = list(chat.messages.all())
+            if after_seq is not None:
+                # Exactly the messages the client is missing, oldest-first
+                source = MESSAGE_SEQ_SOURCE
+                order_by = 'm.seq ASC'
+                cursor = (None, None)
+            elif after:
+                # Messages newer than the cursor, walked oldest-first from the cursor
+                where = 'm.created_at > $cursor_ts OR (m.created_at = $cursor_ts AND m.uid > $cursor_uid)'
+                bucket_where, bucket_full = 'b.day >= $cursor_day', 'bucket.day > $cursor_day + 1'
+                order = 'ASC'
+                cursor = after
+            elif before:
+                where = 'm.created_at < $cursor_ts OR (m.created_at = $cursor_ts AND m.uid < $cursor_uid)'
+                bucket_where, bucket_full = 'b.day <= $cursor_day + 1', 'bucket.day < $cursor_day'
+                order = 'DESC'
+                cursor = before
+            else:
+                where = bucket_where = bucket_full = 'true'
+                order = 'DESC'
+                cursor = (None, None)
+            if after_seq is None:
+                source = MESSAGE_CURSOR_SOURCE.format(
+                    where=where, order=order, bucket_where=bucket_where, bucket_full=bucket_full
+                )
+                order_by = f'm.created_at {order}, m.uid {order}'
             
-            messages.sort(key=lambda x: x.created_at, reverse=True)
+            # Fetch one extra row to know whether there is another page
+            results, _ = db.cypher_query(
+                MESSAGE_PAGE_QUERY.format(source=source, order_by=order_by),
+                {
+                    'chat_uid': chat_id,
+                    'user_uid': user.uid,
+                    'cursor_ts': cursor[0],
+                    'cursor_uid': cursor[1],
+                    'cursor_day': int(cursor[0] // 86400) if cursor[0] is not None else None,
+                    'after_seq': after_seq,
+                    # Offset is a deprecated fallback and only applies without a cursor
+                    'skip': offset if not (before or after or after_seq is not None) else 0,
+                    'limit': limit + 1
+                }
+            )
+            total_count, page, my_read_at, others_read_at, last_seq, my_read_seq = (
+                results[0] if results else (0, [], 0, None, None, None)
+            )
+            if after_seq is not None and last_seq is None:
+                return Response({
+                    'error': 'This chat has no sequence numbers yet - sync with cursors until it is backfilled'
+                }, status=status.HTTP_409_CONFLICT)
             
-            total_count = len(messages)
-            paginated_messages = messages[offset:offset + limit]
-            has_more = offset + limit < total_count
+            # Newest first, regardless of the direction the page was walked in
+            if after_seq is not None:
+                page.sort(key=lambda row: row['seq'], reverse=True)
+            else:
+                page.sort(key=lambda row: (row['created_at'], row['message'].get('uid')), reverse=True)
+            has_more = len(page) > limit
+            if has_more:
+                page = page[-limit:] if after or after_seq is not None else page[:limit]
             
             # Format messages
             messages_data = []
-            for message in paginated_messages:
-                sender = message.sender.single()
-                feeling = message.feeling.single() if message.feeling.all() else None
+            newly_read = []
+            for row in page:
+                message = Message.inflate(row['message'])
+                sender = row['sender']
+                feeling = get_feeling(row['feeling_name'])
+                
+                # Own messages are read once every other participant has read them
+                if sender and sender['uid'] == user.uid:
+                    is_read = others_read_at is not None and row['created_at'] <= others_read_at
+                else:
+                    is_read = row['created_at'] <= my_read_at
                 
                 message_data = {
                     'uid': message.uid,
                     'text': message.text,
                     'message_type': message.message_type,
                     'created_at': str(message.created_at),
-                    'is_read': message.is_read,
-                    'sender': {
-                        'uid': sender.uid,
-                        'username': sender.username,
-                        'display_name': sender.display_name
-                    },
-                    'feeling': {
-                        'name': feeling.name,
-                        'color': feeling.color
-                    } if feeling else None
+                    'seq': row['seq'],
+                    'is_read': is_read,
+                    'sender': sender,
+                    'feeling': feeling
                 }
                 messages_data.append(message_data)
                 
-                # Mark as read if requested and message is from another user
-                if mark_as_read and sender.uid != user.uid and not message.is_read:
-                    message.is_read = True
-                    message.save()
+                if not is_read and sender and sender['uid'] != user.uid:
+                    newly_read.append(row)
+            
+            # Mark the page as read with a single write, however large the page
+            if mark_as_read and newly_read:
+                read_results, _ = db.cypher_query(MARK_PAGE_READ_QUERY, {
+                    'user_uid': user.uid,
+                    'chat_uid': chat_id,
+                    'read_until': max(row['created_at'] for row in newly_read),
+                    'read_seq': max((row['seq'] for row in newly_read if row['seq'] is not None), default=None),
+                    'message_uids': [row['message'].get('uid') for row in newly_read]
+                })
+                participant_uids = read_results[0][0] if read_results else []
+                publish([user_topic(uid) for uid in participant_uids], {
+                    'type': 'chat.read',
+                    'chat_uid': chat_id,
+                    'user_uid': user.uid,
+                    'message_uids': [row['message'].get('uid') for row in newly_read]
+                })
             
             return Response({
                 'messages': messages_data,
                 'count': len(messages_data),
                 'total_count': total_count,
-                'has_more': has_more
+                'has_more': has_more,
+                'last_seq': last_seq,
+                'last_read_seq': my_read_seq,
+                'before_cursor': encode_cursor(page[-1]['created_at'], page[-1]['message'].get('uid')) if page else None,
+                'after_cursor': encode_cursor(page[0]['created_at'], page[0]['message'].get('uid')) if page else None
             })
             
         except Exception as e:
@@ -482,55 +1043,44 @@ class MessageView(APIView):
             data = json.loads(request.body)
             user = request.user_account
             
-            # Get chat and verify user is a participant
-            try:
-                chat = Chat.nodes.get(uid=chat_id)
-            except Chat.DoesNotExist:
-                return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
-            
-            participants = list(chat.participants.all())
-            if user not in participants:
-                return Response({
-                    'error': 'Access denied - you are not a participant in this chat'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
             # Validate required fields
             if 'text' not in data or not data['text'].strip():
                 return Response({
                     'error': 'Message text is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Create the message
-            message = Message(
-                text=data['text'],
-                message_type=data.get('message_type', 'text')
-            ).save()
-            
-            # Connect to sender and chat
-            message.sender.connect(user)
-            message.chat.connect(chat)
-            
-            # Connect to feeling if provided
-            feeling_connected = None
-            if 'feeling_name' in data:
-                try:
-                    feeling = Feeling.nodes.filter(name=data['feeling_name']).first()
-                    if feeling:
-                        message.feeling.connect(feeling)
-                        feeling_connected = feeling
-                except Exception as feeling_error:
-                    print(f"Error connecting feeling '{data['feeling_name']}': {str(feeling_error)}")
-            
-            # Update chat's last message time and last message reference
-            chat.last_message_at = datetime.now()
-            
-            # Disconnect previous last message if it exists
-            if chat.last_message.all():
-                chat.last_message.disconnect_all()
-            
-            # Connect new message as last message
-            chat.last_message.connect(message)
-            chat.save()
+            message_type = data.get('message_type', 'text')
+            if message_type not in Message.message_type.choices:
+                return Response({
+                    'error': f'Invalid message_type: {message_type}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Membership check, create, links and last-message rewire in one
+            # transaction - or, with coalesced summaries, everything but the rewire
+            summary_writer = get_summary_writer()
+            now = time.time()
+            results, _ = db.cypher_query(SEND_MESSAGE_COALESCED_QUERY if summary_writer else SEND_MESSAGE_QUERY, {
+                'user_uid': user.uid,
+                'chat_uid': chat_id,
+                'message_uid': uuid.uuid4().hex,
+                'text': data['text'],
+                'message_type': message_type,
+                **feeling_params(data.get('feeling_name')),
+                'preview_length': settings.CHAT_PREVIEW_LENGTH,
+                'now': now
+            })
+            
+            if not results:
+                # Nothing was written; only now find out why
+                return chat_access_error(chat_id, user.uid)
+            
+            message_node, linked_feeling_name, participant_uids, bucket_key = results[0]
+            message = Message.inflate(message_node)
+            if summary_writer:
+                summary_writer.record(
+                    chat_id, message.uid, now, data['text'][:settings.CHAT_PREVIEW_LENGTH],
+                    message_type, user, bucket_key
+                )
             
             # Return message details
             response_data = {
@@ -538,19 +1088,345 @@ class MessageView(APIView):
                 'text': message.text,
                 'message_type': message.message_type,
                 'created_at': str(message.created_at),
+                'seq': message.seq,
                 'sender': {
                     'uid': user.uid,
                     'username': user.username,
                     'display_name': user.display_name
                 },
-                'feeling': {
-                    'name': feeling_connected.name,
-                    'color': feeling_connected.color
-                } if feeling_connected else None,
+                'feeling': get_feeling(message.feeling_name or linked_feeling_name),
                 'message': 'Message sent successfully'
             }
             
+            publish([user_topic(uid) for uid in participant_uids] + [chat_topic(chat_id)], {
+                'type': 'message.created',
+                'chat_uid': chat_id,
+                'message': {key: value for key, value in response_data.items() if key != 'message'}
+            })
+            
             return Response(response_data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LongPollMessageView(MessageView):
+    """
+    MessageView served from an async entry point (chats/<id>/messages/)
+    GET with ``after=<cursor>`` or ``after_seq=<n>`` and ``wait=<seconds>``
+    long-polls: if nothing newer exists yet, the request parks on the event loop
+    - not a worker thread - until something is published to the chat's topic
+    (a new message, or coalesced summaries assigning sequence numbers) or the
+    wait expires. Everything else is handed straight to MessageView.
+    DRF views are synchronous, so ``as_view`` wraps the regular view; the
+    wrapper keeps its attributes (cls, initkwargs), so the schema documents it
+    like any APIView.
+    """
+    
+    @classmethod
+    def as_view(cls, **initkwargs):
+        drf_view = super().as_view(**initkwargs)
+        message_view = sync_to_async(drf_view)
+        
+        @wraps(drf_view)
+        async def view(request, chat_id):
+            polling = request.GET.get('after') or request.GET.get('after_seq')
+            wait = request.GET.get('wait') if request.method == 'GET' and polling else None
+            if not wait:
+                return await message_view(request, chat_id=chat_id)
+            
+            try:
+                wait = min(float(wait), settings.LONG_POLL_MAX_WAIT)
+            except ValueError:
+                return JsonResponse({'error': 'wait must be a number of seconds'}, status=400)
+            
+            # Subscribe before the first read so a message sent in between still wakes us
+            broker = get_broker()
+            subscription = broker.subscribe([chat_topic(chat_id)])
+            try:
+                deadline = time.monotonic() + wait
+                while True:
+                    response = await message_view(request, chat_id=chat_id)
+                    if response.status_code != status.HTTP_200_OK or response.data['count']:
+                        return response
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or await subscription.get(timeout=remaining) is None:
+                        return response
+            finally:
+                broker.unsubscribe(subscription)
+        
+        return view
+
+
+class ChatReadView(APIView):
+    """Read receipts - advance the user's read watermark in a chat"""
+    
+    @extend_schema(
+        summary="Mark a chat as read",
+        description="Advance the authenticated user's read watermark in a chat, either up to a given message "
+                    "or up to the chat's last message. Messages at or before the watermark count as read.",
+        request={
+            "type": "object",
+            "properties": {
+                "message_uid": {
+                    "type": "string",
+                    "description": "Last message read (optional, default: the chat's last message)"
+                }
+            },
+            "example": {"message_uid": "msg_456"}
+        },
+        responses={
+            200: {
+                "description": "Watermark updated",
+                "example": {
+                    "chat_uid": "chat_123",
+                    "last_read_at": "2023-12-01 15:30:00+00:00",
+                    "last_read_seq": 42
+                }
+            },
+            400: {"description": "Message not found in this chat"},
+            403: {"description": "Access denied - not a chat participant"},
+            404: {"description": "Chat not found"},
+            401: {"description": "Authentication required"}
+        }
+    )
+    @authenticate_request
+    def post(self, request, chat_id):
+        """Mark a chat as read up to a message (default: the last one)"""
+        try:
+            data = json.loads(request.body) if request.body else {}
+            user = request.user_account
+            message_uid = data.get('message_uid')
+            
+            results, _ = db.cypher_query(MARK_READ_QUERY, {
+                'user_uid': user.uid,
+                'chat_uid': chat_id,
+                'message_uid': message_uid,
+                'now': time.time()
+            })
+            
+            if not results:
+                error = chat_access_error(chat_id, user.uid)
+                if error:
+                    return error
+                return Response({
+                    'error': f'Message {message_uid} not found in this chat'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            last_read_at, last_read_seq, participant_uids = results[0]
+            last_read_at = str(ParticipationRel.last_read_at.inflate(last_read_at))
+            publish([user_topic(uid) for uid in participant_uids], {
+                'type': 'chat.read',
+                'chat_uid': chat_id,
+                'user_uid': user.uid,
+                'last_read_at': last_read_at,
+                'last_read_seq': last_read_seq
+            })
+            
+            return Response({
+                'chat_uid': chat_id,
+                'last_read_at': last_read_at,
+                'last_read_seq': last_read_seq
+            })
+            
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MessageBatchView(APIView):
+    """Batch send - upload the messages a client queued while offline"""
+    
+    @extend_schema(
+        summary="Send a batch of messages",
+        description="Send up to MESSAGE_BATCH_MAX_SIZE messages, to any of the authenticated user's chats, in one "
+                    "transaction. Each message carries a client-generated client_id: retrying a batch (or part of "
+                    "it) never sends a message twice, its earlier result is returned with status 'duplicate'. "
+                    "Results are returned per message, in request order; a message that cannot be sent is "
+                    "'rejected' with an error and does not affect the others.",
+        request={
+            "type": "object",
+            "properties": {
+                "messages": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "client_id": {"type": "string", "description": "Client-generated id, unique per sender"},
+                            "chat_uid": {"type": "string", "description": "Chat to send to"},
+                            "text": {"type": "string", "description": "Message text content"},
+                            "message_type": {
+                                "type": "string",
+                                "enum": ["text", "feeling", "image"],
+                                "description": "Type of message (default: text)"
+                            },
+                            "feeling_name": {"type": "string", "description": "Name of feeling to associate (optional)"}
+                        },
+                        "required": ["client_id", "chat_uid", "text"]
+                    },
+                    "description": "Messages in the order they were queued"
+                }
+            },
+            "required": ["messages"],
+            "example": {
+                "messages": [
+                    {"client_id": "c0a8012e-1", "chat_uid": "chat_123", "text": "Back online!"},
+                    {"client_id": "c0a8012e-2", "chat_uid": "chat_456", "text": "Feeling great", "feeling_name": "Happy"}
+                ]
+            }
+        },
+        responses={
+            200: {
+                "description": "Per-message results",
+                "example": {
+                    "results": [
+                        {
+                            "client_id": "c0a8012e-1",
+                            "status": "sent",
+                            "message": {
+                                "uid": "msg_123",
+                                "chat_uid": "chat_123",
+                                "text": "Back online!",
+                                "message_type": "text",
+                                "created_at": "2023-12-01T10:00:00Z",
+                                "seq": 42,
+                                "sender": {
+                                    "uid": "acc_123",
+                                    "username": "johndoe",
+                                    "display_name": "John Doe"
+                                },
+                                "feeling": None
+                            }
+                        },
+                        {
+                            "client_id": "c0a8012e-2",
+                            "status": "rejected",
+                            "error": "Access denied - you are not a participant in this chat"
+                        }
+                    ],
+                    "sent": 1,
+                    "duplicates": 0,
+                    "rejected": 1
+                }
+            },
+            400: {"description": "Bad request - no messages, or more than MESSAGE_BATCH_MAX_SIZE"},
+            401: {"description": "Authentication required"}
+        }
+    )
+    @authenticate_request
+    def post(self, request):
+        """Send a batch of queued messages"""
+        try:
+            data = json.loads(request.body)
+            user = request.user_account
+            items = data.get('messages')
+            
+            if not isinstance(items, list) or not items:
+                return Response({
+                    'error': 'messages must be a non-empty list'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if len(items) > settings.MESSAGE_BATCH_MAX_SIZE:
+                return Response({
+                    'error': f'At most {settings.MESSAGE_BATCH_MAX_SIZE} messages can be sent in one batch'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Validate every message up front; the valid ones are grouped per chat,
+            # keeping their queue order (and created_at increasing in it)
+            results = [None] * len(items)
+            chats = {}  # Format: {chat_uid: [message row, ...]}
+            queued = {}  # Format: {message uid: message row}
+            message_uids = {}  # Format: {index: message uid}
+            repeated = set()  # Indexes of client_ids already queued earlier in the batch
+            now = time.time()
+            for index, item in enumerate(items):
+                error = batch_message_error(item)
+                if error:
+                    client_id = item.get('client_id') if isinstance(item, dict) else None
+                    results[index] = {'client_id': client_id, 'status': 'rejected', 'error': error}
+                    continue
+                message_uid = message_uids[index] = client_message_uid(user.uid, item['client_id'])
+                if message_uid in queued:
+                    repeated.add(index)
+                    continue
+                queued[message_uid] = {
+                    'message_uid': message_uid,
+                    'text': item['text'],
+                    'message_type': item.get('message_type', 'text'),
+                    **feeling_params(item.get('feeling_name')),
+                    'created_at': now + index / 1e6
+                }
+                chats.setdefault(item['chat_uid'], []).append(queued[message_uid])
+            
+            outcomes = {}  # Format: {message uid: result without client_id}
+            if chats:
+                summary_writer = get_summary_writer()
+                write = SEND_BATCH_WRITE_COALESCED if summary_writer else SEND_BATCH_WRITE
+                rows, _ = db.cypher_query(SEND_BATCH_QUERY.format(write=write), {
+                    'user_uid': user.uid,
+                    'chats': [{'chat_uid': chat_uid, 'messages': messages} for chat_uid, messages in chats.items()],
+                    'preview_length': settings.CHAT_PREVIEW_LENGTH
+                })
+                
+                for chat_uid, duplicate_uids, messages, participant_uids, bucket_key in rows:
+                    duplicate_uids = set(duplicate_uids)
+                    sent = []
+                    for row in messages:
+                        message = Message.inflate(row['message'])
+                        message_data = {
+                            'uid': message.uid,
+                            'chat_uid': message.chat_uid,
+                            'text': message.text,
+                            'message_type': message.message_type,
+                            'created_at': str(message.created_at),
+                            'seq': message.seq,
+                            'sender': {
+                                'uid': user.uid,
+                                'username': user.username,
+                                'display_name': user.display_name
+                            },
+                            'feeling': get_feeling(row['feeling_name'])
+                        }
+                        if message.uid in duplicate_uids:
+                            outcomes[message.uid] = {'status': 'duplicate', 'message': message_data}
+                            continue
+                        outcomes[message.uid] = {'status': 'sent', 'message': message_data}
+                        sent.append(message_data)
+                    
+                    sent.sort(key=lambda message_data: queued[message_data['uid']]['created_at'])
+                    for message_data in sent:
+                        if summary_writer:
+                            summary_writer.record(
+                                chat_uid, message_data['uid'], queued[message_data['uid']]['created_at'],
+                                message_data['text'][:settings.CHAT_PREVIEW_LENGTH],
+                                message_data['message_type'], user, bucket_key
+                            )
+                        publish([user_topic(uid) for uid in participant_uids] + [chat_topic(chat_uid)], {
+                            'type': 'message.created',
+                            'chat_uid': chat_uid,
+                            'message': message_data
+                        })
+                
+                # Chats that matched nothing: only now find out why
+                written = {row[0] for row in rows}
+                for chat_uid, messages in chats.items():
+                    if chat_uid in written:
+                        continue
+                    error = chat_access_error(chat_uid, user.uid)
+                    error = error.data['error'] if error else 'Chat changed while sending, retry'
+                    for row in messages:
+                        outcomes[row['message_uid']] = {'status': 'rejected', 'error': error}
+            
+            for index, message_uid in message_uids.items():
+                results[index] = {'client_id': items[index]['client_id'], **outcomes[message_uid]}
+                if index in repeated and results[index]['status'] == 'sent':
+                    # Sent once, by the first message with this client_id
+                    results[index]['status'] = 'duplicate'
+            
+            return Response({
+                'results': results,
+                'sent': sum(1 for result in results if result['status'] == 'sent'),
+                'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+                'rejected': sum(1 for result in results if result['status'] == 'rejected')
+            })
+            
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,63 @@
+"""
+Server-Sent Events stream of real-time events for the authenticated user.
+
+Served by the ASGI application (``feels_backend.asgi``, e.g. under uvicorn or
+daphne): every open stream is a coroutine parked on the event loop rather than
+a worker thread, so a process can hold thousands of idle connections.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from ..authentication import AuthToken
+from ..realtime import get_broker, user_topic
+
+
+def format_event(event):
+    """Serialize an event as an SSE frame"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class EventStreamView(View):
+    """
+    GET /api/events/ - push channel for new messages, read receipts and friend requests
+    Browsers' EventSource cannot set headers, so the token may also be passed
+    as ``?token=``.
+    """
+
+    async def get(self, request):
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+        token = auth_header.split(' ')[1] if auth_header.startswith('Bearer ') else request.GET.get('token')
+        if not token:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+
+        user_uid = await sync_to_async(AuthToken.validate_token)(token)
+        if not user_uid:
+            return JsonResponse({'error': 'Invalid or expired token'}, status=401)
+
+        response = StreamingHttpResponse(self.stream(user_uid), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+        return response
+
+    async def stream(self, user_uid):
+        broker = get_broker()
+        subscription = broker.subscribe([user_topic(user_uid)])
+        try:
+            yield f"retry: {settings.REALTIME_RETRY_MS}\n\n"
+            while True:
+                event = await subscription.get(timeout=settings.REALTIME_HEARTBEAT_INTERVAL)
+                if event is None:
+                    # Comment frame keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                else:
+                    yield format_event(event)
+                if subscription.overflowed:
+                    # Too far behind: the client reconnects and re-syncs over the REST API
+                    yield format_event({'type': 'overflow'})
+                    return
+        finally:
+            broker.unsubscribe(subscription)
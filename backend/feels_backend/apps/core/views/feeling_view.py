@@ -1,10 +1,30 @@
+from django.conf import settings
+from django.urls import reverse
+from django.utils.http import parse_etags
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_spectacular.utils import extend_schema
 import json
 
-from ..models import Feeling, FeelingType
+from ..feeling_catalog import feeling_catalog_changed, feeling_listing, get_feeling_type_node
+from ..models import Feeling
+
+# A snapshot URL names the content it serves, so it never changes
+SNAPSHOT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def etag_matches(request, content_hash):
+    """Whether If-None-Match names this content (weak comparison, as for GET)"""
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or any(etag.removeprefix('W/') == f'"{content_hash}"' for etag in etags)
+
+
+def catalog_response(data, content_hash, cache_control, status_code=status.HTTP_200_OK):
+    response = Response(data, status=status_code)
+    response['ETag'] = f'"{content_hash}"'
+    response['Cache-Control'] = cache_control
+    return response
 
 
 class FeelingView(APIView):
@@ -15,8 +35,9 @@ class FeelingView(APIView):
         description="Retrieve a list of all available feelings with their colors and types",
         responses={
             200: {
-                "description": "List of feelings",
+                "description": "List of feelings, with its ETag and the URL of its immutable snapshot",
                 "example": {
+                    "snapshot_url": "/api/feelings/snapshots/5d41402abc4b2a76b9719d911017c592/",
                     "feelings": [
                         {
                             "name": "Happy",
@@ -33,23 +54,22 @@ class FeelingView(APIView):
                     ]
                 }
             },
+            304: {"description": "Not modified - If-None-Match names the current ETag"},
             500: {"description": "Internal server error"}
         }
     )
     def get(self, request):
         """List all feelings"""
         try:
-            feelings = Feeling.nodes.all()
-            return Response({
-                'feelings': [
-                    {
-                        'name': feeling.name,
-                        'color': feeling.color,
-                        'description': feeling.description,
-                        'feeling_type': feeling.feeling_type.single().name if feeling.feeling_type.single() else None
-                    } for feeling in feelings
-                ]
-            })
+            # Served from the in-process catalog, revalidated by ETag
+            listing, content_hash = feeling_listing()
+            cache_control = f'public, max-age={settings.FEELING_CATALOG_MAX_AGE}'
+            if etag_matches(request, content_hash):
+                return catalog_response(None, content_hash, cache_control, status.HTTP_304_NOT_MODIFIED)
+            return catalog_response({
+                'snapshot_url': reverse('core:feeling_snapshot', args=[content_hash]),
+                'feelings': listing
+            }, content_hash, cache_control)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -91,6 +111,14 @@ class FeelingView(APIView):
         try:
             data = json.loads(request.body)
             
+            feeling_type = None
+            if 'feeling_type_name' in data:
+                feeling_type = get_feeling_type_node(data['feeling_type_name'])
+                if feeling_type is None:
+                    return Response({
+                        'error': f"Feeling type '{data['feeling_type_name']}' not found"
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            
             feeling = Feeling(
                 name=data['name'],
                 color=data['color'],
@@ -98,13 +126,49 @@ class FeelingView(APIView):
             ).save()
             
             # Connect to feeling type if provided
-            if 'feeling_type_name' in data:
-                feeling_type = FeelingType.nodes.get(name=data['feeling_type_name'])
+            if feeling_type:
                 feeling.feeling_type.connect(feeling_type)
             
+            # Every worker's catalog picks the new feeling up
+            feeling_catalog_changed()
+            
             return Response({
                 'name': feeling.name,
                 'message': 'Feeling created successfully'
             }, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class FeelingSnapshotView(APIView):
+    """Immutable snapshot of the feelings catalog, named by its content hash"""
+    
+    @extend_schema(
+        summary="Get a feelings catalog snapshot",
+        description=(
+            "The feelings listed by GET /api/feelings/, at the URL given there as snapshot_url. "
+            "The content never changes, so it can be cached for good; a snapshot that is no "
+            "longer current redirects to the current one."
+        ),
+        responses={
+            200: {"description": "List of feelings (same format as GET /api/feelings/)"},
+            302: {"description": "Snapshot replaced - redirect to the current one"},
+            304: {"description": "Not modified - If-None-Match names the snapshot's ETag"},
+            500: {"description": "Internal server error"}
+        }
+    )
+    def get(self, request, content_hash):
+        """Serve the current snapshot if it is the one requested"""
+        try:
+            listing, current_hash = feeling_listing()
+            if content_hash != current_hash:
+                # Only the current content is held, so never serve it under another hash
+                response = Response(status=status.HTTP_302_FOUND)
+                response['Location'] = reverse('core:feeling_snapshot', args=[current_hash])
+                response['Cache-Control'] = 'no-cache'
+                return response
+            if etag_matches(request, current_hash):
+                return catalog_response(None, current_hash, SNAPSHOT_CACHE_CONTROL, status.HTTP_304_NOT_MODIFIED)
+            return catalog_response({'feelings': listing}, current_hash, SNAPSHOT_CACHE_CONTROL)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
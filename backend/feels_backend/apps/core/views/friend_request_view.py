@@ -6,8 +6,63 @@ from drf_spectacular.types import OpenApiTypes
 import json
 from datetime import datetime
 
+from neomodel import db
+
 from ..models import Account, FriendRequest
 from ..authentication import authenticate_request
+from ..pagination import decode_cursor, encode_cursor, parse_limit
+from ..realtime import publish, user_topic
+
+
+# Traversals anchored at the authenticated user's Account, one per request type.
+# Every branch imports ``me`` and returns (fr, sender, receiver).
+RECEIVED_REQUESTS = """
+    WITH me
+    MATCH (me)<-[:RECEIVED_FRIEND_REQUEST]-(fr:FriendRequest)<-[:SENT_FRIEND_REQUEST]-(sender:Account)
+    RETURN fr, sender, me AS receiver
+"""
+
+SENT_REQUESTS = """
+    WITH me
+    MATCH (me)-[:SENT_FRIEND_REQUEST]->(fr:FriendRequest)-[:RECEIVED_FRIEND_REQUEST]->(receiver:Account)
+    RETURN fr, me AS sender, receiver
+"""
+
+REQUEST_TRAVERSALS = {
+    'received': RECEIVED_REQUESTS,
+    'sent': SENT_REQUESTS,
+    'all': RECEIVED_REQUESTS + 'UNION' + SENT_REQUESTS,
+}
+
+FRIEND_REQUEST_PAGE_QUERY = """
+MATCH (me:Account {{uid: $user_uid}})
+CALL {{
+{traversal}
+}}
+WITH fr, sender, receiver
+WHERE ($status IS NULL OR fr.status = $status)
+  AND ($cursor_ts IS NULL OR fr.created_at < $cursor_ts
+       OR (fr.created_at = $cursor_ts AND fr.uid < $cursor_uid))
+RETURN fr,
+       fr.created_at AS created_at,
+       sender {{.uid, .username, .display_name}} AS sender,
+       receiver {{.uid, .username, .display_name}} AS receiver
+ORDER BY fr.created_at DESC, fr.uid DESC
+LIMIT $limit
+"""
+
+# Receiver lookup plus friendship and pending-request checks (both directions) in one query
+SEND_REQUEST_CHECK_QUERY = """
+MATCH (sender:Account {uid: $sender_uid}), (receiver:Account {uid: $receiver_uid})
+RETURN receiver,
+       EXISTS { (sender)-[:FRIENDS_WITH]-(receiver) } AS already_friends,
+       EXISTS {
+           (sender)-[:SENT_FRIEND_REQUEST]->(:FriendRequest {status: 'pending'})-[:RECEIVED_FRIEND_REQUEST]->(receiver)
+       } AS already_sent,
+       EXISTS {
+           (receiver)-[:SENT_FRIEND_REQUEST]->(:FriendRequest {status: 'pending'})-[:RECEIVED_FRIEND_REQUEST]->(sender)
+       } AS already_received
+"""
 
 
 class FriendRequestView(APIView):
@@ -23,6 +78,25 @@ class FriendRequestView(APIView):
                 location=OpenApiParameter.QUERY,
                 description='Type of requests to retrieve: received, sent, or all (default: received)',
                 enum=['received', 'sent', 'all']
+            ),
+            OpenApiParameter(
+                name='status',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only return requests with this status',
+                enum=['pending', 'accepted', 'rejected']
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of requests to return (default: 50, capped at MAX_PAGE_SIZE)'
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Cursor from next_cursor of the previous page'
             )
         ],
         responses={
@@ -47,7 +121,9 @@ class FriendRequestView(APIView):
                         }
                     ],
                     "type": "received",
-                    "count": 1
+                    "count": 1,
+                    "has_more": False,
+                    "next_cursor": None
                 }
             },
             401: {"description": "Authentication required"},
@@ -60,58 +136,57 @@ class FriendRequestView(APIView):
         try:
             user = request.user_account
             request_type = request.GET.get('type', 'received')  # 'received', 'sent', or 'all'
+            request_status = request.GET.get('status')
             
-            if request_type == 'received':
-                # Get requests sent to this user - need to check all friend requests and filter manually
-                all_requests = FriendRequest.nodes.all()
-                friend_requests = []
-                for req in all_requests:
-                    receiver = req.receiver.single()
-                    if receiver.uid == user.uid:
-                        friend_requests.append(req)
-            elif request_type == 'sent':
-                # Get requests sent by this user - need to check all friend requests and filter manually
-                all_requests = FriendRequest.nodes.all()
-                friend_requests = []
-                for req in all_requests:
-                    sender = req.sender.single()
-                    if sender.uid == user.uid:
-                        friend_requests.append(req)
-            else:
-                # Get all requests involving this user
-                all_requests = FriendRequest.nodes.all()
-                friend_requests = []
-                for req in all_requests:
-                    sender = req.sender.single()
-                    receiver = req.receiver.single()
-                    if sender.uid == user.uid or receiver.uid == user.uid:
-                        friend_requests.append(req)
+            if request_type not in REQUEST_TRAVERSALS:
+                return Response({'error': 'Invalid type'}, status=status.HTTP_400_BAD_REQUEST)
+            if request_status and request_status not in FriendRequest.status.choices:
+                return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                limit = parse_limit(request.GET.get('limit'), default=50)
+                cursor = decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else (None, None)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Fetch one extra row to know whether there is another page
+            results, _ = db.cypher_query(
+                FRIEND_REQUEST_PAGE_QUERY.format(traversal=REQUEST_TRAVERSALS[request_type]),
+                {
+                    'user_uid': user.uid,
+                    'status': request_status,
+                    'cursor_ts': cursor[0],
+                    'cursor_uid': cursor[1],
+                    'limit': limit + 1
+                }
+            )
+            has_more = len(results) > limit
+            results = results[:limit]
             
             requests_data = []
-            for req in friend_requests:
-                sender = req.sender.single()
-                receiver = req.receiver.single()
+            for fr_node, created_at, sender, receiver in results:
+                req = FriendRequest.inflate(fr_node)
                 requests_data.append({
                     'uid': req.uid,
                     'message': req.message,
                     'status': req.status,
                     'created_at': req.created_at.isoformat() if req.created_at else None,
                     'responded_at': req.responded_at.isoformat() if req.responded_at else None,
-                    'sender': {
-                        'uid': sender.uid,
-                        'username': sender.username,
-                        'display_name': sender.display_name
-                    },
-                    'receiver': {
-                        'uid': receiver.uid,
-                        'username': receiver.username,
-                        'display_name': receiver.display_name
-                    }
+                    'sender': sender,
+                    'receiver': receiver
                 })
             
+            next_cursor = None
+            if has_more:
+                last_node, last_created_at = results[-1][0], results[-1][1]
+                next_cursor = encode_cursor(last_created_at, last_node.get('uid'))
+            
             return Response({
                 'friend_requests': requests_data,
-                'count': len(requests_data)
+                'type': request_type,
+                'count': len(requests_data),
+                'has_more': has_more,
+                'next_cursor': next_cursor
             })
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)    
@@ -169,47 +244,26 @@ class FriendRequestView(APIView):
             # Use authenticated user as sender
             sender = request.user_account
             
-            # Get receiver account
-            try:
-                receiver = Account.nodes.get(uid=data['receiver_uid'])
-            except Account.DoesNotExist:
-                return Response({'error': 'Receiver account not found'}, status=status.HTTP_404_NOT_FOUND)
-            
             # Check if trying to send request to self
-            try:
-                if sender.uid == receiver.uid:
-                    return Response({'error': 'Cannot send friend request to yourself'}, status=status.HTTP_400_BAD_REQUEST)
-            except AttributeError as e:
-                return Response({'error': f'UID access error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            # Check if they are already friends
-            try:
-                if receiver in sender.friends.all():
-                    return Response({'error': 'You are already friends with this user'}, status=status.HTTP_400_BAD_REQUEST)
-            except Exception as e:
-                return Response({'error': f'Friends check error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            if sender.uid == data['receiver_uid']:
+                return Response({'error': 'Cannot send friend request to yourself'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Check if request already exists (in either direction)
-            try:
-                existing_requests = FriendRequest.nodes.filter(status='pending')
-                for req in existing_requests:
-                    req_sender = req.sender.single()
-                    req_receiver = req.receiver.single()
-                    if (req_sender.uid == sender.uid and req_receiver.uid == receiver.uid):
-                        return Response({'error': 'Friend request already sent'}, status=status.HTTP_400_BAD_REQUEST)
-            except Exception as e:
-                return Response({'error': f'Existing request check error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Look up the receiver and check friendship / pending requests in either direction
+            results, _ = db.cypher_query(SEND_REQUEST_CHECK_QUERY, {
+                'sender_uid': sender.uid,
+                'receiver_uid': data['receiver_uid']
+            })
+            if not results:
+                return Response({'error': 'Receiver account not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            # Check if there's a pending request from the other user
-            try:
-                existing_requests = FriendRequest.nodes.filter(status='pending')
-                for req in existing_requests:
-                    req_sender = req.sender.single()
-                    req_receiver = req.receiver.single()
-                    if (req_sender.uid == receiver.uid and req_receiver.uid == sender.uid):
-                        return Response({'error': 'This user has already sent you a friend request'}, status=status.HTTP_400_BAD_REQUEST)
-            except Exception as e:
-                return Response({'error': f'Reverse request check error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            receiver_node, already_friends, already_sent, already_received = results[0]
+            receiver = Account.inflate(receiver_node)
+            if already_friends:
+                return Response({'error': 'You are already friends with this user'}, status=status.HTTP_400_BAD_REQUEST)
+            if already_sent:
+                return Response({'error': 'Friend request already sent'}, status=status.HTTP_400_BAD_REQUEST)
+            if already_received:
+                return Response({'error': 'This user has already sent you a friend request'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Create friend request
             friend_request = FriendRequest(
@@ -217,9 +271,22 @@ class FriendRequestView(APIView):
                 status='pending'
             ).save()
             
-            friend_request.sender.connect(sender)
+            friend_request.sender.connect(sender.node)
             friend_request.receiver.connect(receiver)
             
+            publish([user_topic(receiver.uid)], {
+                'type': 'friend_request.received',
+                'friend_request': {
+                    'uid': friend_request.uid,
+                    'message': friend_request.message,
+                    'sender': {
+                        'uid': sender.uid,
+                        'username': sender.username,
+                        'display_name': sender.display_name
+                    }
+                }
+            })
+            
             return Response({
                 'message': 'Friend request sent successfully',
                 'receiver': {
@@ -292,6 +359,7 @@ class FriendRequestView(APIView):
                 sender.friends.connect(receiver)
                 receiver.friends.connect(sender)
                 
+                self._publish_response(friend_request, sender, receiver, 'accepted')
                 return Response({'message': 'Friend request accepted'})
             
             elif action == 'reject':
@@ -299,6 +367,7 @@ class FriendRequestView(APIView):
                 friend_request.responded_at = datetime.now()
                 friend_request.save()
                 
+                self._publish_response(friend_request, friend_request.sender.single(), request.user_account, 'rejected')
                 return Response({'message': 'Friend request rejected'})
             
             else:
@@ -306,3 +375,18 @@ class FriendRequestView(APIView):
                 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @staticmethod
+    def _publish_response(friend_request, sender, receiver, outcome):
+        """Tell the sender of a friend request that it was accepted or rejected"""
+        publish([user_topic(sender.uid)], {
+            'type': f'friend_request.{outcome}',
+            'friend_request': {
+                'uid': friend_request.uid,
+                'receiver': {
+                    'uid': receiver.uid,
+                    'username': receiver.username,
+                    'display_name': receiver.display_name
+                }
+            }
+        })
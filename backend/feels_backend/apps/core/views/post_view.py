@@ -4,9 +4,49 @@ from rest_framework import status
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 import json
+from datetime import timezone
 
-from ..models import Account, Post, Feeling
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from neomodel import db
+
+from ..models import Post
 from ..authentication import authenticate_request
+from ..feeling_catalog import get_feeling, get_feeling_node, stores_feeling_property
+from ..pagination import decode_cursor, encode_cursor, parse_limit
+from ..queries import get_author_posts
+
+
+# One page of the global post feed, newest first, with author and feeling
+# projected and the body truncated server-side. ``where`` is assembled from the
+# active filters so the created_at range index can drive the ordering. Only the
+# feeling's name is read; it is rendered from the in-process feeling catalog.
+POST_FEED_QUERY = """
+MATCH (p:Post)
+WHERE {where}
+WITH p
+ORDER BY p.created_at DESC, p.uid DESC
+LIMIT $limit
+OPTIONAL MATCH (p)-[:CREATED_BY]->(a:Account)
+OPTIONAL MATCH (p)-[:EXPRESSES_FEELING]->(f:Feeling)
+WHERE p.feeling_name IS NULL
+RETURN p.uid AS uid,
+       p.created_at AS created_at,
+       CASE WHEN size(p.body) > $preview_length
+            THEN left(p.body, $preview_length) + '...'
+            ELSE p.body END AS body,
+       CASE WHEN a IS NULL THEN NULL ELSE a {{.uid, .username, .display_name}} END AS author,
+       coalesce(p.feeling_name, f.name) AS feeling_name
+ORDER BY created_at DESC, uid DESC
+"""
+
+# Link a new post to its author and count it in the same statement; the
+# increment is done by the database, so concurrent posts by one author all count
+CONNECT_AUTHOR_QUERY = """
+MATCH (p:Post {uid: $post_uid}), (a:Account {uid: $author_uid})
+CREATE (p)-[:CREATED_BY]->(a)
+SET a.feelings_shared_count = coalesce(a.feelings_shared_count, 0) + 1
+"""
 
 
 class PostView(APIView):
@@ -14,13 +54,37 @@ class PostView(APIView):
     
     @extend_schema(
         summary="Get post details or list posts",
-        description="Retrieve a specific post by ID or list posts. Can filter by author.",
+        description="Retrieve a specific post by ID or list posts newest first (cursor paginated). Can filter by author, feeling or creation time.",
         parameters=[
             OpenApiParameter(
                 name='author_uid',
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
                 description='Filter posts by author UID'
+            ),
+            OpenApiParameter(
+                name='feeling',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only list posts expressing this feeling (by name)'
+            ),
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description='Only list posts created at or after this ISO 8601 timestamp (UTC if no offset is given)'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of posts to return (default: POSTS_PAGE_SIZE, capped at POSTS_MAX_PAGE_SIZE)'
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Cursor from next_cursor of the previous page'
             )
         ],
         responses={
@@ -52,7 +116,10 @@ class PostView(APIView):
                                     "display_name": "John Doe"
                                 }
                             }
-                        ]
+                        ],
+                        "count": 1,
+                        "has_more": False,
+                        "next_cursor": None
                     }
                 }
             },
@@ -66,7 +133,10 @@ class PostView(APIView):
             if post_id:
                 post = Post.nodes.get(uid=post_id)
                 author = post.author.single()
-                feeling = post.feeling.single()
+                feeling_name = post.feeling_name
+                if not feeling_name:
+                    feeling_node = post.feeling.single()
+                    feeling_name = feeling_node.name if feeling_node else None
                 
                 return Response({
                     'uid': post.uid,
@@ -77,10 +147,7 @@ class PostView(APIView):
                         'username': author.username,
                         'display_name': author.display_name
                     },
-                    'feeling': {
-                        'name': feeling.name,
-                        'color': feeling.color
-                    } if feeling else None
+                    'feeling': get_feeling(feeling_name)
                 })
             else:
                 # Check if filtering by author (user)
@@ -88,37 +155,79 @@ class PostView(APIView):
                 if author_uid:
                     return self._get_posts_by_author(request, author_uid)
                 
-                # Return all posts if no filter
-                posts = Post.nodes.all()
-                posts_data = []
-                for post in posts:
-                    author = post.author.single()
-                    feeling = post.feeling.single()
-                    
-                    post_data = {
-                        'uid': post.uid,
-                        'body': post.body[:100] + '...' if len(post.body) > 100 else post.body,
-                        'created_at': str(post.created_at),
-                        'author': {
-                            'uid': author.uid if author else None,
-                            'username': author.username if author else 'Unknown',
-                            'display_name': author.display_name if author else 'Unknown'
-                        },
-                        'feeling': {
-                            'name': feeling.name,
-                            'color': feeling.color
-                        } if feeling else None
-                    }
-                    posts_data.append(post_data)
-                
-                return Response({
-                    'posts': posts_data
-                })
+                return self._get_post_feed(request)
         except Post.DoesNotExist:
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def _get_post_feed(self, request):
+        """List posts newest first, one page per Cypher round-trip"""
+        try:
+            limit = parse_limit(
+                request.GET.get('limit'),
+                default=settings.POSTS_PAGE_SIZE,
+                maximum=settings.POSTS_MAX_PAGE_SIZE
+            )
+            cursor = decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+            since = None
+            if request.GET.get('since'):
+                since = parse_datetime(request.GET['since'])
+                if since is None:
+                    raise ValueError(f"Invalid since timestamp: {request.GET['since']}")
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        conditions = ['p.created_at IS NOT NULL']
+        params = {
+            'limit': limit + 1,  # One extra row to know whether there is another page
+            'preview_length': settings.POST_PREVIEW_LENGTH
+        }
+        if since:
+            conditions.append('p.created_at >= $since')
+            params['since'] = since.timestamp()
+        if cursor:
+            conditions.append(
+                '(p.created_at < $cursor_ts OR (p.created_at = $cursor_ts AND p.uid < $cursor_uid))'
+            )
+            params['cursor_ts'], params['cursor_uid'] = cursor
+        if request.GET.get('feeling'):
+            conditions.append(
+                '(p.feeling_name = $feeling OR EXISTS { (p)-[:EXPRESSES_FEELING]->(:Feeling {name: $feeling}) })'
+            )
+            params['feeling'] = request.GET['feeling']
+        
+        results, _ = db.cypher_query(POST_FEED_QUERY.format(where=' AND '.join(conditions)), params)
+        has_more = len(results) > limit
+        results = results[:limit]
+        
+        posts_data = []
+        for uid, created_at, body, author, feeling_name in results:
+            posts_data.append({
+                'uid': uid,
+                'body': body,
+                'created_at': str(Post.created_at.inflate(created_at)),
+                'author': author or {
+                    'uid': None,
+                    'username': 'Unknown',
+                    'display_name': 'Unknown'
+                },
+                'feeling': get_feeling(feeling_name)
+            })
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(results[-1][1], results[-1][0])
+        
+        return Response({
+            'posts': posts_data,
+            'count': len(posts_data),
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        })
+    
     @extend_schema(
         summary="Create a new post",
         description="Create a new post with optional feeling connection. Requires authentication.",
@@ -166,31 +275,29 @@ class PostView(APIView):
             # Use authenticated user as author
             author = request.user_account
             
-            # Create the post
+            # Resolved from the feeling catalog, without a query
+            feeling = get_feeling_node(data.get('feeling_name'))
+            if 'feeling_name' in data and feeling is None:
+                print(f"Feeling '{data['feeling_name']}' not found in database")
+            
+            # Create the post, with the feeling stored on it or linked to it (FEELING_STORAGE)
             post = Post(
                 body=data['body'],
+                feeling_name=feeling.name if feeling and stores_feeling_property() else None
             ).save()
             
-            # Connect to author
-            post.author.connect(author)
+            # Connect to author and update their feelings shared count
+            db.cypher_query(CONNECT_AUTHOR_QUERY, {'post_uid': post.uid, 'author_uid': author.uid})
             
             # Connect to feeling if provided
-            feeling_connected = False
-            if 'feeling_name' in data:
+            feeling_connected = post.feeling_name is not None
+            if feeling and not feeling_connected:
                 try:
-                    feeling = Feeling.nodes.filter(name=data['feeling_name']).first()
-                    if feeling:
-                        post.feeling.connect(feeling)
-                        feeling_connected = True
-                    else:
-                        print(f"Feeling '{data['feeling_name']}' not found in database")
+                    post.feeling.connect(feeling)
+                    feeling_connected = True
                 except Exception as feeling_error:
                     print(f"Error connecting feeling '{data['feeling_name']}': {str(feeling_error)}")
             
-            # Update author's feelings shared count
-            author.feelings_shared_count += 1
-            author.save()
-            
             response_data = {
                 'uid': post.uid,
                 'message': 'Post created successfully'
@@ -211,61 +318,29 @@ class PostView(APIView):
         try:
             requesting_user = request.user_account
             
-            # Get the target user (author whose posts are being requested)
             try:
-                target_user = Account.nodes.get(uid=author_uid)
-            except Account.DoesNotExist:
-                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-            
-            # If requesting posts from self, allow access
-            if requesting_user.uid == target_user.uid:
-                posts_query = Post.nodes.filter()
-                posts = [post for post in posts_query if post.author.single().uid == target_user.uid]
-            else:
-                # Check if users are friends
-                are_friends = target_user in requesting_user.friends.all()
-                if not are_friends:
-                    return Response({
-                        'error': 'You can only view posts from users you are friends with'
-                    }, status=status.HTTP_403_FORBIDDEN)
-                
-                # Get posts by the target user
-                posts_query = Post.nodes.filter()
-                posts = [post for post in posts_query if post.author.single().uid == target_user.uid]
+                limit = parse_limit(request.GET.get('limit'), default=50)
+                cursor = decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Format posts data
-            posts_data = []
-            for post in posts:
-                author = post.author.single()
-                feeling = post.feeling.single()
-                
-                post_data = {
-                    'uid': post.uid,
-                    'body': post.body,
-                    'created_at': str(post.created_at),
-                    'author': {
-                        'uid': author.uid,
-                        'username': author.username,
-                        'display_name': author.display_name
-                    },
-                    'feeling': {
-                        'name': feeling.name,
-                        'color': feeling.color
-                    } if feeling else None
-                }
-                posts_data.append(post_data)
+            # Author lookup, friendship check and the page of posts in one round-trip
+            result = get_author_posts(requesting_user.uid, author_uid, limit, cursor)
+            if result is None:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            # Sort by creation date (newest first)
-            posts_data.sort(key=lambda x: x['created_at'], reverse=True)
+            target_user, allowed, posts_data, next_cursor_key = result
+            if not allowed:
+                return Response({
+                    'error': 'You can only view posts from users you are friends with'
+                }, status=status.HTTP_403_FORBIDDEN)
             
             return Response({
                 'posts': posts_data,
-                'author': {
-                    'uid': target_user.uid,
-                    'username': target_user.username,
-                    'display_name': target_user.display_name
-                },
-                'count': len(posts_data)
+                'author': target_user,
+                'count': len(posts_data),
+                'has_more': next_cursor_key is not None,
+                'next_cursor': encode_cursor(*next_cursor_key) if next_cursor_key else None
             })
             
         except Exception as e:
@@ -1,9 +1,11 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from drf_spectacular.utils import extend_schema
-from ..models import Account, Post
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
 from ..authentication import authenticate_request
+from ..pagination import decode_cursor, encode_cursor, parse_limit
+from ..queries import get_author_posts
 
 
 class UserPostsView(APIView):
@@ -11,7 +13,21 @@ class UserPostsView(APIView):
     
     @extend_schema(
         summary="Get posts by a specific user",
-        description="Retrieve all posts by a specific user. Requires authentication and friendship (unless viewing own posts).",
+        description="Retrieve posts by a specific user, newest first. Requires authentication and friendship (unless viewing own posts).",
+        parameters=[
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of posts to return (default: 50, capped at MAX_PAGE_SIZE)'
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Cursor from next_cursor of the previous page'
+            )
+        ],
         responses={
             200: {
                 "description": "List of user's posts",
@@ -37,7 +53,9 @@ class UserPostsView(APIView):
                         "username": "johndoe",
                         "display_name": "John Doe"
                     },
-                    "count": 1
+                    "count": 1,
+                    "has_more": False,
+                    "next_cursor": None
                 }
             },
             403: {"description": "Can only view posts from friends or self"},
@@ -51,66 +69,30 @@ class UserPostsView(APIView):
         try:
             requesting_user = request.user_account
             
-            # Get the target user
             try:
-                target_user = Account.nodes.get(uid=user_id)
-            except Account.DoesNotExist:
-                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-            
-            # If requesting posts from self, allow access
-            if requesting_user.uid == target_user.uid:
-                posts_query = Post.nodes.filter()
-                posts = [post for post in posts_query if post.author.single().uid == target_user.uid]
-            else:
-                # Check if users are friends
-                are_friends = target_user in requesting_user.friends.all()
-                if not are_friends:
-                    return Response({
-                        'error': 'You can only view posts from users you are friends with',
-                        'target_user': {
-                            'uid': target_user.uid,
-                            'username': target_user.username,
-                            'display_name': target_user.display_name
-                        }
-                    }, status=status.HTTP_403_FORBIDDEN)
-                
-                # Get posts by the target user
-                posts_query = Post.nodes.filter()
-                posts = [post for post in posts_query if post.author.single().uid == target_user.uid]
+                limit = parse_limit(request.GET.get('limit'), default=50)
+                cursor = decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Format posts data
-            posts_data = []
-            for post in posts:
-                author = post.author.single()
-                feeling = post.feeling.single()
-                
-                post_data = {
-                    'uid': post.uid,
-                    'body': post.body,
-                    'created_at': str(post.created_at),
-                    'author': {
-                        'uid': author.uid,
-                        'username': author.username,
-                        'display_name': author.display_name
-                    },
-                    'feeling': {
-                        'name': feeling.name,
-                        'color': feeling.color
-                    } if feeling else None
-                }
-                posts_data.append(post_data)
+            # Author lookup, friendship check and the page of posts in one round-trip
+            result = get_author_posts(requesting_user.uid, user_id, limit, cursor)
+            if result is None:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            # Sort by creation date (newest first)
-            posts_data.sort(key=lambda x: x['created_at'], reverse=True)
+            target_user, allowed, posts_data, next_cursor_key = result
+            if not allowed:
+                return Response({
+                    'error': 'You can only view posts from users you are friends with',
+                    'target_user': target_user
+                }, status=status.HTTP_403_FORBIDDEN)
             
             return Response({
                 'posts': posts_data,
-                'author': {
-                    'uid': target_user.uid,
-                    'username': target_user.username,
-                    'display_name': target_user.display_name
-                },
-                'count': len(posts_data)
+                'author': target_user,
+                'count': len(posts_data),
+                'has_more': next_cursor_key is not None,
+                'next_cursor': encode_cursor(*next_cursor_key) if next_cursor_key else None
             })
             
         except Exception as e:
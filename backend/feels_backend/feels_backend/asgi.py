@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'feels_backend.settings')
 
 application = get_asgi_application()
+
+# Feelings are served from an in-process catalog; load it before the first request
+from apps.core.feeling_catalog import load_feeling_catalog  # noqa: E402
+
+load_feeling_catalog()
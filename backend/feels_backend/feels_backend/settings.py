@@ -43,8 +43,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'apps.core.apps.CoreConfig',  # Before django_neomodel: its install_labels adds composite indexes
     'django_neomodel',
-    'apps.core.apps.CoreConfig',
     'drf_spectacular',
 ]
 
@@ -138,6 +138,93 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Authentication token storage
+# Dotted path of the token store backend (see apps/core/token_store.py) and the
+# per-worker cache placed in front of it (TTL in seconds, 0 disables the cache)
+AUTH_TOKEN_STORE = os.getenv('AUTH_TOKEN_STORE', 'apps.core.token_store.Neo4jTokenStore')
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', '30'))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000'))
+# Hard cap on stored tokens (oldest evicted first) and incremental sweeping of
+# expired tokens: at most SWEEP_BATCH per sweep, Neo4j sweeps every SWEEP_INTERVAL seconds
+AUTH_TOKEN_MAX_TOKENS = int(os.getenv('AUTH_TOKEN_MAX_TOKENS', '1000000'))
+AUTH_TOKEN_SWEEP_BATCH = int(os.getenv('AUTH_TOKEN_SWEEP_BATCH', '1000'))
+AUTH_TOKEN_SWEEP_INTERVAL = int(os.getenv('AUTH_TOKEN_SWEEP_INTERVAL', '60'))
+# Concurrent sessions per user (oldest evicted first) and the minimum number of
+# seconds between two last-seen updates of the same session
+AUTH_MAX_SESSIONS_PER_USER = int(os.getenv('AUTH_MAX_SESSIONS_PER_USER', '10'))
+AUTH_SESSION_TOUCH_INTERVAL = int(os.getenv('AUTH_SESSION_TOUCH_INTERVAL', '60'))
+
+# Token mode: 'opaque' (every request is checked against the token store) or
+# 'signed' (short-lived HMAC-signed access tokens verified in-process, plus
+# stored refresh tokens). Lifetimes in seconds; revoked refresh tokens are
+# re-synced from the token store every AUTH_DENYLIST_SYNC_INTERVAL seconds.
+AUTH_TOKEN_MODE = os.getenv('AUTH_TOKEN_MODE', 'opaque')
+AUTH_ACCESS_TOKEN_LIFETIME = int(os.getenv('AUTH_ACCESS_TOKEN_LIFETIME', '900'))
+AUTH_REFRESH_TOKEN_LIFETIME = int(os.getenv('AUTH_REFRESH_TOKEN_LIFETIME', str(14 * 24 * 3600)))
+AUTH_DENYLIST_SYNC_INTERVAL = int(os.getenv('AUTH_DENYLIST_SYNC_INTERVAL', '5'))
+
+# Authenticated account cache
+# Per-worker TTL/LRU cache of (uid, username, display_name) attached to each
+# authenticated request (TTL in seconds, 0 disables the cache)
+ACCOUNT_CACHE_TTL = int(os.getenv('ACCOUNT_CACHE_TTL', '60'))
+ACCOUNT_CACHE_SIZE = int(os.getenv('ACCOUNT_CACHE_SIZE', '10000'))
+
+# Pagination
+# Upper bound for the ``limit`` query parameter accepted by list endpoints
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+
+# Global post feed (GET /api/posts/): default page size, page-size ceiling and
+# the number of body characters returned before truncating with '...'
+POSTS_PAGE_SIZE = int(os.getenv('POSTS_PAGE_SIZE', '20'))
+POSTS_MAX_PAGE_SIZE = int(os.getenv('POSTS_MAX_PAGE_SIZE', '50'))
+POST_PREVIEW_LENGTH = int(os.getenv('POST_PREVIEW_LENGTH', '100'))
+
+# Chats: characters of the last message kept in the chat's inbox summary
+CHAT_PREVIEW_LENGTH = int(os.getenv('CHAT_PREVIEW_LENGTH', '100'))
+
+# Per-worker memo of confirmed chat memberships used to authorize chat requests
+# (TTL in seconds, 0 disables the memo)
+CHAT_MEMBERSHIP_TTL = int(os.getenv('CHAT_MEMBERSHIP_TTL', '30'))
+CHAT_MEMBERSHIP_CACHE_SIZE = int(os.getenv('CHAT_MEMBERSHIP_CACHE_SIZE', '50000'))
+
+# Message layout of new chats: 'flat' (messages linked to the chat) or 'bucketed'
+# (messages grouped in per-day MessageBucket nodes, for very busy chats).
+# Existing chats are converted with ``python manage.py bucket_chat_messages``.
+CHAT_MESSAGE_LAYOUT = os.getenv('CHAT_MESSAGE_LAYOUT', 'flat')
+
+# Coalesced chat summaries: when > 0, sends no longer update the chat's last
+# message and count themselves; each worker writes them every this many
+# milliseconds (latest wins), so concurrent sends don't contend on the chat node.
+# 0 updates the summary in every send's transaction.
+CHAT_SUMMARY_FLUSH_INTERVAL = int(os.getenv('CHAT_SUMMARY_FLUSH_INTERVAL', '0'))
+
+# Most messages accepted by one batch send (POST /api/messages/batch/), all
+# written in a single transaction
+MESSAGE_BATCH_MAX_SIZE = int(os.getenv('MESSAGE_BATCH_MAX_SIZE', '100'))
+
+# Feelings of posts and messages: 'relationship' links each one to the shared
+# Feeling node (EXPRESSES_FEELING), 'property' stores the feeling's name on it so
+# writes never lock the Feeling nodes. Existing links are converted with
+# ``python manage.py migrate_feeling_storage``.
+FEELING_STORAGE = os.getenv('FEELING_STORAGE', 'relationship')
+# Each worker caches the catalog of feelings and checks at most every this many
+# seconds whether another worker changed it (see apps/core/feeling_catalog.py)
+FEELING_CATALOG_CHECK_INTERVAL = int(os.getenv('FEELING_CATALOG_CHECK_INTERVAL', '5'))
+# Seconds clients and CDNs may reuse GET /api/feelings/ before revalidating it
+# with If-None-Match (its snapshot_url is cacheable for good)
+FEELING_CATALOG_MAX_AGE = int(os.getenv('FEELING_CATALOG_MAX_AGE', '300'))
+
+# Real-time events (GET /api/events/)
+# Broker used to fan events out to connected clients (see apps/core/realtime.py),
+# events buffered per client before it is disconnected as too slow, seconds
+# between keep-alive frames and the reconnect delay suggested to clients (ms)
+REALTIME_BROKER = os.getenv('REALTIME_BROKER', 'apps.core.realtime.InProcessBroker')
+REALTIME_QUEUE_SIZE = int(os.getenv('REALTIME_QUEUE_SIZE', '100'))
+REALTIME_HEARTBEAT_INTERVAL = int(os.getenv('REALTIME_HEARTBEAT_INTERVAL', '15'))
+REALTIME_RETRY_MS = int(os.getenv('REALTIME_RETRY_MS', '3000'))
+# Longest a GET /api/chats/<id>/messages/?after=...&wait=... long-poll may park (seconds)
+LONG_POLL_MAX_WAIT = int(os.getenv('LONG_POLL_MAX_WAIT', '30'))
+
 # drf-spectacular configuration
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Feel Backend API',
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'feels_backend.settings')
 
 application = get_wsgi_application()
+
+# Feelings are served from an in-process catalog; load it before the first request
+from apps.core.feeling_catalog import load_feeling_catalog  # noqa: E402
+
+load_feeling_catalog()
@@ -0,0 +1,149 @@
+"""
+Benchmark: 50 concurrent writers sending into one group chat
+
+Each writer is a thread posting to POST /api/chats/<id>/messages/ as its own
+participant. Runs twice: with the chat summary written by every send (each send
+takes the chat node's write lock) and with coalesced summaries
+(CHAT_SUMMARY_FLUSH_INTERVAL, sends never touch the chat node). Reports
+throughput, p50/p99 latency and failed sends (e.g. lock-wait timeouts), and
+checks that the flushed summary matches the messages.
+
+Runs in-process against the Neo4j instance configured in .env:
+    python test/benchmarks/bench_chat_send_contention.py --writers 50 --messages 40
+    python test/benchmarks/bench_chat_send_contention.py --layout bucketed
+    python test/benchmarks/bench_chat_send_contention.py --cleanup
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django)
+
+from django.test import RequestFactory, override_settings  # noqa: E402
+from neomodel import db  # noqa: E402
+
+from apps.core import chat_summary  # noqa: E402
+from apps.core.authentication import AuthToken, hash_password  # noqa: E402
+from apps.core.models import Account, Chat  # noqa: E402
+from apps.core.views import MessageView  # noqa: E402
+
+PREFIX = 'bench_contention_'
+
+
+def get_or_create_account(username):
+    account = Account.nodes.get_or_none(username=username)
+    if account is None:
+        account = Account(
+            username=username,
+            email=f'{username}@example.com',
+            display_name=username,
+            password_hash=hash_password('benchmark')
+        ).save()
+    return account
+
+
+def run(label, writers, messages, layout):
+    accounts = [get_or_create_account(f'{PREFIX}{i}') for i in range(writers)]
+    chat = Chat(name=f'Contention benchmark ({label})', is_group_chat=True, bucketed=layout == 'bucketed').save()
+    for account in accounts:
+        chat.participants.connect(account)
+    tokens = [AuthToken.create_token(account.uid) for account in accounts]
+    factory = RequestFactory()
+
+    timings = []
+    failures = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers)
+
+    def writer(token):
+        barrier.wait()
+        for i in range(messages):
+            request = factory.post(
+                f'/api/chats/{chat.uid}/messages/',
+                data=json.dumps({'text': f'{label} {i}'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+            start = time.perf_counter()
+            response = MessageView.as_view()(request, chat_id=chat.uid)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if response.status_code == 201:
+                    timings.append(elapsed)
+                else:
+                    failures.append(response.data.get('error'))
+
+    threads = [threading.Thread(target=writer, args=(token,)) for token in tokens]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    summary_writer = chat_summary.get_summary_writer()
+    if summary_writer:
+        summary_writer.close()
+
+    timings.sort()
+    p50 = statistics.median(timings) if timings else 0
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] if timings else 0
+    print(f"{label:<12} | {len(timings) / wall:>9.1f} | {p50:>8.2f} | {p99:>8.2f} | {len(failures):>6}")
+    if failures:
+        print(f"   first failure: {failures[0]}")
+
+    chat.refresh()
+    results, _ = db.cypher_query(
+        "MATCH (c:Chat {uid: $uid})-[:LAST_MESSAGE]->(m:Message) RETURN m.uid",
+        {'uid': chat.uid}
+    )
+    assert chat.message_count == len(timings), f"message_count {chat.message_count} != {len(timings)} sent"
+    assert results and results[0][0] == chat.last_message_uid, "LAST_MESSAGE does not match the summary"
+
+
+def cleanup():
+    print("🧹 Removing benchmark chats, messages and accounts...")
+    db.cypher_query(
+        """
+        MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+        OPTIONAL MATCH (a)-[:PARTICIPATES_IN]->(c:Chat)
+        OPTIONAL MATCH (m:Message)-[:SENT_BY]->(a)
+        OPTIONAL MATCH (b:MessageBucket)-[:BUCKET_OF]->(c)
+        DETACH DELETE m, b, c, a
+        """,
+        {'prefix': PREFIX}
+    )
+    print("✅ Done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=40, help='Messages sent by each writer')
+    parser.add_argument('--flush-interval', type=int, default=50, help='Coalesced flush interval in ms')
+    parser.add_argument('--layout', choices=['flat', 'bucketed'], default='flat')
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark data and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    print(f"🔒 {args.writers} writers x {args.messages} messages into one {args.layout} chat")
+    print("=" * 60)
+    print(f"{'summary':<12} | {'msg/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'failed':>6}")
+    for label, interval in (('per send', 0), ('coalesced', args.flush_interval)):
+        chat_summary._writer = None
+        with override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=interval):
+            run(label, args.writers, args.messages, args.layout)
+    print("✅ Summaries match the messages in both modes")
+
+
+if __name__ == "__main__":
+    main()
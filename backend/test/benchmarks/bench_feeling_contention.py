@@ -0,0 +1,161 @@
+"""
+Benchmark: concurrent posts and messages expressing the same feeling
+
+Each writer is a thread creating posts (POST /api/posts/) and sending feeling
+messages to a chat of its own (POST /api/chats/<id>/messages/), all with the
+same feeling. Runs twice: with FEELING_STORAGE = 'relationship' (every write
+links to the shared Feeling node and takes its lock) and 'property' (the name
+is stored on the post or message). Reports throughput, p50/p99 latency and
+failed writes per layout, and checks that every write kept its feeling.
+
+Runs in-process against the Neo4j instance configured in .env:
+    python test/benchmarks/bench_feeling_contention.py --writers 50 --writes 40
+    python test/benchmarks/bench_feeling_contention.py --cleanup
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django)
+
+from django.test import RequestFactory, override_settings  # noqa: E402
+from neomodel import db  # noqa: E402
+
+from apps.core.authentication import AuthToken, hash_password  # noqa: E402
+from apps.core.feeling_catalog import feeling_catalog_changed  # noqa: E402
+from apps.core.models import Account, Chat, Feeling  # noqa: E402
+from apps.core.views import MessageView, PostView  # noqa: E402
+
+PREFIX = 'bench_feeling_'
+FEELING_NAME = 'Grateful'
+
+COUNT_WITH_FEELING = """
+MATCH (a:Account)<-[:CREATED_BY|SENT_BY]-(n)
+WHERE a.username STARTS WITH $prefix
+  AND coalesce(n.text, n.body) STARTS WITH $label
+  AND (n.feeling_name = $feeling OR EXISTS { (n)-[:EXPRESSES_FEELING]->(:Feeling {name: $feeling}) })
+RETURN count(DISTINCT n)
+"""
+
+
+def get_or_create_account(username):
+    account = Account.nodes.get_or_none(username=username)
+    if account is None:
+        account = Account(
+            username=username,
+            email=f'{username}@example.com',
+            display_name=username,
+            password_hash=hash_password('benchmark')
+        ).save()
+    return account
+
+
+def run(storage, writers, writes):
+    accounts = [get_or_create_account(f'{PREFIX}{i}') for i in range(writers)]
+    chats = []
+    for account in accounts:
+        chat = Chat(name=f'Feeling benchmark ({storage})', is_group_chat=True).save()
+        chat.participants.connect(account)
+        chats.append(chat)
+    tokens = [AuthToken.create_token(account.uid) for account in accounts]
+    factory = RequestFactory()
+    label = f'{storage} {time.time()}'
+
+    timings = []
+    failures = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers)
+
+    def writer(token, chat):
+        barrier.wait()
+        for i in range(writes):
+            if i % 2:
+                request = factory.post(
+                    f'/api/chats/{chat.uid}/messages/',
+                    data=json.dumps({'text': f'{label} {i}', 'message_type': 'feeling', 'feeling_name': FEELING_NAME}),
+                    content_type='application/json',
+                    HTTP_AUTHORIZATION=f'Bearer {token}'
+                )
+                view = lambda: MessageView.as_view()(request, chat_id=chat.uid)  # noqa: E731
+            else:
+                request = factory.post(
+                    '/api/posts/',
+                    data=json.dumps({'body': f'{label} {i}', 'feeling_name': FEELING_NAME}),
+                    content_type='application/json',
+                    HTTP_AUTHORIZATION=f'Bearer {token}'
+                )
+                view = lambda: PostView.as_view()(request)  # noqa: E731
+            start = time.perf_counter()
+            response = view()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if response.status_code == 201:
+                    timings.append(elapsed)
+                else:
+                    failures.append(response.data.get('error'))
+
+    threads = [threading.Thread(target=writer, args=(token, chat)) for token, chat in zip(tokens, chats)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    timings.sort()
+    p50 = statistics.median(timings) if timings else 0
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] if timings else 0
+    print(f"{storage:<12} | {len(timings) / wall:>9.1f} | {p50:>8.2f} | {p99:>8.2f} | {len(failures):>6}")
+    if failures:
+        print(f"   first failure: {failures[0]}")
+
+    results, _ = db.cypher_query(COUNT_WITH_FEELING, {'prefix': PREFIX, 'label': label, 'feeling': FEELING_NAME})
+    assert results[0][0] == len(timings), f"{results[0][0]} of {len(timings)} writes kept their feeling"
+
+
+def cleanup():
+    print("🧹 Removing benchmark posts, chats, messages and accounts...")
+    db.cypher_query(
+        """
+        MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+        OPTIONAL MATCH (a)-[:PARTICIPATES_IN]->(c:Chat)
+        OPTIONAL MATCH (n)-[:CREATED_BY|SENT_BY]->(a)
+        DETACH DELETE n, c, a
+        """,
+        {'prefix': PREFIX}
+    )
+    print("✅ Done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--writes', type=int, default=40, help='Posts and messages created by each writer')
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark data and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    if Feeling.nodes.get_or_none(name=FEELING_NAME) is None:
+        Feeling(name=FEELING_NAME, color='#FFB6C1').save()
+        feeling_catalog_changed()
+
+    print(f"🔥 {args.writers} writers x {args.writes} posts/messages, all expressing '{FEELING_NAME}'")
+    print("=" * 60)
+    print(f"{'storage':<12} | {'writes/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'failed':>6}")
+    for storage in ('relationship', 'property'):
+        with override_settings(FEELING_STORAGE=storage):
+            run(storage, args.writers, args.writes)
+    print("✅ Every write kept its feeling in both layouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: friend request listing latency vs. global friend request count
+
+Seeds unrelated friend requests in batches (up to 1M by default) between a pool
+of benchmark accounts and times GET /api/friend-requests/ for a fixed user with
+a handful of their own requests after each growth step. With anchored
+traversals the latency should stay flat as the global count grows.
+
+Runs in-process against the Neo4j instance configured in .env:
+    python test/benchmarks/bench_friend_requests.py --sizes 1000 10000 100000 1000000
+    python test/benchmarks/bench_friend_requests.py --cleanup
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from query_counter import count_queries  # noqa: E402  (also boots Django)
+
+from django.test import RequestFactory  # noqa: E402
+from neomodel import db  # noqa: E402
+
+from apps.core.authentication import AuthToken  # noqa: E402
+from apps.core.views import FriendRequestView  # noqa: E402
+
+PREFIX = 'bench_fr_'
+POOL_PREFIX = PREFIX + 'pool_'
+TARGET_USERNAME = PREFIX + 'target'
+TARGET_REQUESTS = 5
+POOL_SIZE = 1000
+BATCH_SIZE = 10000
+
+CREATE_POOL = """
+UNWIND range(0, $size - 1) AS i
+MERGE (a:Account {username: $prefix + toString(i)})
+ON CREATE SET a.uid = randomUUID(), a.email = $prefix + toString(i) + '@example.com',
+              a.password_hash = 'benchmark', a.display_name = 'Bench ' + toString(i)
+"""
+
+SEED_BATCH = """
+MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+WITH collect(a) AS pool
+UNWIND range($start, $start + $count - 1) AS i
+WITH pool[i % size(pool)] AS sender, pool[(i * 7 + 1) % size(pool)] AS receiver, i
+CREATE (sender)-[:SENT_FRIEND_REQUEST]->(fr:FriendRequest {
+    uid: randomUUID(), status: 'pending', message: 'benchmark',
+    created_at: toFloat(timestamp()) / 1000.0 + i / 1000000.0
+})-[:RECEIVED_FRIEND_REQUEST]->(receiver)
+"""
+
+# The measured user gets a fixed number of requests, independent of the global count
+CREATE_TARGET = """
+MERGE (t:Account {username: $username})
+ON CREATE SET t.uid = randomUUID(), t.email = $username + '@example.com',
+              t.password_hash = 'benchmark', t.display_name = 'Bench Target'
+WITH t
+MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+WITH t, a LIMIT $count
+CREATE (a)-[:SENT_FRIEND_REQUEST]->(:FriendRequest {
+    uid: randomUUID(), status: 'pending', message: 'benchmark',
+    created_at: toFloat(timestamp()) / 1000.0
+})-[:RECEIVED_FRIEND_REQUEST]->(t)
+RETURN DISTINCT t.uid
+"""
+
+CLEANUP_BATCH = """
+MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+MATCH (a)-[:SENT_FRIEND_REQUEST]->(fr:FriendRequest)
+WITH fr LIMIT $batch
+DETACH DELETE fr
+RETURN count(*)
+"""
+
+
+def count_friend_requests():
+    results, _ = db.cypher_query("MATCH (fr:FriendRequest) RETURN count(fr)")
+    return results[0][0]
+
+
+def seed_until(total):
+    current = count_friend_requests()
+    while current < total:
+        count = min(BATCH_SIZE, total - current)
+        db.cypher_query(SEED_BATCH, {'prefix': POOL_PREFIX, 'start': current, 'count': count})
+        current += count
+        print(f"   seeded {current:,} friend requests", end='\r')
+    print()
+
+
+def time_listing(token, runs):
+    factory = RequestFactory()
+    timings = []
+    for _ in range(runs):
+        request = factory.get('/api/friend-requests/?type=all', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with count_queries() as statements:
+            start = time.perf_counter()
+            response = FriendRequestView.as_view()(request)
+            timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.data
+    return timings, len(statements)
+
+
+def cleanup():
+    print("🧹 Removing benchmark friend requests and accounts...")
+    while True:
+        results, _ = db.cypher_query(CLEANUP_BATCH, {'prefix': PREFIX, 'batch': BATCH_SIZE})
+        if not results[0][0]:
+            break
+    db.cypher_query("MATCH (a:Account) WHERE a.username STARTS WITH $prefix DETACH DELETE a", {'prefix': PREFIX})
+    print("✅ Done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark data and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    print("🤝 Benchmarking friend request listing")
+    print("=" * 60)
+    db.cypher_query(CREATE_POOL, {'prefix': POOL_PREFIX, 'size': POOL_SIZE})
+    results, _ = db.cypher_query(CREATE_TARGET, {
+        'username': TARGET_USERNAME, 'prefix': POOL_PREFIX, 'count': TARGET_REQUESTS
+    })
+    token = AuthToken.create_token(results[0][0])
+
+    print(f"{'global requests':>16} | {'p50 ms':>8} | {'p99 ms':>8} | {'queries':>7}")
+    for size in sorted(args.sizes):
+        seed_until(size)
+        timings, queries = time_listing(token, args.runs)
+        timings.sort()
+        p50 = statistics.median(timings)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{size:>16,} | {p50:>8.2f} | {p99:>8.2f} | {queries:>7}")
+
+
+if __name__ == "__main__":
+    main()
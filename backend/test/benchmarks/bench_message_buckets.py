@@ -0,0 +1,186 @@
+"""
+Benchmark: message pagination on a huge chat, flat vs. bucketed layout
+
+Seeds one chat with --messages messages spread over --days days (written in
+UNWIND batches straight to Neo4j), then times GET /api/chats/<id>/messages/
+for the latest page and for a page deep in the history (via a before cursor),
+plus a send, first in the flat layout (every message linked to the chat) and
+again after ``manage.py bucket_chat_messages`` moved the chat to per-day buckets.
+Reports p50/p99 latency per request.
+
+Runs in-process against the Neo4j instance configured in .env:
+    python test/benchmarks/bench_message_buckets.py --messages 1000000
+    python test/benchmarks/bench_message_buckets.py --cleanup
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django)
+
+from django.core.management import call_command  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from neomodel import db  # noqa: E402
+
+from apps.core.authentication import AuthToken, hash_password  # noqa: E402
+from apps.core.models import Account, Chat  # noqa: E402
+from apps.core.pagination import encode_cursor  # noqa: E402
+from apps.core.views import MessageView  # noqa: E402
+
+PREFIX = 'bench_bucket_'
+SEED_BATCH = 20000
+
+SEED_MESSAGES = """
+MATCH (c:Chat {uid: $chat_uid}), (s:Account {uid: $sender_uid})
+UNWIND $rows AS row
+CREATE (m:Message {uid: row.uid, text: row.text, message_type: 'text', created_at: row.created_at, is_read: false})
+CREATE (m)-[:SENT_BY]->(s)
+CREATE (m)-[:SENT_TO]->(c)
+"""
+
+
+def get_or_create_account(username):
+    account = Account.nodes.get_or_none(username=username)
+    if account is None:
+        account = Account(
+            username=username,
+            email=f'{username}@example.com',
+            display_name=username,
+            password_hash=hash_password('benchmark')
+        ).save()
+    return account
+
+
+def seed_chat(sender, other, messages, days):
+    chat = Chat(name='Bucket benchmark', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(other)
+
+    end = time.time()
+    step = days * 86400 / messages
+    start = time.perf_counter()
+    for offset in range(0, messages, SEED_BATCH):
+        rows = [
+            {'uid': uuid.uuid4().hex, 'text': f'Message {i}', 'created_at': end - (messages - i) * step}
+            for i in range(offset, min(offset + SEED_BATCH, messages))
+        ]
+        db.cypher_query(SEED_MESSAGES, {'chat_uid': chat.uid, 'sender_uid': sender.uid, 'rows': rows})
+        print(f"   seeded {offset + len(rows):,} messages", end='\r')
+    print(f"   seeded {messages:,} messages in {time.perf_counter() - start:.1f}s")
+
+    # Message count and last-message summary, as the send path would have left them
+    call_command('repair_chat_summaries')
+    return chat, end - messages * step / 2
+
+
+def time_runs(label, request_fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        request_fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<36} | {p50:>8.2f} | {p99:>8.2f}")
+
+
+def run_layout(layout, chat, token, middle_ts, runs):
+    factory = RequestFactory()
+    deep_cursor = encode_cursor(middle_ts, 'z' * 32)
+
+    def get_page(query):
+        request = factory.get(f'/api/chats/{chat.uid}/messages/?{query}', HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 200, response.data
+        assert response.data['count'] == 50, response.data
+
+    def send():
+        request = factory.post(
+            f'/api/chats/{chat.uid}/messages/',
+            data=json.dumps({'text': 'benchmark'}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 201, response.data
+
+    time_runs(f'{layout}: latest page', lambda: get_page('limit=50'), runs)
+    time_runs(f'{layout}: page mid-history', lambda: get_page(f'limit=50&before={deep_cursor}'), runs)
+    time_runs(f'{layout}: send', send, runs)
+
+
+def cleanup():
+    print("🧹 Removing benchmark chats, messages, buckets and accounts...")
+    results, _ = db.cypher_query(
+        """
+        MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+        OPTIONAL MATCH (a)-[:PARTICIPATES_IN]->(c:Chat)
+        RETURN collect(DISTINCT c.uid)
+        """,
+        {'prefix': PREFIX}
+    )
+    for chat_uid in results[0][0]:
+        while True:
+            deleted, _ = db.cypher_query(
+                """
+                MATCH (c:Chat {uid: $chat_uid})
+                CALL {
+                    WITH c
+                    MATCH (m:Message)-[:SENT_TO]->(c) RETURN m
+                    UNION
+                    WITH c
+                    MATCH (m:Message)-[:IN_BUCKET]->(:MessageBucket)-[:BUCKET_OF]->(c) RETURN m
+                }
+                WITH m LIMIT $batch
+                DETACH DELETE m
+                RETURN count(*)
+                """,
+                {'chat_uid': chat_uid, 'batch': SEED_BATCH}
+            )
+            if deleted[0][0] < SEED_BATCH:
+                break
+        db.cypher_query(
+            "MATCH (c:Chat {uid: $chat_uid}) OPTIONAL MATCH (b:MessageBucket)-[:BUCKET_OF]->(c) DETACH DELETE b, c",
+            {'chat_uid': chat_uid}
+        )
+    db.cypher_query("MATCH (a:Account) WHERE a.username STARTS WITH $prefix DETACH DELETE a", {'prefix': PREFIX})
+    print("✅ Done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark data and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    print(f"🪣 Benchmarking pagination on a {args.messages:,}-message chat")
+    print("=" * 60)
+    sender = get_or_create_account(PREFIX + 'sender')
+    other = get_or_create_account(PREFIX + 'other')
+    chat, middle_ts = seed_chat(sender, other, args.messages, args.days)
+    token = AuthToken.create_token(sender.uid)
+
+    print(f"{'request':<36} | {'p50 ms':>8} | {'p99 ms':>8}")
+    run_layout('flat', chat, token, middle_ts, args.runs)
+
+    start = time.perf_counter()
+    call_command('bucket_chat_messages', chat.uid)
+    print(f"   bucketed in {time.perf_counter() - start:.1f}s")
+    run_layout('bucketed', chat, token, middle_ts, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: message send latency, per-step ORM writes vs. one Cypher statement
+
+"before" replays the previous MessageView.post sequence (fetch chat, list
+participants, save, connect sender/chat, feeling lookup, last-message rewire,
+chat save - each its own transaction); "after" times the current
+POST /api/chats/<id>/messages/ view, which sends in a single statement.
+Reports p50/p99 latency and Cypher round-trips per send.
+
+Runs in-process against the Neo4j instance configured in .env:
+    python test/benchmarks/bench_message_send.py --runs 500
+    python test/benchmarks/bench_message_send.py --cleanup
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from query_counter import count_queries  # noqa: E402  (also boots Django)
+
+from django.test import RequestFactory  # noqa: E402
+from neomodel import db  # noqa: E402
+
+from apps.core.authentication import AuthToken, hash_password  # noqa: E402
+from apps.core.models import Account, Chat, Feeling, Message  # noqa: E402
+from apps.core.views import MessageView  # noqa: E402
+
+PREFIX = 'bench_send_'
+FEELING_NAME = 'Happy'
+
+
+def get_or_create_account(username):
+    account = Account.nodes.get_or_none(username=username)
+    if account is None:
+        account = Account(
+            username=username,
+            email=f'{username}@example.com',
+            display_name=username,
+            password_hash=hash_password('benchmark')
+        ).save()
+    return account
+
+
+def legacy_send(user, chat_id, text, feeling_name):
+    """The send path as it was before it became a single statement"""
+    chat = Chat.nodes.get(uid=chat_id)
+    participants = list(chat.participants.all())
+    assert any(p.uid == user.uid for p in participants)
+    message = Message(text=text, message_type='text').save()
+    message.sender.connect(user)
+    message.chat.connect(chat)
+    feeling = Feeling.nodes.filter(name=feeling_name).first_or_none()
+    if feeling:
+        message.feeling.connect(feeling)
+    chat.last_message_at = datetime.now()
+    if chat.last_message.all():
+        chat.last_message.disconnect_all()
+    chat.last_message.connect(message)
+    chat.save()
+
+
+def time_runs(label, send, runs):
+    timings = []
+    for i in range(runs):
+        with count_queries() as statements:
+            start = time.perf_counter()
+            send(i)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<28} | {p50:>8.2f} | {p99:>8.2f} | {len(statements):>7}")
+
+
+def cleanup():
+    print("🧹 Removing benchmark chats, messages and accounts...")
+    db.cypher_query(
+        """
+        MATCH (a:Account) WHERE a.username STARTS WITH $prefix
+        OPTIONAL MATCH (a)-[:PARTICIPATES_IN]->(c:Chat)
+        OPTIONAL MATCH (c)<-[:SENT_TO]-(m:Message)
+        DETACH DELETE m, c, a
+        """,
+        {'prefix': PREFIX}
+    )
+    print("✅ Done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=500)
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark data and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    print("✉️  Benchmarking message send")
+    print("=" * 60)
+    sender = get_or_create_account(PREFIX + 'sender')
+    other = get_or_create_account(PREFIX + 'other')
+    chat = Chat(name='Send benchmark').save()
+    chat.participants.connect(sender)
+    chat.participants.connect(other)
+    token = AuthToken.create_token(sender.uid)
+    factory = RequestFactory()
+
+    def send_view(i):
+        request = factory.post(
+            f'/api/chats/{chat.uid}/messages/',
+            data=json.dumps({'text': f'after {i}', 'feeling_name': FEELING_NAME}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 201, response.data
+
+    print(f"{'send path':<28} | {'p50 ms':>8} | {'p99 ms':>8} | {'queries':>7}")
+    time_runs('before (ORM, per step)', lambda i: legacy_send(sender, chat.uid, f'before {i}', FEELING_NAME), args.runs)
+    time_runs('after (single statement)', send_view, args.runs)
+
+
+if __name__ == "__main__":
+    main()
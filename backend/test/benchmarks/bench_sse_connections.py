@@ -0,0 +1,132 @@
+"""
+Load test: thousands of idle Server-Sent Events connections in one process
+
+Opens N concurrent GET /api/events/ streams against the Django ASGI application
+(in-process, no server or network), one user per connection, and reports:
+  * memory held per idle connection,
+  * time to fan one event out to every connection (publish -> all delivered),
+  * that every subscription is released when the clients disconnect.
+
+Tokens live in the in-memory token store, so no Neo4j is needed:
+    python test/benchmarks/bench_sse_connections.py --connections 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault('AUTH_TOKEN_STORE', 'apps.core.token_store.MemoryTokenStore')
+os.environ.setdefault('ALLOWED_HOSTS', 'localhost')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django for settings)
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+from apps.core.authentication import AuthToken  # noqa: E402
+from apps.core.realtime import get_broker, user_topic  # noqa: E402
+
+
+class Client:
+    """A fake ASGI HTTP client holding one event stream open"""
+
+    def __init__(self, token):
+        self.token = token
+        self.connected = asyncio.Event()
+        self.disconnect = asyncio.Event()
+        self.events = 0
+        self.got_event = asyncio.Event()
+        self.status = None
+        self._sent_request = False
+
+    async def receive(self):
+        if not self._sent_request:
+            self._sent_request = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            if body.startswith(b'retry:'):
+                self.connected.set()
+            elif body.startswith(b'event: bench'):
+                self.events += 1
+                self.got_event.set()
+
+    def scope(self):
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/api/events/',
+            'raw_path': b'/api/events/',
+            'root_path': '',
+            'query_string': f'token={self.token}'.encode(),
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+
+
+async def run(connections, events):
+    app = get_asgi_application()
+    broker = get_broker()
+    users = [f'sse-user-{i}' for i in range(connections)]
+    clients = [Client(AuthToken.create_token(uid)) for uid in users]
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(app(client.scope(), client.receive, client.send)) for client in clients]
+    await asyncio.gather(*(client.connected.wait() for client in clients))
+    opened = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   opened {connections:,} streams in {opened:.2f}s")
+    print(f"   memory per idle connection: {(current - baseline) / connections / 1024:.1f} KiB")
+    print(f"   broker: {broker.stats()}")
+
+    for n in range(events):
+        for client in clients:
+            client.got_event.clear()
+        start = time.perf_counter()
+        for uid in users:
+            broker.publish([user_topic(uid)], {'type': 'bench', 'n': n})
+        await asyncio.gather(*(client.got_event.wait() for client in clients))
+        print(f"   event {n}: delivered to {connections:,} clients in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    assert all(client.status == 200 for client in clients)
+    assert all(client.events == events for client in clients)
+
+    for client in clients:
+        client.disconnect.set()
+    await asyncio.wait(tasks, timeout=30)
+    stats = broker.stats()
+    print(f"   after disconnect: {stats}")
+    assert stats['subscriptions'] == 0, "Subscriptions leaked after disconnect"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"📡 Holding {args.connections:,} idle SSE connections")
+    print("=" * 60)
+    asyncio.run(run(args.connections, args.events))
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
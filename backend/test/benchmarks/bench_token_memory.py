@@ -0,0 +1,69 @@
+"""
+Benchmark: token store memory at 1M issued tokens
+
+Simulates login churn - clients that log in and abandon their token - and
+compares resident memory of:
+  * the old unbounded dict (tokens only removed when presented again),
+  * MemoryTokenStore with incremental expiry sweeping,
+  * MemoryTokenStore with a hard cap and oldest-first eviction.
+
+Pure Python, no Neo4j needed:
+    python test/benchmarks/bench_token_memory.py --tokens 1000000
+"""
+import argparse
+import secrets
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django for settings)
+
+from apps.core.token_store import MemoryTokenStore  # noqa: E402
+
+
+def issue_unbounded(count, lifetime):
+    tokens = {}
+    for i in range(count):
+        tokens[secrets.token_urlsafe(32)] = {'user_uid': f'user-{i % 10000}', 'expires': time.time() + lifetime}
+    return tokens, {'live': len(tokens)}
+
+
+def issue_into_store(store, count, lifetime):
+    for i in range(count):
+        store.save(secrets.token_urlsafe(32), f'user-{i % 10000}', time.time() + lifetime)
+    return store, store.stats()
+
+
+def measure(label, fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    keep_alive, stats = fn(*args)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} | {current / 2**20:>9.1f} | {peak / 2**20:>9.1f} | {elapsed:>7.1f} | {stats}")
+    del keep_alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--lifetime', type=float, default=1.0,
+                        help='Token lifetime in seconds for the churn simulation')
+    parser.add_argument('--cap', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"🔑 Issuing {args.tokens:,} tokens (lifetime {args.lifetime}s)")
+    print(f"{'store':<34} | {'MiB now':>9} | {'MiB peak':>9} | {'secs':>7} | counters")
+    measure('unbounded dict (previous)', issue_unbounded, args.tokens, args.lifetime)
+    measure('MemoryTokenStore (sweeping)', issue_into_store,
+            MemoryTokenStore(max_tokens=args.tokens * 2), args.tokens, args.lifetime)
+    measure(f'MemoryTokenStore (cap {args.cap:,})', issue_into_store,
+            MemoryTokenStore(max_tokens=args.cap), args.tokens, 24 * 3600)
+
+
+if __name__ == "__main__":
+    main()
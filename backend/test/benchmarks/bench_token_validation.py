@@ -0,0 +1,58 @@
+"""
+Benchmark: per-request token validation cost, opaque vs signed tokens
+
+Opaque tokens are looked up in the token store on every request (here the
+cached in-memory store, i.e. the best case of the default setup); signed
+access tokens are verified with an HMAC plus a deny-list lookup.
+
+A warm in-process cache hit beats HMAC verification; the point of signed
+tokens is that their cost stays flat on cache misses, in fresh workers and
+across instances, where an opaque token costs a Neo4j round-trip.
+
+Pure Python, no Neo4j needed:
+    python test/benchmarks/bench_token_validation.py --requests 200000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault('AUTH_TOKEN_STORE', 'apps.core.token_store.MemoryTokenStore')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query_counter  # noqa: E402,F401  (boots Django for settings)
+
+from django.test import override_settings  # noqa: E402
+
+from apps.core.authentication import AuthToken  # noqa: E402
+
+
+def run(label, tokens, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        assert AuthToken.validate_token(tokens[i % len(tokens)]) is not None
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} | {requests / elapsed:>12,.0f} | {elapsed / requests * 1e6:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"🔑 Validating {args.requests:,} requests over {args.users:,} users")
+    print(f"{'mode':<24} | {'req/s':>12} | {'µs/req':>8}")
+
+    opaque = [AuthToken.create_token(f'user-{i}') for i in range(args.users)]
+    run('opaque (cached store)', opaque, args.requests)
+
+    with override_settings(AUTH_TOKEN_MODE='signed'):
+        signed = [AuthToken.issue(f'user-{i}')['token'] for i in range(args.users)]
+        run('signed', signed, args.requests)
+
+
+if __name__ == '__main__':
+    main()
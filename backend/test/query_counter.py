@@ -0,0 +1,54 @@
+"""
+In-process test helpers
+Boots Django against the configured Neo4j instance, counts Cypher round-trips
+and creates throwaway accounts
+"""
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# Make the Django project importable from the test directory
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'feels_backend'
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'feels_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from neomodel import db  # noqa: E402
+
+from apps.core.authentication import hash_password  # noqa: E402
+from apps.core.models import Account  # noqa: E402
+
+
+@contextmanager
+def count_queries():
+    """Record every Cypher statement sent through neomodel while the block runs"""
+    statements = []
+    original = db.cypher_query
+
+    def counting_cypher_query(query, params=None, *args, **kwargs):
+        statements.append(query)
+        return original(query, params, *args, **kwargs)
+
+    db.cypher_query = counting_cypher_query
+    try:
+        yield statements
+    finally:
+        db.cypher_query = original
+
+
+def create_account(prefix):
+    """A new account with a unique ``<prefix>_<suffix>`` username"""
+    suffix = uuid.uuid4().hex[:8]
+    return Account(
+        username=f'{prefix}_{suffix}',
+        email=f'{prefix}_{suffix}@example.com',
+        display_name=prefix.title(),
+        password_hash=hash_password('testpass123')
+    ).save()
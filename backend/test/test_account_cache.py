@@ -0,0 +1,64 @@
+"""
+Authenticated account cache test
+Verifies that the cached projection (uid, username, display_name) is served
+without a query once cached, that other attributes load the full node once,
+and that updating the profile through ProfileView invalidates the entry.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory
+
+from apps.core.account_cache import get_authenticated_account, invalidate_account
+from apps.core.authentication import AuthToken, ProfileView
+
+
+def test_cached_projection_and_invalidation():
+    print("👤 Testing Authenticated Account Cache")
+    print("=" * 50)
+
+    account = create_account('cached')
+    token = AuthToken.create_token(account.uid)
+    invalidate_account(account.uid)
+
+    with count_queries() as statements:
+        get_authenticated_account(account.uid)
+    assert len(statements) == 1, f"Expected one projection query, got {len(statements)}"
+
+    with count_queries() as statements:
+        cached = get_authenticated_account(account.uid)
+        assert (cached.uid, cached.username, cached.display_name) == (
+            account.uid, account.username, account.display_name
+        )
+    print(f"   cached projection -> {len(statements)} Cypher queries")
+    assert not statements, "The cached projection should not query Neo4j"
+
+    with count_queries() as statements:
+        assert cached.email == account.email
+        assert cached.bio == account.bio
+    assert len(statements) == 1, f"The full node should be loaded once, got {len(statements)} queries"
+    assert cached == account and cached.node.uid == account.uid
+
+    # Updating the profile drops the cached entry
+    request = RequestFactory().put(
+        '/api/profile/',
+        data=json.dumps({'display_name': 'Renamed'}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = ProfileView.as_view()(request)
+    assert response.status_code == 200, response.content
+    assert get_authenticated_account(account.uid).display_name == 'Renamed', "Stale display_name after update"
+
+    print("✅ Projection cached, full node loaded on demand, invalidated on update")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_cached_projection_and_invalidation()
+        print("\n✅ TEST PASSED: the authenticated account is cached and invalidated!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
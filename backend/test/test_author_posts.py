@@ -0,0 +1,89 @@
+"""
+Author post listing test (GET /api/users/<id>/posts/ and /api/posts/?author_uid=)
+Pages through an author's posts with next_cursor as a friend and checks that
+every post is returned once, newest first (including posts sharing a
+timestamp), one Cypher round-trip per page, and that strangers get 403.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import time
+import uuid
+
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.views import PostView, UserPostsView
+
+CREATE_POSTS = """
+MATCH (a:Account {uid: $author_uid})
+UNWIND $rows AS row
+CREATE (p:Post {uid: row.uid, body: row.body, created_at: row.created_at})
+CREATE (p)-[:CREATED_BY]->(a)
+"""
+
+
+def user_posts(author, token, query=''):
+    request = RequestFactory().get(
+        f'/api/users/{author.uid}/posts/?{query}',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    return UserPostsView.as_view()(request, user_id=author.uid)
+
+
+def test_author_posts_are_paged():
+    print("📚 Testing Author Post Pages")
+    print("=" * 50)
+
+    author = create_account('author')
+    friend = create_account('author_friend')
+    stranger = create_account('author_stranger')
+    author.friends.connect(friend)
+    friend_token = AuthToken.create_token(friend.uid)
+    stranger_token = AuthToken.create_token(stranger.uid)
+
+    start = time.time() - 3600
+    times = [start + i for i in range(3)] + [start + 5] * 2 + [start + 10 + i for i in range(2)]
+    rows = [{'uid': uuid.uuid4().hex, 'body': f'Post {i}', 'created_at': at} for i, at in enumerate(times)]
+    db.cypher_query(CREATE_POSTS, {'author_uid': author.uid, 'rows': rows})
+    newest_first = [row['uid'] for row in sorted(rows, key=lambda row: (row['created_at'], row['uid']), reverse=True)]
+
+    user_posts(author, friend_token)  # Warm the token and account caches
+    pages, query = [], 'limit=3'
+    while True:
+        with count_queries() as statements:
+            response = user_posts(author, friend_token, query)
+        assert response.status_code == 200, response.data
+        assert len(statements) == 1, f"Expected one query per page, got {len(statements)}"
+        pages.append([post['uid'] for post in response.data['posts']])
+        if not response.data['has_more']:
+            break
+        query = f"limit=3&cursor={response.data['next_cursor']}"
+    walked = [uid for page in pages for uid in page]
+    print(f"   {len(pages)} pages -> {len(walked)} posts")
+    assert walked == newest_first, "Pages should return every post once, newest first"
+    assert response.data['author']['uid'] == author.uid
+
+    # The same listing through /api/posts/?author_uid=
+    request = RequestFactory().get(
+        f'/api/posts/?author_uid={author.uid}&limit=3',
+        HTTP_AUTHORIZATION=f'Bearer {friend_token}'
+    )
+    response = PostView.as_view()(request)
+    assert response.status_code == 200, response.data
+    assert [post['uid'] for post in response.data['posts']] == newest_first[:3]
+
+    response = user_posts(author, stranger_token)
+    assert response.status_code == 403, response.status_code
+
+    print("✅ Author posts paged by cursor, one query per page")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_author_posts_are_paged()
+        print("\n✅ TEST PASSED: author posts are paged by cursor!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
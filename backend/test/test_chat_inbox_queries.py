@@ -0,0 +1,67 @@
+"""
+Query-count test for the chat inbox (GET /api/chats/)
+Verifies that listing chats costs a constant number of Cypher round-trips,
+no matter how many chats or messages the user has.
+Runs in-process against the Neo4j instance configured in .env
+"""
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat, Message
+from apps.core.views import ChatView
+
+
+def create_chat_with_messages(owner, other, message_count):
+    chat = Chat(name=f'Inbox test with {other.username}').save()
+    chat.participants.connect(owner)
+    chat.participants.connect(other)
+
+    message = None
+    for i in range(message_count):
+        message = Message(text=f'Message {i}').save()
+        message.sender.connect(other if i % 2 else owner)
+        message.chat.connect(chat)
+
+    if message:
+        chat.last_message.connect(message)
+    return chat
+
+
+def count_inbox_queries(user, token):
+    request = RequestFactory().get('/api/chats/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    with count_queries() as statements:
+        response = ChatView.as_view()(request)
+    return response, len(statements)
+
+
+def test_inbox_query_count_is_constant():
+    print("📥 Testing Chat Inbox Query Count")
+    print("=" * 50)
+
+    user = create_account('inbox_owner')
+    token = AuthToken.create_token(user.uid)
+
+    query_counts = []
+    for round_number in range(3):
+        # Each round adds more chats (with messages) to the inbox
+        for _ in range(5):
+            create_chat_with_messages(user, create_account('inbox_friend'), message_count=4)
+
+        response, queries = count_inbox_queries(user, token)
+        assert response.status_code == 200, response.data
+        print(f"   {response.data['count']} chats -> {queries} Cypher queries")
+        query_counts.append(queries)
+
+    assert len(set(query_counts)) == 1, f"Query count grows with chat count: {query_counts}"
+    print("✅ Inbox query count is independent of the number of chats")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_inbox_query_count_is_constant()
+        print("\n✅ TEST PASSED: Inbox is served in O(1) round-trips!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,56 @@
+"""
+Membership check test for chat endpoints
+Verifies that authorizing a request against a large group chat is a single
+EXISTS query that does not load the participants, that confirmed memberships
+are memoized, and that non-participants and unknown chats get 403/404.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import uuid
+
+from query_counter import count_queries, create_account
+
+from apps.core.chat_membership import (
+    CHAT_NOT_FOUND, MEMBER, NOT_PARTICIPANT, chat_membership, invalidate_chat_membership
+)
+from apps.core.models import Chat
+
+
+def test_membership_is_one_exists_query():
+    print("🔐 Testing Chat Membership Check")
+    print("=" * 50)
+
+    member = create_account('member')
+    outsider = create_account('outsider')
+    chat = Chat(name='Big group', is_group_chat=True).save()
+    chat.participants.connect(member)
+    for _ in range(100):
+        chat.participants.connect(create_account('crowd'))
+
+    invalidate_chat_membership(chat.uid)
+    with count_queries() as statements:
+        assert chat_membership(chat.uid, member.uid) == MEMBER
+    print(f"   member of a 101-person chat -> {len(statements)} Cypher queries")
+    assert len(statements) == 1, f"Expected one query, got {len(statements)}"
+    assert 'EXISTS' in statements[0], "Membership should be checked with EXISTS"
+
+    with count_queries() as statements:
+        assert chat_membership(chat.uid, member.uid) == MEMBER
+    assert not statements, "Confirmed membership should be served from the memo"
+
+    assert chat_membership(chat.uid, outsider.uid) == NOT_PARTICIPANT
+    assert chat_membership(uuid.uuid4().hex, member.uid) == CHAT_NOT_FOUND
+
+    # Negative answers are not cached: joining takes effect immediately
+    chat.participants.connect(outsider)
+    assert chat_membership(chat.uid, outsider.uid) == MEMBER
+
+    print("✅ Membership is one indexed EXISTS, memoized once confirmed")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_membership_is_one_exists_query()
+        print("\n✅ TEST PASSED: chat membership check is O(1)!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,99 @@
+"""
+Denormalized chat summary test
+Verifies that sending messages keeps the chat's message_count and last-message
+summary (served by the chat detail and the inbox without reading messages) up
+to date, with the preview truncated, and that repair_chat_summaries restores a
+damaged summary.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+
+from query_counter import create_account
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.views import ChatView, MessageView
+
+
+def chat_detail(chat, token):
+    request = RequestFactory().get(f'/api/chats/{chat.uid}/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    response = ChatView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0)
+def test_summary_follows_sends():
+    print("🧾 Testing Denormalized Chat Summary")
+    print("=" * 50)
+
+    sender = create_account('summary_sender')
+    token = AuthToken.create_token(sender.uid)
+    chat = Chat(name='Summary test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+
+    texts = ['First message', 'Second ' + 'y' * (settings.CHAT_PREVIEW_LENGTH * 2)]
+    sent = []
+    for text in texts:
+        request = RequestFactory().post(
+            f'/api/chats/{chat.uid}/messages/',
+            data=json.dumps({'text': text}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 201, response.data
+        sent.append(response.data['uid'])
+
+    expected = {
+        'uid': sent[-1],
+        'text': texts[-1][:settings.CHAT_PREVIEW_LENGTH],
+        'sender_uid': sender.uid
+    }
+
+    def summary(data):
+        last = data['last_message'] or {}
+        return {'uid': last.get('uid'), 'text': last.get('text'), 'sender_uid': (last.get('sender') or {}).get('uid')}
+
+    detail = chat_detail(chat, token)
+    print(f"   after 2 sends -> message_count {detail['message_count']}")
+    assert detail['message_count'] == 2, detail['message_count']
+    assert summary(detail) == expected, summary(detail)
+
+    request = RequestFactory().get('/api/chats/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    inbox = ChatView.as_view()(request).data['chats']
+    row = next(item for item in inbox if item['uid'] == chat.uid)
+    assert row['message_count'] == 2 and summary(row) == expected, row
+
+    # Damage the summary, then repair it from the messages
+    db.cypher_query(
+        """
+        MATCH (c:Chat {uid: $uid})
+        OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+        DELETE old
+        SET c.message_count = 0
+        REMOVE c.last_message_uid, c.last_message_preview, c.last_message_sender_uid
+        """,
+        {'uid': chat.uid}
+    )
+    assert chat_detail(chat, token)['last_message'] is None
+    call_command('repair_chat_summaries')
+    detail = chat_detail(chat, token)
+    assert detail['message_count'] == 2 and summary(detail) == expected, detail
+    assert chat.last_message.single().uid == sent[-1], "LAST_MESSAGE not restored"
+
+    print("✅ Summary kept up to date by sends and restored by the repair command")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_summary_follows_sends()
+        print("\n✅ TEST PASSED: chat summaries are denormalized correctly!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,111 @@
+"""
+Coalesced chat summary test (CHAT_SUMMARY_FLUSH_INTERVAL > 0)
+Verifies that ChatSummaryWriter folds the messages recorded for a chat (counts
+add up, the latest message wins), and that with coalescing on, sends leave the
+chat summary untouched and their messages Unsequenced until a flush writes the
+summary and numbers the messages in send order.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import types
+
+from query_counter import create_account
+
+from django.test import RequestFactory, override_settings
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.chat_summary import ChatSummaryWriter, get_summary_writer
+from apps.core.models import Chat
+from apps.core.views import ChatView, MessageView
+
+
+def test_record_folds_updates():
+    print("🧮 Testing Summary Folding")
+    print("=" * 50)
+
+    writer = ChatSummaryWriter(interval=3600)
+    alice = types.SimpleNamespace(uid='alice', username='alice', display_name='Alice')
+    bob = types.SimpleNamespace(uid='bob', username='bob', display_name='Bob')
+    writer.record('chat-a', 'm1', 100.0, 'First', 'text', alice, 'chat-a:0')
+    writer.record('chat-a', 'm3', 300.0, 'Third', 'text', bob, 'chat-a:0')
+    writer.record('chat-a', 'm2', 200.0, 'Second', 'text', alice, 'chat-a:0')  # Arrives late
+    writer.record('chat-b', 'm4', 150.0, 'Other chat', 'text', alice)
+
+    row = writer.pending['chat-a']
+    assert row['count'] == 3, row['count']
+    assert (row['last_message_uid'], row['last_message_preview'], row['last_message_sender_uid']) == \
+        ('m3', 'Third', 'bob'), "The latest message should win, whatever the order it was recorded in"
+    assert row['buckets'] == {'chat-a:0': {'key': 'chat-a:0', 'count': 3, 'last_at': 300.0}}, row['buckets']
+    assert writer.pending['chat-b']['count'] == 1 and not writer.pending['chat-b']['buckets']
+    assert writer.stats()['pending_chats'] == 2 and writer.stats()['recorded'] == 4, writer.stats()
+
+    writer.pending.clear()
+    writer.close()
+    print("✅ Recorded messages fold into one pending summary per chat")
+    return True
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=600000)
+def test_flush_applies_coalesced_sends():
+    print("\n🚰 Testing Coalesced Summary Flush")
+    print("=" * 50)
+
+    sender = create_account('flush_sender')
+    other = create_account('flush_other')
+    tokens = {sender.uid: AuthToken.create_token(sender.uid), other.uid: AuthToken.create_token(other.uid)}
+    chat = Chat(name='Flush test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(other)
+
+    writer = get_summary_writer()
+    assert writer is not None, "Coalescing should be on"
+    sent = []
+    for author, text in [(sender, 'One'), (other, 'Two'), (sender, 'Three')]:
+        request = RequestFactory().post(
+            f'/api/chats/{chat.uid}/messages/',
+            data=json.dumps({'text': text}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {tokens[author.uid]}'
+        )
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 201, response.data
+        assert response.data['seq'] is None, "Coalesced sends are numbered by the flush"
+        sent.append(response.data['uid'])
+
+    def detail():
+        request = RequestFactory().get(f'/api/chats/{chat.uid}/', HTTP_AUTHORIZATION=f'Bearer {tokens[sender.uid]}')
+        return ChatView.as_view()(request, chat_id=chat.uid).data
+
+    def sequenced():
+        results, _ = db.cypher_query(
+            "MATCH (m:Message {chat_uid: $uid}) RETURN m.uid, m.seq, m:Unsequenced ORDER BY m.created_at",
+            {'uid': chat.uid}
+        )
+        return results
+
+    before = detail()
+    assert before['message_count'] == 0 and before['last_message'] is None, "The summary was written by a send"
+    assert all(unsequenced for _, _, unsequenced in sequenced()), "Messages should wait Unsequenced for the flush"
+
+    assert writer.flush() >= 1
+    assert writer.stats()['pending_chats'] == 0, writer.stats()
+
+    after = detail()
+    print(f"   flushed -> message_count {after['message_count']}, last {after['last_message']['text']!r}")
+    assert after['message_count'] == 3, after['message_count']
+    assert after['last_message']['uid'] == sent[-1] and after['last_message']['sender']['uid'] == sender.uid
+    assert sequenced() == [[uid, seq, False] for seq, uid in enumerate(sent, start=1)], sequenced()
+    assert [m.uid for m in chat.last_message.all()] == [sent[-1]], "LAST_MESSAGE should point at the newest message"
+
+    print("✅ One flush writes the folded summary and numbers the messages")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_record_folds_updates()
+        test_flush_applies_coalesced_sends()
+        print("\n✅ TEST PASSED: chat summaries are coalesced and flushed!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,93 @@
+"""
+Chat creation test (POST /api/chats/)
+Verifies that creating a chat is one Cypher statement (participant lookup,
+creation and connections), that creating the same 1:1 chat twice returns the
+existing chat, that group chats are never deduplicated, and that unknown
+usernames create nothing.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import uuid
+
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.views import ChatView
+
+
+def create_chat(token, data):
+    request = RequestFactory().post(
+        '/api/chats/',
+        data=json.dumps(data),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    with count_queries() as statements:
+        response = ChatView.as_view()(request)
+    return response, [statement for statement in statements if 'Chat' in statement]
+
+
+def chat_count(user):
+    results, _ = db.cypher_query(
+        "MATCH (:Account {uid: $uid})-[:PARTICIPATES_IN]->(c:Chat) RETURN count(c)",
+        {'uid': user.uid}
+    )
+    return results[0][0]
+
+
+def test_create_chat():
+    print("💬 Testing Chat Creation")
+    print("=" * 50)
+
+    user = create_account('chat_creator')
+    friend = create_account('chat_friend')
+    other = create_account('chat_other')
+    token = AuthToken.create_token(user.uid)
+
+    # 1:1 chat: created once, then returned
+    response, statements = create_chat(token, {'participant_usernames': [friend.username]})
+    assert response.status_code == 201, response.data
+    print(f"   create 1:1 chat -> {len(statements)} chat statements")
+    assert len(statements) == 1, f"Expected one statement, got {len(statements)}"
+    assert response.data['name'] == f'Chat with {friend.display_name}', response.data['name']
+    assert not response.data['is_group_chat']
+    direct_uid = response.data['uid']
+
+    response, _ = create_chat(token, {'participant_usernames': [friend.username, user.username]})
+    assert response.status_code == 200, response.data
+    assert response.data['uid'] == direct_uid, "Creating the same 1:1 chat twice should return the existing chat"
+    assert sorted(p['uid'] for p in response.data['participants']) == sorted([user.uid, friend.uid])
+
+    friend_token = AuthToken.create_token(friend.uid)
+    response, _ = create_chat(friend_token, {'participant_usernames': [user.username]})
+    assert response.status_code == 200 and response.data['uid'] == direct_uid, "Direct chat depends on who asks"
+    assert chat_count(user) == 1, f"Expected one chat, got {chat_count(user)}"
+
+    # Group chats with the same members are separate chats
+    group = {'participant_usernames': [friend.username, other.username]}
+    first, _ = create_chat(token, group)
+    second, _ = create_chat(token, group)
+    assert first.status_code == second.status_code == 201, (first.data, second.data)
+    assert first.data['uid'] != second.data['uid'], "Group chats should not be deduplicated"
+    assert first.data['is_group_chat'] and first.data['name'].startswith('Group with '), first.data
+    assert len(first.data['participants']) == 3, first.data['participants']
+
+    # Unknown usernames: 404 and no chat
+    missing = f'missing_{uuid.uuid4().hex[:8]}'
+    response, _ = create_chat(token, {'participant_usernames': [friend.username, missing]})
+    assert response.status_code == 404 and missing in response.data['error'], response.data
+    assert chat_count(user) == 3, f"Expected three chats, got {chat_count(user)}"
+
+    print("✅ One statement per chat, 1:1 chats deduplicated")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_create_chat()
+        print("\n✅ TEST PASSED: chats are created in one statement and 1:1 chats are reused!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
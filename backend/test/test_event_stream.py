@@ -0,0 +1,99 @@
+"""
+Server-Sent Events test (GET /api/events/)
+Opens the event stream for a chat participant and an outsider, sends a message
+through MessageView and checks that the participant receives it as a
+message.created frame while the outsider only gets keep-alives, and that
+streams without a valid token are refused.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import asyncio
+import json
+
+from query_counter import create_account
+
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory, override_settings
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.realtime import get_broker
+from apps.core.views import EventStreamView, MessageView
+
+
+def send(chat_uid, token, text):
+    request = RequestFactory().post(
+        f'/api/chats/{chat_uid}/messages/',
+        data=json.dumps({'text': text}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = MessageView.as_view()(request, chat_id=chat_uid)
+    assert response.status_code == 201, response.data
+    return response.data
+
+
+async def open_stream(query):
+    return await EventStreamView.as_view()(RequestFactory().get(f'/api/events/?{query}'))
+
+
+async def next_frame(stream):
+    frame = await asyncio.wait_for(anext(stream), timeout=5)
+    return frame.decode() if isinstance(frame, bytes) else frame
+
+
+@override_settings(REALTIME_HEARTBEAT_INTERVAL=1)
+def test_messages_are_pushed():
+    print("📡 Testing Server-Sent Events")
+    print("=" * 50)
+
+    sender = create_account('stream_sender')
+    recipient = create_account('stream_recipient')
+    outsider = create_account('stream_outsider')
+    sender_token = AuthToken.create_token(sender.uid)
+    recipient_token = AuthToken.create_token(recipient.uid)
+    outsider_token = AuthToken.create_token(outsider.uid)
+    chat = Chat(name='Stream test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(recipient)
+
+    async def scenario():
+        for query in ('', 'token=not-a-token'):
+            response = await open_stream(query)
+            assert response.status_code == 401, response.status_code
+
+        response = await open_stream(f'token={recipient_token}')
+        assert response.status_code == 200, response.status_code
+        assert response['Content-Type'] == 'text/event-stream'
+        stream = aiter(response.streaming_content)
+        outsider_stream = aiter((await open_stream(f'token={outsider_token}')).streaming_content)
+
+        # The first frame subscribes the stream
+        assert (await next_frame(stream)).startswith('retry: ')
+        assert (await next_frame(outsider_stream)).startswith('retry: ')
+        assert get_broker().stats()['subscriptions'] >= 2
+
+        message = await sync_to_async(send)(chat.uid, sender_token, 'Pushed, not polled')
+        frame = await next_frame(stream)
+        print(f"   recipient received: {frame.splitlines()[0]}")
+        event_line, data_line = frame.strip().split('\n')
+        assert event_line == 'event: message.created', frame
+        event = json.loads(data_line[len('data: '):])
+        assert event['chat_uid'] == chat.uid, event
+        assert event['message']['uid'] == message['uid'], event
+        assert event['message']['sender']['uid'] == sender.uid, event
+
+        # Nothing addressed to the outsider: the next frame is a heartbeat
+        assert await next_frame(outsider_stream) == ': keep-alive\n\n', "The outsider received the message"
+
+    asyncio.run(scenario())
+
+    print("✅ New messages are pushed to participants only")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_messages_are_pushed()
+        print("\n✅ TEST PASSED: events are pushed over SSE!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,124 @@
+"""
+Feeling catalog test
+Verifies that listing feelings and creating a post with a feeling are served
+from the in-process catalog without querying Feeling nodes, that a feeling
+created through the API is published to the catalog (version bump), and that
+the listing is revalidated by ETag and served from an immutable snapshot URL.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import uuid
+
+from query_counter import count_queries, create_account
+
+from django.conf import settings
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.feeling_catalog import feeling_catalog, feeling_catalog_changed, get_feeling
+from apps.core.views import FeelingSnapshotView, FeelingView, PostView
+
+
+def test_feelings_come_from_the_catalog():
+    print("🎨 Testing Feeling Catalog")
+    print("=" * 50)
+
+    factory = RequestFactory()
+    suffix = uuid.uuid4().hex[:8]
+    author = create_account('catalog')
+    token = AuthToken.create_token(author.uid)
+
+    # Create a feeling through the API: the version moves and it is served at once
+    name = f'Curious_{suffix}'
+    version = feeling_catalog.snapshot().version
+    request = factory.post(
+        '/api/feelings/',
+        data=json.dumps({'name': name, 'color': '#123456'}),
+        content_type='application/json'
+    )
+    response = FeelingView.as_view()(request)
+    assert response.status_code == 201, response.data
+    assert feeling_catalog.snapshot().version > version, "Creating a feeling should bump the catalog version"
+    assert get_feeling(name) == {'name': name, 'color': '#123456'}
+
+    feeling_catalog.check_interval = 3600  # No version check inside the measured requests
+    try:
+        with count_queries() as statements:
+            response = FeelingView.as_view()(factory.get('/api/feelings/'))
+        assert response.status_code == 200, response.data
+        assert any(feeling['name'] == name for feeling in response.data['feelings'])
+        print(f"   GET /api/feelings/ -> {len(statements)} Cypher queries")
+        assert not statements, f"Listing feelings should not query Neo4j, got {len(statements)}"
+
+        request = factory.post(
+            '/api/posts/',
+            data=json.dumps({'body': 'Catalog test', 'feeling_name': name}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        with count_queries() as statements:
+            response = PostView.as_view()(request)
+        assert response.status_code == 201, response.data
+        assert response.data['feeling_connected'], response.data
+        lookups = [statement for statement in statements if ':Feeling' in statement]
+        assert not lookups, f"Creating a post should not look the feeling up: {lookups}"
+    finally:
+        feeling_catalog.check_interval = settings.FEELING_CATALOG_CHECK_INTERVAL
+        db.cypher_query(
+            """
+            MATCH (f:Feeling {name: $name})
+            OPTIONAL MATCH (p:Post)-[:EXPRESSES_FEELING]->(f)
+            DETACH DELETE f, p
+            """,
+            {'name': name}
+        )
+        db.cypher_query("MATCH (p:Post {feeling_name: $name}) DETACH DELETE p", {'name': name})
+        feeling_catalog_changed()
+
+    print("✅ Feelings resolved and listed from the catalog")
+    return True
+
+
+def test_feelings_are_cached_over_http():
+    print("\n🏷️ Testing Feeling Catalog HTTP Caching")
+    print("=" * 50)
+
+    factory = RequestFactory()
+    response = FeelingView.as_view()(factory.get('/api/feelings/'))
+    assert response.status_code == 200, response.data
+    etag = response['ETag']
+    content_hash = etag.strip('"')
+    assert response['Cache-Control'].startswith('public, max-age='), response['Cache-Control']
+    assert content_hash in response.data['snapshot_url']
+
+    feeling_catalog.check_interval = 3600  # No version check inside the measured requests
+    try:
+        with count_queries() as statements:
+            response = FeelingView.as_view()(factory.get('/api/feelings/', HTTP_IF_NONE_MATCH=etag))
+        assert response.status_code == 304, response.status_code
+        print(f"   If-None-Match -> 304 with {len(statements)} Cypher queries")
+        assert not statements, f"Revalidating the listing should not query Neo4j, got {len(statements)}"
+
+        response = FeelingSnapshotView.as_view()(factory.get('/'), content_hash=content_hash)
+        assert response.status_code == 200, response.data
+        assert 'immutable' in response['Cache-Control'], response['Cache-Control']
+        assert response['ETag'] == etag
+
+        response = FeelingSnapshotView.as_view()(factory.get('/'), content_hash='outdated')
+        assert response.status_code == 302, response.status_code
+        assert content_hash in response['Location']
+    finally:
+        feeling_catalog.check_interval = settings.FEELING_CATALOG_CHECK_INTERVAL
+
+    print("✅ Listing revalidated by ETag and served from its snapshot URL")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_feelings_come_from_the_catalog()
+        test_feelings_are_cached_over_http()
+        print("\n✅ TEST PASSED: feelings are served from the in-process catalog and cached over HTTP!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
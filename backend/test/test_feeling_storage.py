@@ -0,0 +1,102 @@
+"""
+Feeling storage test (FEELING_STORAGE and migrate_feeling_storage)
+Sends messages with a feeling in both layouts - an EXPRESSES_FEELING
+relationship or the feeling_name property - converts them back and forth with
+migrate_feeling_storage, and checks that each layout is stored as expected and
+that the messages read back with the same feeling throughout.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import uuid
+
+from query_counter import create_account
+
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.feeling_catalog import feeling_catalog_changed
+from apps.core.models import Chat, Feeling
+from apps.core.views import MessageView
+
+
+def send(chat, token, text, feeling_name):
+    request = RequestFactory().post(
+        f'/api/chats/{chat.uid}/messages/',
+        data=json.dumps({'text': text, 'feeling_name': feeling_name}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = MessageView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 201, response.data
+    return response.data
+
+
+def read_feelings(chat, token):
+    request = RequestFactory().get(f'/api/chats/{chat.uid}/messages/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    response = MessageView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 200, response.data
+    return {message['uid']: message['feeling'] for message in response.data['messages']}
+
+
+def stored(chat):
+    """How each message of the chat stores its feeling: {uid: (feeling_name, linked feeling)}"""
+    results, _ = db.cypher_query(
+        """
+        MATCH (m:Message {chat_uid: $uid})
+        OPTIONAL MATCH (m)-[:EXPRESSES_FEELING]->(f:Feeling)
+        RETURN m.uid, m.feeling_name, f.name
+        """,
+        {'uid': chat.uid}
+    )
+    return {uid: (name, linked) for uid, name, linked in results}
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0)
+def test_both_layouts_read_the_same():
+    print("💞 Testing Feeling Storage Layouts")
+    print("=" * 50)
+
+    sender = create_account('storage_sender')
+    token = AuthToken.create_token(sender.uid)
+    chat = Chat(name='Feeling storage test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    name = f'Stored_{uuid.uuid4().hex[:8]}'
+    Feeling(name=name, color='#abcdef').save()
+    feeling_catalog_changed()
+    expected = {'name': name, 'color': '#abcdef'}
+
+    try:
+        with override_settings(FEELING_STORAGE='relationship'):
+            linked = send(chat, token, 'Linked', name)
+        with override_settings(FEELING_STORAGE='property'):
+            inline = send(chat, token, 'Inline', name)
+        assert linked['feeling'] == inline['feeling'] == expected, (linked['feeling'], inline['feeling'])
+        assert stored(chat) == {linked['uid']: (None, name), inline['uid']: (name, None)}, stored(chat)
+        assert read_feelings(chat, token) == {linked['uid']: expected, inline['uid']: expected}
+
+        with override_settings(FEELING_STORAGE='property'):
+            call_command('migrate_feeling_storage', to='property')
+        print(f"   to property -> {set(stored(chat).values())}")
+        assert set(stored(chat).values()) == {(name, None)}, stored(chat)
+        assert read_feelings(chat, token) == {linked['uid']: expected, inline['uid']: expected}
+
+        call_command('migrate_feeling_storage', to='relationship')
+        print(f"   to relationship -> {set(stored(chat).values())}")
+        assert set(stored(chat).values()) == {(None, name)}, stored(chat)
+        assert read_feelings(chat, token) == {linked['uid']: expected, inline['uid']: expected}
+    finally:
+        db.cypher_query("MATCH (f:Feeling {name: $name}) DETACH DELETE f", {'name': name})
+        feeling_catalog_changed()
+
+    print("✅ Feelings read the same in either layout and survive conversion")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_both_layouts_read_the_same()
+        print("\n✅ TEST PASSED: feeling storage layouts are interchangeable!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,97 @@
+"""
+Message long-poll test (GET /api/chats/<id>/messages/?after_seq=<n>&wait=<s>)
+Verifies that a long-poll with nothing newer parks until the wait expires and
+returns an empty page, that a message sent while it is parked wakes it early
+with that message, that pending messages are returned without waiting, and
+that an invalid wait is refused.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import asyncio
+import json
+import time
+
+from query_counter import create_account
+
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory, override_settings
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.views import LongPollMessageView, MessageView
+
+
+def send(chat_uid, token, text):
+    request = RequestFactory().post(
+        f'/api/chats/{chat_uid}/messages/',
+        data=json.dumps({'text': text}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = MessageView.as_view()(request, chat_id=chat_uid)
+    assert response.status_code == 201, response.data
+    return response.data
+
+
+async def poll(chat_uid, token, query):
+    request = RequestFactory().get(
+        f'/api/chats/{chat_uid}/messages/?{query}',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    started = time.monotonic()
+    response = await LongPollMessageView.as_view()(request, chat_id=chat_uid)
+    return response, time.monotonic() - started
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0)
+def test_long_poll_waits_and_wakes():
+    print("⏳ Testing Message Long-Polling")
+    print("=" * 50)
+
+    sender = create_account('poll_sender')
+    reader = create_account('poll_reader')
+    sender_token = AuthToken.create_token(sender.uid)
+    reader_token = AuthToken.create_token(reader.uid)
+    chat = Chat(name='Long-poll test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(reader)
+    first = send(chat.uid, sender_token, 'Before polling')
+
+    async def scenario():
+        # Pending messages come back at once
+        response, elapsed = await poll(chat.uid, reader_token, 'after_seq=0&wait=10')
+        assert response.status_code == 200, response.data
+        assert [m['uid'] for m in response.data['messages']] == [first['uid']], response.data
+        assert elapsed < 5, f"A poll with pending messages waited {elapsed:.1f}s"
+        last_seq = response.data['last_seq']
+
+        # Nothing newer: parks until the wait expires
+        response, elapsed = await poll(chat.uid, reader_token, f'after_seq={last_seq}&wait=0.5')
+        print(f"   idle poll -> {response.data['count']} messages after {elapsed:.2f}s")
+        assert response.status_code == 200 and response.data['count'] == 0, response.data
+        assert elapsed >= 0.5, f"The idle poll returned after {elapsed:.2f}s"
+
+        # A message sent while parked wakes the poll
+        parked = asyncio.ensure_future(poll(chat.uid, reader_token, f'after_seq={last_seq}&wait=10'))
+        await asyncio.sleep(0.3)
+        assert not parked.done(), "The poll returned before anything was sent"
+        message = await sync_to_async(send)(chat.uid, sender_token, 'Wake up')
+        response, elapsed = await asyncio.wait_for(parked, timeout=10)
+        print(f"   parked poll woken after {elapsed:.2f}s")
+        assert [m['uid'] for m in response.data['messages']] == [message['uid']], response.data
+        assert elapsed < 5, f"The poll was not woken by the new message ({elapsed:.1f}s)"
+
+        response, _ = await poll(chat.uid, reader_token, f'after_seq={last_seq}&wait=soon')
+        assert response.status_code == 400, response.status_code
+
+    asyncio.run(scenario())
+
+    print("✅ Long-polls time out when idle and wake on new messages")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_long_poll_waits_and_wakes()
+        print("\n✅ TEST PASSED: long-polling waits and wakes correctly!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
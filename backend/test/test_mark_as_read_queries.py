@@ -0,0 +1,71 @@
+"""
+Query-count test for mark-as-read (GET /api/chats/<id>/messages/?mark_as_read=true)
+Verifies that marking a page of messages as read costs at most one write,
+whatever the page size, and that a second fetch of the same page writes nothing.
+Runs in-process against the Neo4j instance configured in .env
+"""
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat, Message
+from apps.core.views import MessageView
+
+
+def create_chat_with_messages(reader, sender, message_count):
+    chat = Chat(name=f'Read test with {sender.username}').save()
+    chat.participants.connect(reader)
+    chat.participants.connect(sender)
+    for i in range(message_count):
+        message = Message(text=f'Unread {i}').save()
+        message.sender.connect(sender)
+        message.chat.connect(chat)
+    return chat
+
+
+def fetch_and_mark(chat, token, limit):
+    request = RequestFactory().get(
+        f'/api/chats/{chat.uid}/messages/?limit={limit}&mark_as_read=true',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    with count_queries() as statements:
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 200, response.data
+    writes = [s for s in statements if 'SET' in s.upper() or 'CREATE' in s.upper()]
+    return response, len(statements), len(writes)
+
+
+def test_mark_as_read_is_one_write():
+    print("📖 Testing Mark-as-Read Query Count")
+    print("=" * 50)
+
+    reader = create_account('read_reader')
+    token = AuthToken.create_token(reader.uid)
+
+    query_counts = []
+    for page_size in (5, 25, 50):
+        chat = create_chat_with_messages(reader, create_account('read_sender'), message_count=page_size)
+
+        response, queries, writes = fetch_and_mark(chat, token, page_size)
+        unread = [m for m in response.data['messages'] if not m['is_read']]
+        print(f"   page of {page_size} ({len(unread)} unread) -> {queries} Cypher queries, {writes} writes")
+        assert len(unread) == page_size, "Messages should be unread before the first fetch"
+        assert writes == 1, f"Expected one write for a page of {page_size}, got {writes}"
+        query_counts.append(queries)
+
+        response, queries, writes = fetch_and_mark(chat, token, page_size)
+        assert all(m['is_read'] for m in response.data['messages']), "Page should be read after marking"
+        assert writes == 0, f"Re-reading a read page should not write, got {writes}"
+
+    assert len(set(query_counts)) == 1, f"Query count grows with page size: {query_counts}"
+    print("✅ Marking a page as read costs one write regardless of page size")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_mark_as_read_is_one_write()
+        print("\n✅ TEST PASSED: mark_as_read is batched!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,96 @@
+"""
+Batch send test (offline backlog upload)
+Verifies that POST /api/messages/batch/ writes messages to several chats in a
+single Cypher statement, keeps queue order in each chat's sequence numbers and
+summary, rejects messages to chats the user is not in without affecting the
+others, and that retrying the batch sends nothing twice.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import uuid
+
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory, override_settings
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.views import MessageBatchView
+
+
+def send_batch(token, messages):
+    request = RequestFactory().post(
+        '/api/messages/batch/',
+        data=json.dumps({'messages': messages}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    return MessageBatchView.as_view()(request)
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0)
+def test_batch_send_is_one_statement_and_idempotent():
+    print("📦 Testing Batch Message Send")
+    print("=" * 50)
+
+    sender = create_account('batch')
+    friend = create_account('friend')
+    stranger = create_account('stranger')
+    direct = Chat(name='Direct', is_group_chat=False).save()
+    group = Chat(name='Group', is_group_chat=True).save()
+    private = Chat(name='Private', is_group_chat=False).save()
+    for chat in (direct, group):
+        chat.participants.connect(sender)
+        chat.participants.connect(friend)
+    private.participants.connect(stranger)
+    token = AuthToken.create_token(sender.uid)
+    send_batch(token, [{'client_id': 'warm-up', 'chat_uid': group.uid, 'text': 'Warm-up'}])
+
+    queue = uuid.uuid4().hex
+    messages = [
+        {'client_id': f'{queue}-{i}', 'chat_uid': chat.uid, 'text': f'Queued {i}'}
+        for i, chat in enumerate([direct, group, direct, group, direct])
+    ] + [
+        {'client_id': f'{queue}-private', 'chat_uid': private.uid, 'text': 'Not mine'},
+        {'client_id': f'{queue}-empty', 'chat_uid': direct.uid, 'text': ' '},
+        {'client_id': f'{queue}-feeling', 'chat_uid': direct.uid, 'text': 'Odd feeling', 'feeling_name': ['Happy']}
+    ]
+
+    with count_queries() as statements:
+        response = send_batch(token, messages)
+    assert response.status_code == 200, response.data
+    writes = [statement for statement in statements if 'UNWIND $chats' in statement]
+    print(f"   8 queued messages, 3 chats -> {len(statements)} Cypher queries")
+    assert len(writes) == 1, f"Expected the batch in one statement, got {len(writes)}"
+    assert (response.data['sent'], response.data['duplicates'], response.data['rejected']) == (5, 0, 3), response.data
+
+    results = response.data['results']
+    assert [result['client_id'] for result in results] == [message['client_id'] for message in messages]
+    direct_seqs = [results[i]['message']['seq'] for i in (0, 2, 4)]
+    assert direct_seqs == sorted(direct_seqs), f"Sequence numbers should follow queue order: {direct_seqs}"
+    assert 'not a participant' in results[5]['error'], results[5]
+    assert results[6]['status'] == 'rejected', results[6]
+    assert results[7]['error'] == 'feeling_name must be a string', results[7]
+
+    direct.refresh()
+    assert direct.message_count == 3, f"Expected 3 messages in the direct chat, got {direct.message_count}"
+    assert direct.last_message_uid == results[4]['message']['uid'], "Last queued message should be the last message"
+
+    # Retrying the whole batch (e.g. after a lost response) sends nothing again
+    response = send_batch(token, messages)
+    assert (response.data['sent'], response.data['duplicates'], response.data['rejected']) == (0, 5, 3), response.data
+    assert [result['message']['uid'] for result in response.data['results'][:5]] == \
+        [result['message']['uid'] for result in results[:5]]
+    direct.refresh()
+    assert direct.message_count == 3, "A retried batch must not send messages twice"
+
+    print("✅ Batch written in one statement, per-message results, retries are idempotent")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_batch_send_is_one_statement_and_idempotent()
+        print("\n✅ TEST PASSED: batch send is one transaction and idempotent!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,116 @@
+"""
+Bucketed pagination test
+Fills a chat with messages spread over several days (including messages
+either side of midnight and two with the same timestamp), pages through it in
+the flat layout, converts it with ``bucket_chat_messages`` and checks that
+every page - before/after a cursor at each message, and offset pages - is
+identical in the bucketed layout.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import time
+import uuid
+
+from query_counter import create_account
+
+from django.core.management import call_command
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.pagination import encode_cursor
+from apps.core.views import MessageView
+
+DAY = 86400
+
+CREATE_MESSAGES = """
+MATCH (c:Chat {uid: $chat_uid}), (a:Account {uid: $sender_uid})
+UNWIND $rows AS row
+CREATE (m:Message {
+    uid: row.uid, text: row.text, message_type: 'text', is_read: false,
+    created_at: row.created_at, chat_uid: c.uid, seq: row.seq
+})
+CREATE (m)-[:SENT_TO]->(c)
+CREATE (m)-[:SENT_BY]->(a)
+WITH c, count(*) AS created
+SET c.message_count = created, c.last_seq = created
+"""
+
+
+def message_times():
+    """Timestamps over five days, one of them empty, clustered around midnights"""
+    start = (int(time.time()) // DAY - 6) * DAY
+    times = [start + 3600 * hour for hour in (1, 5, 9, 13, 17)]
+    times += [start + DAY - 0.5, start + DAY + 0.5]  # Either side of midnight
+    times += [start + 3 * DAY + 60, start + 3 * DAY + 60]  # Same timestamp
+    times += [start + 3 * DAY + 3600 * hour for hour in (2, 8, 23)]
+    times += [start + 4 * DAY + 600 * i for i in range(8)]
+    return times
+
+
+def fetch(chat, token, query):
+    request = RequestFactory().get(
+        f'/api/chats/{chat.uid}/messages/?{query}',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = MessageView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 200, response.data
+    return (
+        [message['uid'] for message in response.data['messages']],
+        response.data['has_more'],
+        response.data['total_count']
+    )
+
+
+def pages(chat, token, cursors):
+    """Every page the test compares, keyed by its query string"""
+    queries = [f'limit=4&offset={offset}' for offset in range(0, 24, 3)]
+    for cursor in cursors:
+        queries += [f'limit=3&before={cursor}', f'limit=3&after={cursor}']
+    return {query: fetch(chat, token, query) for query in queries}
+
+
+def test_bucketed_pages_match_flat_pages():
+    print("🪣 Testing Bucketed Pagination")
+    print("=" * 50)
+
+    sender = create_account('bucket_sender')
+    token = AuthToken.create_token(sender.uid)
+    chat = Chat(name='Bucket test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+
+    rows = [
+        {'uid': uuid.uuid4().hex, 'text': f'Message {i}', 'created_at': created_at, 'seq': i + 1}
+        for i, created_at in enumerate(message_times())
+    ]
+    db.cypher_query(CREATE_MESSAGES, {'chat_uid': chat.uid, 'sender_uid': sender.uid, 'rows': rows})
+
+    # A cursor at every message, so some fall inside a bucket and some on its edges
+    cursors = [encode_cursor(row['created_at'], row['uid']) for row in rows]
+    flat = pages(chat, token, cursors)
+
+    call_command('bucket_chat_messages', chat.uid, batch_size=4)
+    results, _ = db.cypher_query(
+        "MATCH (c:Chat {uid: $uid}) RETURN c.bucketed, COUNT { (:MessageBucket)-[:BUCKET_OF]->(c) }",
+        {'uid': chat.uid}
+    )
+    bucketed, buckets = results[0]
+    print(f"   {len(rows)} messages converted into {buckets} buckets")
+    assert bucketed and buckets == 4, f"Expected 4 buckets, got {buckets}"
+
+    converted = pages(chat, token, cursors)
+    mismatches = [query for query in flat if flat[query] != converted[query]]
+    print(f"   {len(flat)} pages compared, {len(mismatches)} differ")
+    assert not mismatches, f"Pages differ after bucketing: {mismatches[:3]}"
+    assert flat['limit=4&offset=0'][0] == [row['uid'] for row in rows[::-1][:4]], "Newest page should come first"
+
+    print("✅ Bucketed pages are identical to flat pages")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_bucketed_pages_match_flat_pages()
+        print("\n✅ TEST PASSED: bucketed pagination matches the flat layout!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
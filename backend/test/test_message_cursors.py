@@ -0,0 +1,98 @@
+"""
+Cursor pagination test for chat messages (GET /api/chats/<id>/messages/)
+Walks a chat backwards with before_cursor and forwards with after_cursor and
+checks that every message is returned exactly once, in order, including
+messages that share a timestamp; a malformed cursor is rejected.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import time
+import uuid
+
+from query_counter import create_account
+
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.pagination import encode_cursor
+from apps.core.views import MessageView
+
+CREATE_MESSAGES = """
+MATCH (c:Chat {uid: $chat_uid}), (a:Account {uid: $sender_uid})
+UNWIND $rows AS row
+CREATE (m:Message {
+    uid: row.uid, text: row.text, message_type: 'text', is_read: false,
+    created_at: row.created_at, chat_uid: c.uid
+})
+CREATE (m)-[:SENT_TO]->(c)
+CREATE (m)-[:SENT_BY]->(a)
+"""
+
+
+def fetch(chat, token, query):
+    request = RequestFactory().get(
+        f'/api/chats/{chat.uid}/messages/?{query}',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    return MessageView.as_view()(request, chat_id=chat.uid)
+
+
+def walk(chat, token, direction, cursor):
+    """Follow before_cursor (older) or after_cursor (newer) pages until has_more is false"""
+    seen = []
+    while True:
+        response = fetch(chat, token, f'limit=3&{direction}={cursor}')
+        assert response.status_code == 200, response.data
+        seen.append([message['uid'] for message in response.data['messages']])
+        if not response.data['has_more']:
+            return seen
+        cursor = response.data[f'{direction}_cursor']
+
+
+def test_cursor_round_trips():
+    print("🧭 Testing Message Cursor Pagination")
+    print("=" * 50)
+
+    sender = create_account('cursor_sender')
+    token = AuthToken.create_token(sender.uid)
+    chat = Chat(name='Cursor test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+
+    # Ten messages, three of them sharing a timestamp
+    start = time.time() - 3600
+    times = [start + i for i in range(4)] + [start + 10] * 3 + [start + 20 + i for i in range(3)]
+    rows = [{'uid': uuid.uuid4().hex, 'text': f'Message {i}', 'created_at': at} for i, at in enumerate(times)]
+    db.cypher_query(CREATE_MESSAGES, {'chat_uid': chat.uid, 'sender_uid': sender.uid, 'rows': rows})
+    newest_first = [row['uid'] for row in sorted(rows, key=lambda row: (row['created_at'], row['uid']), reverse=True)]
+
+    # Newest page, then older pages
+    response = fetch(chat, token, 'limit=3')
+    assert response.status_code == 200, response.data
+    first_page = [message['uid'] for message in response.data['messages']]
+    assert first_page == newest_first[:3], "The first page should hold the newest messages"
+    pages = [first_page] + walk(chat, token, 'before', response.data['before_cursor'])
+    walked = [uid for page in pages for uid in page]
+    print(f"   backwards: {len(pages)} pages -> {len(walked)} messages")
+    assert walked == newest_first, "Walking before_cursor should return every message once, newest first"
+
+    # From the oldest message, newer pages (each page is newest first)
+    oldest = min(rows, key=lambda row: (row['created_at'], row['uid']))
+    pages = walk(chat, token, 'after', encode_cursor(oldest['created_at'], oldest['uid']))
+    walked = [uid for page in reversed(pages) for uid in page]
+    print(f"   forwards: {len(pages)} pages -> {len(walked)} messages")
+    assert walked == newest_first[:-1], "Walking after_cursor should return every newer message once"
+
+    response = fetch(chat, token, 'before=not-a-cursor')
+    assert response.status_code == 400, response.status_code
+
+    print("✅ Cursors round-trip in both directions without gaps or duplicates")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_cursor_round_trips()
+        print("\n✅ TEST PASSED: message cursors round-trip!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,89 @@
+"""
+Message send test (POST /api/chats/<id>/messages/)
+Verifies that sending a message is a single Cypher statement that creates the
+message with its SENT_TO/SENT_BY links and LAST_MESSAGE rewire, and that
+non-participants and unknown chats are refused without writing anything.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+import uuid
+
+from query_counter import count_queries, create_account
+
+from django.test import RequestFactory, override_settings
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat
+from apps.core.views import MessageView
+
+
+def send(chat_uid, token, text):
+    request = RequestFactory().post(
+        f'/api/chats/{chat_uid}/messages/',
+        data=json.dumps({'text': text}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    with count_queries() as statements:
+        response = MessageView.as_view()(request, chat_id=chat_uid)
+    return response, statements
+
+
+def message_count(chat):
+    results, _ = db.cypher_query(
+        "MATCH (m:Message {chat_uid: $uid}) RETURN count(m)", {'uid': chat.uid}
+    )
+    return results[0][0]
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0, CHAT_MESSAGE_LAYOUT='flat')
+def test_send_is_one_statement():
+    print("✉️ Testing Single-Statement Message Send")
+    print("=" * 50)
+
+    sender = create_account('send_sender')
+    outsider = create_account('send_outsider')
+    token = AuthToken.create_token(sender.uid)
+    outsider_token = AuthToken.create_token(outsider.uid)
+    chat = Chat(name='Send test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+
+    send(chat.uid, token, 'Warm-up')  # Warm the token and account caches
+    response, statements = send(chat.uid, token, 'Hello')
+    assert response.status_code == 201, response.data
+    print(f"   send -> {len(statements)} Cypher statements")
+    assert len(statements) == 1, f"Expected one statement, got {len(statements)}"
+    assert response.data['sender']['uid'] == sender.uid and response.data['seq'] == 2, response.data
+
+    results, _ = db.cypher_query(
+        """
+        MATCH (m:Message {uid: $uid})
+        RETURN EXISTS { (m)-[:SENT_TO]->(:Chat {uid: $chat_uid}) },
+               EXISTS { (m)-[:SENT_BY]->(:Account {uid: $sender_uid}) },
+               [(:Chat {uid: $chat_uid})-[:LAST_MESSAGE]->(last) | last.uid]
+        """,
+        {'uid': response.data['uid'], 'chat_uid': chat.uid, 'sender_uid': sender.uid}
+    )
+    sent_to, sent_by, last_messages = results[0]
+    assert sent_to and sent_by, "The message should be linked to its chat and sender"
+    assert last_messages == [response.data['uid']], f"LAST_MESSAGE should point at the new message only: {last_messages}"
+
+    # Refused sends write nothing
+    before = message_count(chat)
+    response, _ = send(chat.uid, outsider_token, 'Let me in')
+    assert response.status_code == 403, response.status_code
+    response, _ = send(uuid.uuid4().hex, token, 'Anyone there?')
+    assert response.status_code == 404, response.status_code
+    assert message_count(chat) == before, "A refused send created a message"
+
+    print("✅ A message is sent in one statement; refused sends write nothing")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_send_is_one_statement()
+        print("\n✅ TEST PASSED: messages are sent in one statement!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
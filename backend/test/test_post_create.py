@@ -0,0 +1,63 @@
+"""
+Post creation test (POST /api/posts/)
+Verifies that a post created through the view by an authenticated user is
+linked to its author and counted in the author's feelings_shared_count, once
+per post.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+
+from query_counter import create_account
+
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.views import PostView
+
+
+def create_post(token, body):
+    request = RequestFactory().post(
+        '/api/posts/',
+        data=json.dumps({'body': body}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    return PostView.as_view()(request)
+
+
+def test_create_post_counts_for_author():
+    print("📝 Testing Post Creation")
+    print("=" * 50)
+
+    author = create_account('poster')
+    token = AuthToken.create_token(author.uid)
+
+    uids = []
+    for i in range(2):
+        response = create_post(token, f'Post {i}')
+        assert response.status_code == 201, response.data
+        uids.append(response.data['uid'])
+
+    results, _ = db.cypher_query(
+        """
+        MATCH (a:Account {uid: $uid})
+        RETURN a.feelings_shared_count, [(p:Post)-[:CREATED_BY]->(a) | p.uid]
+        """,
+        {'uid': author.uid}
+    )
+    count, post_uids = results[0]
+    print(f"   2 posts created -> feelings_shared_count {count}")
+    assert count == 2, f"Expected feelings_shared_count 2, got {count}"
+    assert sorted(post_uids) == sorted(uids), f"Posts not linked to their author: {post_uids}"
+
+    print("✅ Posts are linked to and counted for their author")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_create_post_counts_for_author()
+        print("\n✅ TEST PASSED: creating a post updates its author!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
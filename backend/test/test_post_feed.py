@@ -0,0 +1,78 @@
+"""
+Global post feed test (GET /api/posts/)
+Pages through the feed with next_cursor (narrowed to this test's posts by the
+feeling filter) and checks that every post is returned once, newest first,
+with its author projected and its body truncated server-side, one Cypher
+round-trip per page; also checks the since filter.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from query_counter import count_queries, create_account
+
+from django.conf import settings
+from django.test import RequestFactory
+from neomodel import db
+
+from apps.core.views import PostView
+
+CREATE_POSTS = """
+MATCH (a:Account {uid: $author_uid})
+UNWIND $rows AS row
+CREATE (p:Post {uid: row.uid, body: row.body, created_at: row.created_at, feeling_name: $feeling})
+CREATE (p)-[:CREATED_BY]->(a)
+"""
+
+
+def feed(query):
+    with count_queries() as statements:
+        response = PostView.as_view()(RequestFactory().get(f'/api/posts/?{query}'))
+    assert response.status_code == 200, response.data
+    assert len(statements) == 1, f"Expected one query per page, got {len(statements)}"
+    return response.data
+
+
+def test_feed_is_paged_and_projected():
+    print("📰 Testing Global Post Feed")
+    print("=" * 50)
+
+    author = create_account('feed_author')
+    feeling = f'Feed_{uuid.uuid4().hex[:8]}'
+    start = time.time() - 3600
+    times = [start, start + 1, start + 2, start + 2, start + 3]
+    rows = [{'uid': uuid.uuid4().hex, 'body': f'{i} ' + 'x' * 500, 'created_at': at} for i, at in enumerate(times)]
+    db.cypher_query(CREATE_POSTS, {'author_uid': author.uid, 'rows': rows, 'feeling': feeling})
+    newest_first = [row['uid'] for row in sorted(rows, key=lambda row: (row['created_at'], row['uid']), reverse=True)]
+
+    posts, query = [], f'feeling={feeling}&limit=2'
+    while True:
+        data = feed(query)
+        posts += data['posts']
+        if not data['has_more']:
+            break
+        query = f"feeling={feeling}&limit=2&cursor={data['next_cursor']}"
+    print(f"   {len(newest_first)} posts -> {len(posts)} returned")
+    assert [post['uid'] for post in posts] == newest_first, "The feed should return every post once, newest first"
+    assert all(post['author']['uid'] == author.uid for post in posts), posts[0]['author']
+    assert all(len(post['body']) == settings.POST_PREVIEW_LENGTH + 3 for post in posts), "Bodies are not truncated"
+
+    since = datetime.fromtimestamp(start + 1.5, tz=timezone.utc).isoformat()
+    data = feed(urlencode({'feeling': feeling, 'since': since}))
+    assert data['count'] == 3, f"Expected the 3 posts since {since}, got {data['count']}"
+
+    response = PostView.as_view()(RequestFactory().get('/api/posts/?since=yesterday'))
+    assert response.status_code == 400, response.status_code
+
+    print("✅ Feed paged by cursor and projected in one query per page")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_feed_is_paged_and_projected()
+        print("\n✅ TEST PASSED: the post feed is paged and projected!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
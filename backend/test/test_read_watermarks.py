@@ -0,0 +1,127 @@
+"""
+Read watermark test (POST /api/chats/<id>/read/ and unread counts)
+Verifies that unread counts and is_read flags come from the per-participant
+watermark on PARTICIPATES_IN, that the watermark only moves forward, and that
+backfill_read_watermarks initializes it from the legacy Message.is_read flags.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+
+from query_counter import create_account
+
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from neomodel import db
+
+from apps.core.authentication import AuthToken
+from apps.core.models import Chat, Message
+from apps.core.views import ChatReadView, ChatView, MessageView
+
+
+def unread_count(chat, token):
+    request = RequestFactory().get('/api/chats/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    response = ChatView.as_view()(request)
+    assert response.status_code == 200, response.data
+    return next(item['unread_count'] for item in response.data['chats'] if item['uid'] == chat.uid)
+
+
+def mark_read(chat, token, message_uid=None):
+    request = RequestFactory().post(
+        f'/api/chats/{chat.uid}/read/',
+        data=json.dumps({'message_uid': message_uid} if message_uid else {}),
+        content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    response = ChatReadView.as_view()(request, chat_id=chat.uid)
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+@override_settings(CHAT_SUMMARY_FLUSH_INTERVAL=0)
+def test_unread_counts_follow_the_watermark():
+    print("🔖 Testing Read Watermarks")
+    print("=" * 50)
+
+    factory = RequestFactory()
+    sender = create_account('watermark_sender')
+    reader = create_account('watermark_reader')
+    sender_token = AuthToken.create_token(sender.uid)
+    reader_token = AuthToken.create_token(reader.uid)
+    chat = Chat(name='Watermark test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(reader)
+
+    sent = []
+    for i in range(3):
+        request = factory.post(
+            f'/api/chats/{chat.uid}/messages/',
+            data=json.dumps({'text': f'Message {i}'}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {sender_token}'
+        )
+        response = MessageView.as_view()(request, chat_id=chat.uid)
+        assert response.status_code == 201, response.data
+        sent.append(response.data['uid'])
+
+    assert unread_count(chat, reader_token) == 3
+    assert unread_count(chat, sender_token) == 0, "Sending should advance the sender's own watermark"
+
+    mark_read(chat, reader_token, sent[1])
+    print(f"   read up to message 2 of 3 -> {unread_count(chat, reader_token)} unread")
+    assert unread_count(chat, reader_token) == 1
+
+    # The watermark never moves back
+    mark_read(chat, reader_token, sent[0])
+    assert unread_count(chat, reader_token) == 1, "Marking an older message read moved the watermark back"
+
+    # The sender sees which of their messages were read
+    request = factory.get(f'/api/chats/{chat.uid}/messages/', HTTP_AUTHORIZATION=f'Bearer {sender_token}')
+    response = MessageView.as_view()(request, chat_id=chat.uid)
+    assert [message['is_read'] for message in response.data['messages']] == [False, True, True], response.data
+
+    mark_read(chat, reader_token)
+    assert unread_count(chat, reader_token) == 0, "Marking the chat read should clear the unread count"
+
+    print("✅ Unread counts and read flags follow the watermark")
+    return True
+
+
+def test_backfill_from_legacy_flags():
+    print("\n🧺 Testing Read Watermark Backfill")
+    print("=" * 50)
+
+    sender = create_account('legacy_sender')
+    reader = create_account('legacy_reader')
+    chat = Chat(name='Legacy read test', is_group_chat=True).save()
+    chat.participants.connect(sender)
+    chat.participants.connect(reader)
+    messages = []
+    for i in range(3):
+        message = Message(text=f'Legacy {i}', is_read=i == 0).save()
+        message.sender.connect(sender)
+        message.chat.connect(chat)
+        messages.append(message)
+
+    call_command('backfill_read_watermarks', batch_size=2)
+    results, _ = db.cypher_query(
+        """
+        MATCH (a:Account)-[r:PARTICIPATES_IN]->(:Chat {uid: $uid})
+        RETURN a.uid, r.last_read_at
+        """,
+        {'uid': chat.uid}
+    )
+    watermarks = dict(results)
+    assert watermarks[reader.uid] == Message.created_at.deflate(messages[0].created_at), watermarks
+    assert watermarks[sender.uid] == Message.created_at.deflate(messages[2].created_at), watermarks
+
+    print("✅ Watermarks initialized from is_read flags and own messages")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_unread_counts_follow_the_watermark()
+        test_backfill_from_legacy_flags()
+        print("\n✅ TEST PASSED: read state lives on the watermark!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,54 @@
+"""
+Per-user session cap test (signed token mode)
+Verifies that logging in past AUTH_MAX_SESSIONS_PER_USER evicts the user's
+oldest session and that the access token minted from it is rejected at once,
+not only when it expires.
+Runs in-process against the Neo4j instance configured in .env
+"""
+from query_counter import create_account
+
+from django.test import override_settings
+
+from apps.core.authentication import AuthToken
+from apps.core.token_store import get_token_store
+
+CAP = 2
+
+
+@override_settings(AUTH_TOKEN_MODE='signed')
+def test_evicted_sessions_are_revoked():
+    print("🧢 Testing Per-User Session Cap")
+    print("=" * 50)
+
+    user = create_account('capped')
+    store = get_token_store()
+    backend = getattr(store, 'backend', store)
+    original_cap = backend.max_sessions_per_user
+    backend.max_sessions_per_user = CAP
+    try:
+        pairs = [AuthToken.create_token_pair(user.uid) for _ in range(CAP + 1)]
+    finally:
+        backend.max_sessions_per_user = original_cap
+
+    sessions = AuthToken.list_sessions(user.uid)
+    print(f"   {CAP + 1} logins with a cap of {CAP} -> {len(sessions)} sessions")
+    assert len(sessions) == CAP, f"Expected {CAP} sessions, got {len(sessions)}"
+
+    (evicted_access, evicted_refresh), *kept = pairs
+    assert AuthToken.validate_token(evicted_access) is None, "Access token of an evicted session is still accepted"
+    assert AuthToken.refresh_access_token(evicted_refresh) is None, "Evicted refresh token still mints access tokens"
+    for access_token, refresh_token in kept:
+        assert AuthToken.validate_token(access_token) == user.uid, "Access token of a kept session was rejected"
+        assert AuthToken.refresh_access_token(refresh_token), "Refresh token of a kept session was rejected"
+
+    AuthToken.revoke_all(user.uid)
+    print("✅ The oldest session was evicted and its access token denied")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_evicted_sessions_are_revoked()
+        print("\n✅ TEST PASSED: evicted sessions cannot be used!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,69 @@
+"""
+Session management test (GET/DELETE /api/auth/sessions/)
+Logs in twice, checks that both sessions are listed (the caller's flagged as
+current), logs out everywhere and checks that both tokens are rejected - with
+opaque tokens and with signed access tokens.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import json
+
+from query_counter import create_account
+
+from django.test import RequestFactory, override_settings
+
+from apps.core.authentication import AuthView, SessionView
+
+
+def login(username):
+    request = RequestFactory().post(
+        '/api/auth/',
+        data=json.dumps({'action': 'login', 'username': username, 'password': 'testpass123'}),
+        content_type='application/json'
+    )
+    response = AuthView.as_view()(request)
+    assert response.status_code == 200, response.content
+    return json.loads(response.content)['token']
+
+
+def sessions_request(method, token):
+    request = getattr(RequestFactory(), method)('/api/auth/sessions/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    response = SessionView.as_view()(request)
+    return response.status_code, json.loads(response.content)
+
+
+def check_log_out_everywhere(mode):
+    print(f"   {mode} tokens")
+    user = create_account('sessions')
+    first, second = login(user.username), login(user.username)
+
+    status, data = sessions_request('get', second)
+    assert status == 200, data
+    assert data['count'] == 2, f"Expected 2 sessions, got {data['count']}"
+    assert [session['current'] for session in data['sessions']] == [False, True], data['sessions']
+
+    status, data = sessions_request('delete', first)
+    assert status == 200 and data['revoked'] == 2, data
+
+    for token in (first, second):
+        status, data = sessions_request('get', token)
+        assert status == 401, f"Token still accepted after logging out everywhere ({mode}): {data}"
+
+
+def test_list_and_revoke_sessions():
+    print("🖥️ Testing Session Listing and Log Out Everywhere")
+    print("=" * 50)
+
+    check_log_out_everywhere('opaque')
+    with override_settings(AUTH_TOKEN_MODE='signed'):
+        check_log_out_everywhere('signed')
+
+    print("✅ Both sessions listed, then both rejected")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_list_and_revoke_sessions()
+        print("\n✅ TEST PASSED: sessions can be listed and revoked everywhere!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")
@@ -0,0 +1,135 @@
+"""
+Token store test
+Runs the same checks against MemoryTokenStore, Neo4jTokenStore and a
+CachedTokenStore in front of each: save/get/delete, expiry, per-user listing
+and revocation, and that the cache forgets tokens deleted, evicted or revoked
+through it.
+Runs in-process against the Neo4j instance configured in .env
+"""
+import secrets
+import time
+import uuid
+
+import query_counter  # noqa: F401 - sets up Django
+
+from apps.core.token_store import CachedTokenStore, MemoryTokenStore, Neo4jTokenStore, token_key
+
+
+def new_token():
+    return secrets.token_urlsafe(32)
+
+
+def check_store(name, store):
+    print(f"   {name}")
+    user_uid = uuid.uuid4().hex
+    now = time.time()
+
+    # Save, get, delete
+    token = new_token()
+    assert store.save(token, user_uid, now + 3600) == []
+    record = store.get(token)
+    assert record and record['user_uid'] == user_uid, record
+    assert abs(record['expires'] - (now + 3600)) < 1, record
+    store.delete(token)
+    assert store.get(token) is None, "Deleted token is still returned"
+    assert store.get(new_token()) is None, "Unknown token returned a record"
+
+    # Expired tokens are not returned, and are purged
+    expired = new_token()
+    store.save(expired, user_uid, now - 1)
+    assert store.get(expired) is None, "Expired token is still returned"
+    store.save(new_token(), user_uid, now - 1)
+    store.purge_expired()
+    assert store.list_user(user_uid) == [], "Expired tokens are listed"
+
+    # Per-user listing (oldest first), touch and log out everywhere
+    tokens = [new_token() for _ in range(3)]
+    for token in tokens:
+        store.save(token, user_uid, time.time() + 3600)
+    sessions = store.list_user(user_uid)
+    assert [session['key'] for session in sessions] == [token_key(token) for token in tokens], sessions
+    store.touch(tokens[0], now + 60)
+    assert store.get(tokens[0])['last_seen'] == now + 60
+    assert sorted(store.delete_user(user_uid)) == sorted(token_key(token) for token in tokens)
+    assert all(store.get(token) is None for token in tokens), "Revoked tokens are still returned"
+
+
+def check_per_user_cap(name, store):
+    user_uid = uuid.uuid4().hex
+    original_cap = getattr(store, 'backend', store).max_sessions_per_user
+    getattr(store, 'backend', store).max_sessions_per_user = 2
+    try:
+        tokens = [new_token() for _ in range(3)]
+        evicted = [key for token in tokens for key in store.save(token, user_uid, time.time() + 3600)]
+    finally:
+        getattr(store, 'backend', store).max_sessions_per_user = original_cap
+    assert evicted == [token_key(tokens[0])], f"{name}: expected the oldest session evicted, got {evicted}"
+    assert store.get(tokens[0]) is None, f"{name}: evicted token is still returned"
+    assert store.get(tokens[2]) is not None
+    store.delete_user(user_uid)
+
+
+def test_token_stores():
+    print("🔑 Testing Token Stores")
+    print("=" * 50)
+
+    stores = {
+        'MemoryTokenStore': MemoryTokenStore(),
+        'Neo4jTokenStore': Neo4jTokenStore(),
+        'CachedTokenStore(memory)': CachedTokenStore(MemoryTokenStore(), ttl=60, max_entries=100),
+        'CachedTokenStore(neo4j)': CachedTokenStore(Neo4jTokenStore(), ttl=60, max_entries=100),
+    }
+    for name, store in stores.items():
+        check_store(name, store)
+        check_per_user_cap(name, store)
+
+    print("✅ Every store saves, expires and revokes tokens the same way")
+    return True
+
+
+def test_cache_invalidation():
+    print("\n🗃️ Testing Token Cache Invalidation")
+    print("=" * 50)
+
+    backend = MemoryTokenStore()
+    store = CachedTokenStore(backend, ttl=60, max_entries=2)
+    user_uid = uuid.uuid4().hex
+
+    token = new_token()
+    store.save(token, user_uid, time.time() + 3600)
+    backend.delete(token)
+    assert store.get(token) is not None, "A fresh cache entry should be served without the backend"
+    store.delete(token)
+    assert store.get(token) is None, "Deleting through the cache should drop its entry"
+
+    # An expired cache entry is not served, even within the TTL
+    token = new_token()
+    store.save(token, user_uid, time.time() + 0.2)
+    time.sleep(0.3)
+    assert store.get(token) is None, "Expired token served from the cache"
+
+    # Past the TTL the backend is asked again
+    token = new_token()
+    store.save(token, user_uid, time.time() + 3600)
+    backend.delete(token)
+    store.ttl = 0
+    assert store.get(token) is None, "Stale cache entry served past the TTL"
+    store.ttl = 60
+
+    # The cache is bounded
+    for _ in range(5):
+        store.save(new_token(), user_uid, time.time() + 3600)
+    assert store.stats()['cached'] <= 2, store.stats()
+    store.delete_user(user_uid)
+
+    print("✅ The cache forgets deleted, expired and stale tokens")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        test_token_stores()
+        test_cache_invalidation()
+        print("\n✅ TEST PASSED: token stores behave the same!")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {str(e)}")